@@ -1,16 +1,17 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import io
 import time
 from datetime import datetime, timedelta
-from database import inserir_partida, buscar_partidas, deletar_partida, inserir_estatisticas_jogadores, buscar_estatisticas_jogadores, buscar_todas_estatisticas_jogadores
+from database import inserir_partida, deletar_partida, inserir_estatisticas_jogadores, inserir_estatisticas_jogadores_em_lote, buscar_agregados_jogadores, contar_partidas_com_jogadores, buscar_series_jogadores_df, iterar_estatisticas_jogadores
+from contexto import ContextoDados
+from cubo import cubo_do_usuario
+from aquecimento import iniciar_aquecimento
 from utils import (
-    calcular_aproveitamento, comparar_com_benchmark, calcular_score_benchmark,
+    comparar_com_benchmark,
     diagnostico_geral, validar_dados_partida, BENCHMARK, RESULTADO_VITORIA,
     RESULTADO_EMPATE, RESULTADO_DERROTA, LOCAL_CASA, LOCAL_FORA,
-    calcular_percentual_passes, calcular_percentual_finalizacao,
-    parsear_html_fm
+    parsear_html_fm, parsear_varios_html_fm
 )
 from licencas import Licenca, PLANOS, get_mensagem_upgrade, comparar_planos
 from auth import buscar_usuario
@@ -25,6 +26,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Pré-carrega módulos pesados e o pool em segundo plano (uma vez por processo)
+iniciar_aquecimento()
+
 # =======================
 # IDIOMA — inicializar antes de tudo
 # =======================
@@ -60,6 +64,9 @@ if 'licenca' not in st.session_state:
 licenca = st.session_state.licenca
 lang = st.session_state.idioma
 
+# Dados do usuário: cada conjunto é buscado uma única vez neste rerun
+contexto = ContextoDados(st.session_state.usuario_id)
+
 # =======================
 # HEADER
 # =======================
@@ -86,22 +93,42 @@ with col_idioma:
         st.rerun()
 
 # =======================
-# TABS PRINCIPAIS
+# NAVEGAÇÃO PRINCIPAL
 # =======================
-tab1, tab2, tab3 = st.tabs([
+# Só a vista ativa é executada (st.tabs rodaria as três a cada rerun).
+# Widgets de vistas ocultas perderiam o estado; regravar as chaves
+# no session_state a cada rerun mantém os valores entre as vistas.
+CHAVES_PERSISTENTES = [
+    "time_usuario", "local", "temporada", "rodada", "time_adv", "competicao", "data_partida",
+    "gols_user", "posse_user", "remates_user", "baliza_user", "xg_user", "opor_user",
+    "cantos_user", "passes_tot_user", "passes_cert_user", "cruz_tot_user", "cruz_cert_user",
+    "gols_adv", "posse_adv", "remates_adv", "baliza_adv", "xg_adv", "opor_adv",
+    "cantos_adv", "passes_tot_adv", "passes_cert_adv", "cruz_tot_adv", "cruz_cert_adv",
+    "importar_modo", "importar_partida_select", "importar_lote_temporada",
+    "dash_temp", "dash_comp", "dash_janela", "dash_tend_temporada",
+    "dash_forma_tipo", "dash_forma_jogos", "dash_forma_dias", "dash_forma_metrica",
+]
+for chave in CHAVES_PERSISTENTES:
+    if chave in st.session_state:
+        st.session_state[chave] = st.session_state[chave]
+
+VISTAS = ["cadastro", "dashboard", "historico"]
+vista = st.radio(
     t("tab_cadastro", lang),
-    t("tab_dashboard", lang),
-    t("tab_historico", lang),
-])
+    options=VISTAS,
+    format_func=lambda v: t(f"tab_{v}", lang),
+    horizontal=True,
+    label_visibility="collapsed",
+    key="vista"
+)
 
 # =======================
 # TAB 1: CADASTRO
 # =======================
-with tab1:
+if vista == "cadastro":
     st.subheader(t("cadastro_titulo", lang))
 
-    partidas_existentes = buscar_partidas(st.session_state.usuario_id)
-    num_partidas = len(partidas_existentes)
+    num_partidas = contexto.num_partidas
 
     pode_cadastrar, mensagem_erro = licenca.pode_cadastrar_partida(num_partidas)
 
@@ -128,14 +155,14 @@ with tab1:
 
     with col1:
         time_usuario = st.text_input(t("lbl_seu_time", lang), key="time_usuario")
-        local = st.selectbox(t("lbl_local", lang), [LOCAL_CASA, LOCAL_FORA])
-        temporada = st.text_input(t("lbl_temporada", lang))
-        rodada = st.number_input(t("lbl_rodada", lang), min_value=1, step=1)
+        local = st.selectbox(t("lbl_local", lang), [LOCAL_CASA, LOCAL_FORA], key="local")
+        temporada = st.text_input(t("lbl_temporada", lang), key="temporada")
+        rodada = st.number_input(t("lbl_rodada", lang), min_value=1, step=1, key="rodada")
 
     with col2:
-        time_adv = st.text_input(t("lbl_adversario", lang))
-        competicao = st.text_input(t("lbl_competicao", lang))
-        data = st.date_input(t("lbl_data", lang))
+        time_adv = st.text_input(t("lbl_adversario", lang), key="time_adv")
+        competicao = st.text_input(t("lbl_competicao", lang), key="competicao")
+        data = st.date_input(t("lbl_data", lang), key="data_partida")
 
     st.divider()
 
@@ -188,7 +215,7 @@ with tab1:
     if st.button(t("btn_salvar", lang), type="primary", use_container_width=True):
         dados = (
             st.session_state.usuario_id,
-            time_usuario, time_adv, local, competicao, temporada, str(data), rodada,
+            time_usuario, time_adv, local, competicao, temporada, data, rodada,
             posse_usuario, remates_usuario, remates_a_baliza_usuario, xg_usuario,
             oportunidades_flagrantes_usuario, cantos_usuario, passes_totais_usuario,
             passes_certos_usuario, cruzamentos_totais_usuario, cruzamentos_certos_usuario,
@@ -207,6 +234,7 @@ with tab1:
                 st.warning(mensagem)
 
             if inserir_partida(dados):
+                contexto.invalidar()
                 progress_text = t("msg_salvando", lang)
                 my_bar = st.progress(0, text=progress_text)
                 for percent_complete in range(100):
@@ -224,31 +252,33 @@ with tab1:
     st.subheader(t("importar_titulo", lang))
     st.caption(t("importar_descricao", lang))
 
-    partidas_para_import = buscar_partidas(st.session_state.usuario_id)
+    partidas_para_import = contexto.partidas()
+
+    # Forma mais segura: reconstrói o label a partir das colunas conhecidas
+    def _label_partida(row):
+        # row: linha de partidas_para_import.itertuples()
+        try:
+            return f"{row.time_usuario} {row.gols_usuario}x{row.gols_adv} {row.time_adv} - {row.competicao} {row.temporada}"
+        except Exception:
+            return f"Partida #{row.id}"
 
-    if not partidas_para_import:
+    modo_importacao = None
+    if partidas_para_import.empty:
         st.warning(t("importar_sem_partidas", lang))
     else:
-        # Monta opções de seleção de partida
+        modo_importacao = st.radio(
+            t("importar_modo", lang),
+            options=["unico", "lote"],
+            format_func=lambda m: t(f"importar_modo_{m}", lang),
+            horizontal=True,
+            key="importar_modo"
+        )
+
+    if modo_importacao == "unico":
+        # Monta opções de seleção de partida (mais recentes primeiro)
         opcoes_partida = {
-            row[0]: f"{str(row[6])[:10]} — {row[2]} {row[19+5] if len(row) > 24 else ''}x{row[19+11] if len(row) > 30 else ''} {row[3]}"
-            for row in partidas_para_import
+            row.id: _label_partida(row) for row in partidas_para_import.iloc[::-1].itertuples(index=False)
         }
-        # Forma mais segura: reconstrói o label a partir das colunas conhecidas
-        def _label_partida(row):
-            # row: (id, usuario_id, time_usuario, time_adv, local, competicao, temporada, data, rodada, ...)
-            try:
-                time_usuario   = row[2]
-                time_adv  = row[3]
-                gols_usuario   = row[19]
-                gols_adv   = row[30]
-                competicao = row[5]
-                temporada   = row[6]
-                return f"{time_usuario} {gols_usuario}x{gols_adv} {time_adv} - {competicao} {temporada}"
-            except Exception:
-                return f"Partida #{row[0]}"
-
-        opcoes_partida = {row[0]: _label_partida(row) for row in partidas_para_import}
 
         partida_selecionada_id = st.selectbox(
             t("importar_selecionar_partida", lang),
@@ -258,11 +288,7 @@ with tab1:
         )
 
         # Avisa se já existem dados importados para essa partida
-        if partida_selecionada_id:
-            stats_existentes = buscar_estatisticas_jogadores(
-                partida_selecionada_id, st.session_state.usuario_id
-            )
-            if stats_existentes:
+        if partida_selecionada_id in contexto.ids_com_estatisticas:
                 st.warning(t("importar_reimportar_aviso", lang))
 
         arquivo_html = st.file_uploader(
@@ -344,6 +370,7 @@ with tab1:
                             st.session_state.usuario_id,
                             jogadores_importados
                         ):
+                            contexto.invalidar()
                             st.success(
                                 t("importar_sucesso", lang).format(n=len(jogadores_importados))
                             )
@@ -355,49 +382,154 @@ with tab1:
                 st.error(t("importar_erro_parse", lang))
                 st.exception(e)
 
+    elif modo_importacao == "lote":
+        # Importação em lote: um HTML por partida de uma temporada inteira
+        temporadas_import = sorted(t for t in partidas_para_import["temporada"].unique() if t)
+        temporada_lote = st.selectbox(
+            t("importar_lote_temporada", lang),
+            options=temporadas_import,
+            key="importar_lote_temporada"
+        )
+
+        partidas_temporada = partidas_para_import[
+            partidas_para_import["temporada"] == temporada_lote
+        ].sort_values(["data", "rodada"])
+        opcoes_lote = {
+            row.id: f"{str(row.data)[:10]} — {_label_partida(row)}"
+            for row in partidas_temporada.itertuples(index=False)
+        }
+        rotulo_para_id = {rotulo: pid for pid, rotulo in opcoes_lote.items()}
+        rotulos_lote = list(opcoes_lote.values())
+
+        arquivos_lote = st.file_uploader(
+            t("importar_lote_upload_label", lang),
+            type=["html", "htm"],
+            accept_multiple_files=True,
+            key="importar_lote_uploader"
+        )
+
+        if arquivos_lote:
+            # Sugestão inicial: arquivos em ordem de nome × partidas em ordem de data
+            arquivos_lote = sorted(arquivos_lote, key=lambda a: a.name)
+            df_mapa = pd.DataFrame({
+                "arquivo": [a.name for a in arquivos_lote],
+                "partida": [
+                    rotulos_lote[i] if i < len(rotulos_lote) else None
+                    for i in range(len(arquivos_lote))
+                ],
+            })
+
+            st.caption(t("importar_lote_mapeamento", lang))
+            df_mapa = st.data_editor(
+                df_mapa,
+                column_config={
+                    "arquivo": st.column_config.TextColumn(t("importar_lote_col_arquivo", lang), disabled=True),
+                    "partida": st.column_config.SelectboxColumn(t("importar_lote_col_partida", lang), options=rotulos_lote),
+                },
+                hide_index=True,
+                use_container_width=True,
+                key=f"importar_lote_mapa_{temporada_lote}_{len(arquivos_lote)}"
+            )
+
+            mapeados = [
+                (arquivo, rotulo_para_id[rotulo])
+                for arquivo, rotulo in zip(arquivos_lote, df_mapa["partida"])
+                if rotulo in rotulo_para_id
+            ]
+            ids_mapeados = [pid for _, pid in mapeados]
+
+            if len(set(ids_mapeados)) != len(ids_mapeados):
+                st.warning(t("importar_lote_duplicada", lang))
+            elif mapeados and st.button(
+                t("importar_lote_confirmar", lang).format(n=len(mapeados)),
+                type="primary", use_container_width=True
+            ):
+                total_lote = len(mapeados)
+                barra_lote = st.progress(
+                    0.0, text=t("importar_lote_lendo", lang).format(atual=0, total=total_lote)
+                )
+
+                def _progresso_lote(concluidos, total):
+                    # Parse ocupa 90% da barra; a gravação, o restante
+                    barra_lote.progress(
+                        0.9 * concluidos / total,
+                        text=t("importar_lote_lendo", lang).format(atual=concluidos, total=total)
+                    )
+
+                resultados_lote = parsear_varios_html_fm(
+                    [arquivo.getvalue() for arquivo, _ in mapeados],
+                    ao_concluir=_progresso_lote
+                )
+
+                estatisticas_lote = {}
+                falhas_lote = []
+                for (arquivo, pid), jogadores in zip(mapeados, resultados_lote):
+                    if isinstance(jogadores, Exception) or not jogadores:
+                        falhas_lote.append(arquivo.name)
+                    else:
+                        estatisticas_lote[pid] = jogadores
+
+                resumo_lote = None
+                if estatisticas_lote:
+                    barra_lote.progress(0.9, text=t("importar_lote_salvando", lang))
+                    resumo_lote = inserir_estatisticas_jogadores_em_lote(
+                        st.session_state.usuario_id, estatisticas_lote
+                    )
+                    contexto.invalidar()
+                barra_lote.progress(1.0)
+                barra_lote.empty()
+
+                if falhas_lote:
+                    st.warning(t("importar_lote_falhas", lang).format(arquivos=", ".join(falhas_lote)))
+                if resumo_lote:
+                    st.success(t("importar_lote_sucesso", lang).format(**resumo_lote))
+                elif estatisticas_lote:
+                    st.error(t("importar_erro_salvar", lang))
+
 
 # =======================
 # TAB 2: DASHBOARD
 # =======================
-with tab2:
+if vista == "dashboard":
+    # Plotly e os motores do dashboard só são importados quando ele é exibido
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from metricas import metricas_do_resumo
+    from tendencias import calcular_tendencias
+    from forma import METRICAS_FORMA, calcular_forma, forma_atual
+    from nivel_europeu import JANELA_PADRAO, METRICAS_BENCHMARK, STATUS_CHAVE, pontuacao_temporal, pontuar_benchmark
+    from similaridade import DIMENSOES_PERFIL, MINUTOS_MINIMOS, indice_perfis_do_usuario
+    from cache_figuras import figura_em_cache
+    from graficos import LIMITE_PONTOS_PADRAO, LIMITE_WEBGL, reduzir_serie, filtrar_periodo, adicionar_reta_tendencia
+
     st.subheader(t("dashboard_titulo", lang))
  
-    partidas = buscar_partidas(st.session_state.usuario_id)
+    # Cubo temporada × competição × local: montado uma vez por versão dos
+    # dados; filtros e Casa/Fora saem dele por busca, sem reconsultar o banco
+    cubo = cubo_do_usuario(st.session_state.usuario_id)
+    opcoes_filtro = cubo.opcoes()
  
-    if not partidas:
+    if opcoes_filtro["partidas"] == 0:
         st.info(t("nenhuma_partida", lang))
         st.stop()
  
-    COLUNAS_PARTIDAS = [
-        "id", "usuario_id", "time_usuario", "time_adv", "local", "competicao", "temporada", "data", "rodada",
-        "posse_usuario", "remates_usuario", "remates_a_baliza_usuario", "xg_usuario",
-        "oportunidades_flagrantes_usuario", "cantos_usuario", "passes_totais_usuario",
-        "passes_certos_usuario", "cruzamentos_totais_usuario", "cruzamentos_certos_usuario",
-        "gols_usuario", "posse_adv", "remates_adv", "remates_a_baliza_adv", "xg_adv",
-        "oportunidades_flagrantes_adv", "cantos_adv", "passes_totais_adv",
-        "passes_certos_adv", "cruzamentos_totais_adv", "cruzamentos_certos_adv",
-        "gols_adv", "resultado",
-    ]
- 
-    df = pd.DataFrame(partidas, columns=COLUNAS_PARTIDAS[:len(partidas[0])])
-    df["data"] = pd.to_datetime(df["data"])
-    df = df.sort_values("data").reset_index(drop=True)
- 
-    # ── Filtros ──────────────────────────────────────────────────────────
+    # ── Filtros (aplicados no banco) ─────────────────────────────────────
     col_f1, col_f2 = st.columns(2)
     todas = t("filtro_todas", lang)
     with col_f1:
-        temporadas = [todas] + sorted(df["temporada"].unique().tolist())
+        temporadas = [todas] + opcoes_filtro["temporadas"]
         temp_selecionada = st.selectbox(t("lbl_filtro_temporada", lang), temporadas, key="dash_temp")
     with col_f2:
-        competicoes = [todas] + sorted(df["competicao"].unique().tolist())
+        competicoes = [todas] + opcoes_filtro["competicoes"]
         comp_selecionada = st.selectbox(t("lbl_filtro_competicao", lang), competicoes, key="dash_comp")
  
-    df_filtrado = df.copy()
-    if temp_selecionada != todas:
-        df_filtrado = df_filtrado[df_filtrado["temporada"] == temp_selecionada]
-    if comp_selecionada != todas:
-        df_filtrado = df_filtrado[df_filtrado["competicao"] == comp_selecionada]
+    filtro_temporada = None if temp_selecionada == todas else temp_selecionada
+    filtro_competicao = None if comp_selecionada == todas else comp_selecionada
+
+    # Figuras só são reconstruídas se os dados, os filtros ou o idioma mudarem
+    params_fig = (lang, filtro_temporada, filtro_competicao)
+ 
+    df_filtrado = contexto.partidas_filtradas(filtro_temporada, filtro_competicao)
  
     st.session_state.df_para_ia = df_filtrado
  
@@ -405,33 +537,32 @@ with tab2:
         st.warning(t("nenhum_filtro", lang))
         st.stop()
  
-    # ── Dados de jogadores (todas as partidas do usuário) ─────────────────
-    todos_jogadores = buscar_todas_estatisticas_jogadores(st.session_state.usuario_id)
-    df_jog = pd.DataFrame(todos_jogadores) if todos_jogadores else pd.DataFrame()
- 
-    # Filtra jogadores apenas das partidas do df_filtrado
-    ids_filtrados = set(df_filtrado["id"].tolist())
-    if not df_jog.empty:
-        df_jog = df_jog[df_jog["partida_id"].isin(ids_filtrados)]
- 
-    tem_jogadores = not df_jog.empty
- 
-    # ── Derivadas gerais ──────────────────────────────────────────────────
-    aproveitamento_geral = calcular_aproveitamento(df_filtrado)
-    resumo = df_filtrado["resultado"].value_counts()
-    n = len(df_filtrado)
-    gols_pro   = df_filtrado["gols_usuario"].sum()
-    gols_contra = df_filtrado["gols_adv"].sum()
-    saldo_gols  = gols_pro - gols_contra
-    perc_passes_geral = calcular_percentual_passes(
-        df_filtrado["passes_certos_usuario"].sum(),
-        df_filtrado["passes_totais_usuario"].sum()
-    )
-    perc_fin_geral = calcular_percentual_finalizacao(
-        df_filtrado["remates_a_baliza_usuario"].sum(),
-        df_filtrado["remates_usuario"].sum()
+    # ── Dados de jogadores (agregados mantidos no banco) ──────────────────
+    df_agg = buscar_agregados_jogadores(
+        st.session_state.usuario_id, temporada=filtro_temporada, competicao=filtro_competicao
     )
  
+    tem_jogadores = not df_agg.empty
+ 
+    # ── Derivadas gerais (lidas do cubo) ──────────────────────────────────
+    resumo_sql = cubo.resumo(filtro_temporada, filtro_competicao)
+    # KPIs avaliados de uma vez (geral, casa e fora) pelo motor de métricas
+    kpis = metricas_do_resumo(resumo_sql)
+    geral = kpis["geral"]
+    n = geral["partidas"]
+    aproveitamento_geral = geral["aproveitamento"]
+    resumo = pd.Series({
+        RESULTADO_VITORIA: geral["vitorias"],
+        RESULTADO_EMPATE:  geral["empates"],
+        RESULTADO_DERROTA: geral["derrotas"],
+    })
+    resumo = resumo[resumo > 0]
+    gols_pro   = geral["soma_gols_usuario"]
+    gols_contra = geral["soma_gols_adv"]
+    saldo_gols  = geral["saldo_gols"]
+    perc_passes_geral = geral["perc_passes"]
+    perc_fin_geral = geral["perc_finalizacao"]
+ 
     # ════════════════════════════════════════════════════════════════════
     # SEÇÃO 1 — VISÃO GERAL DO CLUBE
     # ════════════════════════════════════════════════════════════════════
@@ -448,61 +579,67 @@ with tab2:
     c1, c2, c3, c4, c5, c6 = st.columns(6)
     c1.metric("⚽ Gols Pró", gols_pro)
     c2.metric("🥅 Gols Sofridos", gols_contra)
-    c3.metric("📐 xG médio", f"{df_filtrado['xg_usuario'].mean():.2f}")
-    c4.metric("🎯 xG contra", f"{df_filtrado['xg_adv'].mean():.2f}")
-    c5.metric("📊 Posse média", f"{df_filtrado['posse_usuario'].mean():.1f}%")
+    c3.metric("📐 xG médio", f"{geral['media_xg_usuario']:.2f}")
+    c4.metric("🎯 xG contra", f"{geral['media_xg_adv']:.2f}")
+    c5.metric("📊 Posse média", f"{geral['media_posse_usuario']:.1f}%")
     c6.metric("🔁 % Passes", f"{perc_passes_geral:.1f}%")
  
     col_pie, col_trend = st.columns([1, 2])
  
     with col_pie:
-        fig_pie = px.pie(
-            values=resumo.values, names=resumo.index,
-            title="Distribuição de Resultados",
-            color=resumo.index,
-            color_discrete_map={
-                RESULTADO_VITORIA: "#22c55e",
-                RESULTADO_EMPATE:  "#eab308",
-                RESULTADO_DERROTA: "#ef4444"
-            },
-            hole=0.45
-        )
-        fig_pie.update_traces(textposition="inside", textinfo="percent+label")
-        fig_pie.update_layout(showlegend=False, margin=dict(t=40, b=10, l=10, r=10))
+        def _fig_pie():
+            fig_pie = px.pie(
+                values=resumo.values, names=resumo.index,
+                title="Distribuição de Resultados",
+                color=resumo.index,
+                color_discrete_map={
+                    RESULTADO_VITORIA: "#22c55e",
+                    RESULTADO_EMPATE:  "#eab308",
+                    RESULTADO_DERROTA: "#ef4444"
+                },
+                hole=0.45
+            )
+            fig_pie.update_traces(textposition="inside", textinfo="percent+label")
+            fig_pie.update_layout(showlegend=False, margin=dict(t=40, b=10, l=10, r=10))
+            return fig_pie
+        fig_pie = figura_em_cache("pizza", resumo, params_fig, _fig_pie)
         st.plotly_chart(fig_pie, use_container_width=True)
  
     with col_trend:
         # Forma recente — últimos 10 com barras coloridas
-        ultimos = df_filtrado.tail(10).copy()
-        cores_forma = ultimos["resultado"].map({
-            RESULTADO_VITORIA: "#22c55e",
-            RESULTADO_EMPATE:  "#eab308",
-            RESULTADO_DERROTA: "#ef4444"
-        })
-        ultimos["label"] = (
-            ultimos["data"].dt.strftime("%d/%m") + " " +
-            ultimos["time_adv"].str[:8]
-        )
-        fig_forma = go.Figure(go.Bar(
-            x=ultimos["label"],
-            y=[1] * len(ultimos),
-            marker_color=cores_forma.tolist(),
-            text=ultimos.apply(lambda r: f"{r['gols_usuario']}x{r['gols_adv']}", axis=1),
-            textposition="inside",
-            hovertext=ultimos.apply(
-                lambda r: f"{r['time_usuario']} {r['gols_usuario']}x{r['gols_adv']} {r['time_adv']}", axis=1
-            ),
-            hoverinfo="text",
-        ))
-        fig_forma.update_layout(
-            title="Forma Recente (últimos 10 jogos)",
-            yaxis=dict(visible=False),
-            xaxis=dict(tickangle=-30),
-            height=260,
-            margin=dict(t=40, b=60, l=10, r=10),
-            showlegend=False,
-            plot_bgcolor="rgba(0,0,0,0)",
-        )
+        def _fig_forma():
+            ultimos = df_filtrado.tail(10).copy()
+            cores_forma = ultimos["resultado"].map({
+                RESULTADO_VITORIA: "#22c55e",
+                RESULTADO_EMPATE:  "#eab308",
+                RESULTADO_DERROTA: "#ef4444"
+            })
+            ultimos["label"] = (
+                ultimos["data"].dt.strftime("%d/%m") + " " +
+                ultimos["time_adv"].str[:8]
+            )
+            fig_forma = go.Figure(go.Bar(
+                x=ultimos["label"],
+                y=[1] * len(ultimos),
+                marker_color=cores_forma.tolist(),
+                text=ultimos.apply(lambda r: f"{r['gols_usuario']}x{r['gols_adv']}", axis=1),
+                textposition="inside",
+                hovertext=ultimos.apply(
+                    lambda r: f"{r['time_usuario']} {r['gols_usuario']}x{r['gols_adv']} {r['time_adv']}", axis=1
+                ),
+                hoverinfo="text",
+            ))
+            fig_forma.update_layout(
+                title="Forma Recente (últimos 10 jogos)",
+                yaxis=dict(visible=False),
+                xaxis=dict(tickangle=-30),
+                height=260,
+                margin=dict(t=40, b=60, l=10, r=10),
+                showlegend=False,
+                plot_bgcolor="rgba(0,0,0,0)",
+            )
+            return fig_forma
+        fig_forma = figura_em_cache("forma", df_filtrado.tail(10), params_fig, _fig_forma)
         st.plotly_chart(fig_forma, use_container_width=True)
  
     # ════════════════════════════════════════════════════════════════════
@@ -516,17 +653,15 @@ with tab2:
     with col_atq:
         st.markdown("### ⚔️ Poder Ofensivo")
         a1, a2 = st.columns(2)
-        a1.metric("Gols/jogo",    f"{df_filtrado['gols_usuario'].mean():.2f}")
-        a2.metric("xG/jogo",      f"{df_filtrado['xg_usuario'].mean():.2f}")
-        a1.metric("Remates/jogo", f"{df_filtrado['remates_usuario'].mean():.1f}")
-        a2.metric("A baliza/jogo",f"{df_filtrado['remates_a_baliza_usuario'].mean():.1f}")
+        a1.metric("Gols/jogo",    f"{geral['media_gols_usuario']:.2f}")
+        a2.metric("xG/jogo",      f"{geral['media_xg_usuario']:.2f}")
+        a1.metric("Remates/jogo", f"{geral['media_remates_usuario']:.1f}")
+        a2.metric("A baliza/jogo",f"{geral['media_remates_a_baliza_usuario']:.1f}")
         a1.metric("% Finaliz.",   f"{perc_fin_geral:.1f}%")
-        a2.metric("Op. Flagrantes/j",f"{df_filtrado['oportunidades_flagrantes_usuario'].mean():.2f}")
+        a2.metric("Op. Flagrantes/j",f"{geral['media_oportunidades_flagrantes_usuario']:.2f}")
  
         # Over/Under-performance vs xG
-        xg_total = df_filtrado["xg_usuario"].sum()
-        gols_total = float(gols_pro)
-        diff_xg = gols_total - xg_total
+        diff_xg = geral["diff_xg"]
         st.markdown(
             f"**Over/Under vs xG:** {'🟢 +' if diff_xg >= 0 else '🔴 '}{diff_xg:.2f} gols "
             f"({'acima' if diff_xg >= 0 else 'abaixo'} do esperado)"
@@ -535,18 +670,16 @@ with tab2:
     with col_def:
         st.markdown("### 🛡️ Solidez Defensiva")
         d1, d2 = st.columns(2)
-        jogos_sem_sofrer = (df_filtrado["gols_adv"] == 0).sum()
-        perc_clean = jogos_sem_sofrer / n * 100 if n > 0 else 0
-        xg_contra_total = df_filtrado["xg_adv"].sum()
-        gols_sofridos = float(gols_contra)
-        diff_xg_def = gols_sofridos - xg_contra_total
- 
-        d1.metric("Gols sofridos/j",  f"{df_filtrado['gols_adv'].mean():.2f}")
-        d2.metric("xG sofrido/j",     f"{df_filtrado['xg_adv'].mean():.2f}")
+        jogos_sem_sofrer = geral["clean_sheets"]
+        perc_clean = geral["perc_clean_sheets"]
+        diff_xg_def = geral["diff_xg_def"]
+ 
+        d1.metric("Gols sofridos/j",  f"{geral['media_gols_adv']:.2f}")
+        d2.metric("xG sofrido/j",     f"{geral['media_xg_adv']:.2f}")
         d1.metric("Clean sheets",     f"{jogos_sem_sofrer} ({perc_clean:.0f}%)")
-        d2.metric("Remates sofr./j",  f"{df_filtrado['remates_adv'].mean():.1f}")
-        d1.metric("Posse adversária", f"{df_filtrado['posse_adv'].mean():.1f}%")
-        d2.metric("Op. Flagr. sofr.", f"{df_filtrado['oportunidades_flagrantes_adv'].mean():.2f}")
+        d2.metric("Remates sofr./j",  f"{geral['media_remates_adv']:.1f}")
+        d1.metric("Posse adversária", f"{geral['media_posse_adv']:.1f}%")
+        d2.metric("Op. Flagr. sofr.", f"{geral['media_oportunidades_flagrantes_adv']:.2f}")
  
         st.markdown(
             f"**Def. vs xG sofrido:** {'🟢 ' if diff_xg_def <= 0 else '🔴 +'}{diff_xg_def:.2f} "
@@ -554,25 +687,48 @@ with tab2:
         )
  
     # Gráfico xG pró vs contra por jogo
-    fig_xg = go.Figure()
-    fig_xg.add_trace(go.Scatter(
-        x=df_filtrado["data"], y=df_filtrado["xg_usuario"],
-        name="xG Pró", mode="lines+markers",
-        line=dict(color="#22c55e", width=2),
-        fill="tozeroy", fillcolor="rgba(34,197,94,0.12)"
-    ))
-    fig_xg.add_trace(go.Scatter(
-        x=df_filtrado["data"], y=df_filtrado["xg_adv"],
-        name="xG Contra", mode="lines+markers",
-        line=dict(color="#ef4444", width=2),
-        fill="tozeroy", fillcolor="rgba(239,68,68,0.12)"
-    ))
-    fig_xg.update_layout(
-        title="xG Pró vs xG Contra por Jogo",
-        xaxis_title="Data", yaxis_title="xG",
-        legend=dict(orientation="h"),
-        height=300, margin=dict(t=40, b=40, l=40, r=10)
-    )
+    # Históricos longos: séries reduzidas (LTTB) e um seletor de período;
+    # ao estreitar o período, os jogos voltam a aparecer todos.
+    limite_pontos = int(st.secrets.get("GRAFICO_MAX_PONTOS", LIMITE_PONTOS_PADRAO))
+    periodo = None
+    datas_validas = df_filtrado["data"].dropna()
+    if len(df_filtrado) > limite_pontos and not datas_validas.empty:
+        data_min, data_max = datas_validas.min().date(), datas_validas.max().date()
+        periodo = st.slider(
+            t("periodo_graficos", lang),
+            min_value=data_min, max_value=data_max, value=(data_min, data_max),
+            format="DD/MM/YYYY",
+            key=f"dash_periodo_{filtro_temporada}_{filtro_competicao}"
+        )
+        st.caption(t("periodo_legenda", lang).format(n=limite_pontos))
+    df_linhas = filtrar_periodo(df_filtrado, "data", periodo)
+    params_linhas = (params_fig, periodo, limite_pontos)
+ 
+    def _fig_xg():
+        serie_pro = reduzir_serie(df_linhas, "data", "xg_usuario", limite_pontos)
+        serie_contra = reduzir_serie(df_linhas, "data", "xg_adv", limite_pontos)
+        modo = "lines+markers" if len(df_linhas) <= limite_pontos else "lines"
+        fig_xg = go.Figure()
+        fig_xg.add_trace(go.Scatter(
+            x=serie_pro["data"], y=serie_pro["xg_usuario"],
+            name="xG Pró", mode=modo,
+            line=dict(color="#22c55e", width=2),
+            fill="tozeroy", fillcolor="rgba(34,197,94,0.12)"
+        ))
+        fig_xg.add_trace(go.Scatter(
+            x=serie_contra["data"], y=serie_contra["xg_adv"],
+            name="xG Contra", mode=modo,
+            line=dict(color="#ef4444", width=2),
+            fill="tozeroy", fillcolor="rgba(239,68,68,0.12)"
+        ))
+        fig_xg.update_layout(
+            title="xG Pró vs xG Contra por Jogo",
+            xaxis_title="Data", yaxis_title="xG",
+            legend=dict(orientation="h"),
+            height=300, margin=dict(t=40, b=40, l=40, r=10)
+        )
+        return fig_xg
+    fig_xg = figura_em_cache("xg", df_linhas[["data", "xg_usuario", "xg_adv"]], params_linhas, _fig_xg)
     st.plotly_chart(fig_xg, use_container_width=True)
  
     # ════════════════════════════════════════════════════════════════════
@@ -582,42 +738,55 @@ with tab2:
     st.markdown("## 🔄 Construção de Jogo")
  
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Posse média",        f"{df_filtrado['posse_usuario'].mean():.1f}%")
+    c1.metric("Posse média",        f"{geral['media_posse_usuario']:.1f}%")
     c2.metric("% Passes",           f"{perc_passes_geral:.1f}%")
-    c3.metric("Cantos/jogo",        f"{df_filtrado['cantos_usuario'].mean():.1f}")
-    c4.metric("Cruzamentos/jogo",   f"{df_filtrado['cruzamentos_totais_usuario'].mean():.1f}")
+    c3.metric("Cantos/jogo",        f"{geral['media_cantos_usuario']:.1f}")
+    c4.metric("Cruzamentos/jogo",   f"{geral['media_cruzamentos_totais_usuario']:.1f}")
  
-    perc_cruz = calcular_percentual_passes(
-        df_filtrado["cruzamentos_certos_usuario"].sum(),
-        df_filtrado["cruzamentos_totais_usuario"].sum()
-    )
+    perc_cruz = geral["perc_cruzamentos"]
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("% Cruzamentos",  f"{perc_cruz:.1f}%")
-    c2.metric("Passes totais/j",f"{df_filtrado['passes_totais_usuario'].mean():.0f}")
-    c3.metric("Passes certos/j",f"{df_filtrado['passes_certos_usuario'].mean():.0f}")
-    c4.metric("Cantos adversário/j", f"{df_filtrado['cantos_adv'].mean():.1f}")
+    c2.metric("Passes totais/j",f"{geral['media_passes_totais_usuario']:.0f}")
+    c3.metric("Passes certos/j",f"{geral['media_passes_certos_usuario']:.0f}")
+    c4.metric("Cantos adversário/j", f"{geral['media_cantos_adv']:.1f}")
  
     # Posse x aproveitamento (scatter)
-    df_scatter = df_filtrado.copy()
-    df_scatter["cor"] = df_scatter["resultado"].map({
-        RESULTADO_VITORIA: "#22c55e",
-        RESULTADO_EMPATE:  "#eab308",
-        RESULTADO_DERROTA: "#ef4444"
-    })
-    fig_posse = px.scatter(
-        df_scatter, x="posse_usuario", y="gols_usuario",
-        color="resultado",
-        color_discrete_map={
+    def _fig_posse():
+        df_scatter = df_filtrado.copy()
+        df_scatter["cor"] = df_scatter["resultado"].map({
             RESULTADO_VITORIA: "#22c55e",
             RESULTADO_EMPATE:  "#eab308",
             RESULTADO_DERROTA: "#ef4444"
-        },
-        trendline="ols",
-        title="Posse de Bola vs Gols Marcados",
-        labels={"posse_usuario": "Posse (%)", "gols_usuario": "Gols"},
-        hover_data={"time_adv": True, "data": True}
-    )
-    fig_posse.update_layout(height=320, margin=dict(t=40, b=40))
+        })
+        fig_posse = px.scatter(
+            df_scatter, x="posse_usuario", y="gols_usuario",
+            color="resultado",
+            color_discrete_map={
+                RESULTADO_VITORIA: "#22c55e",
+                RESULTADO_EMPATE:  "#eab308",
+                RESULTADO_DERROTA: "#ef4444"
+            },
+            title="Posse de Bola vs Gols Marcados",
+            labels={"posse_usuario": "Posse (%)", "gols_usuario": "Gols"},
+            hover_data={"time_adv": True, "data": True},
+            render_mode="webgl" if len(df_scatter) > LIMITE_WEBGL else "svg"
+        )
+        # Reta de tendência por resultado (mínimos quadrados em numpy)
+        cores_faixa = {
+            RESULTADO_VITORIA: "rgba(34,197,94,0.12)",
+            RESULTADO_EMPATE:  "rgba(234,179,8,0.12)",
+            RESULTADO_DERROTA: "rgba(239,68,68,0.12)"
+        }
+        for resultado_grupo, grupo in df_scatter.groupby("resultado", observed=True):
+            adicionar_reta_tendencia(
+                fig_posse, grupo["posse_usuario"], grupo["gols_usuario"],
+                f"Tendência {resultado_grupo}",
+                grupo["cor"].iloc[0],
+                cores_faixa.get(resultado_grupo)
+            )
+        fig_posse.update_layout(height=320, margin=dict(t=40, b=40))
+        return fig_posse
+    fig_posse = figura_em_cache("posse", df_filtrado, params_fig, _fig_posse)
     st.plotly_chart(fig_posse, use_container_width=True)
  
     # ════════════════════════════════════════════════════════════════════
@@ -626,20 +795,23 @@ with tab2:
     st.divider()
     st.markdown("## 🏠 Casa vs ✈️ Fora")
  
-    df_casa = df_filtrado[df_filtrado["local"] == LOCAL_CASA]
-    df_fora = df_filtrado[df_filtrado["local"] == LOCAL_FORA]
-    aprov_casa = calcular_aproveitamento(df_casa)
-    aprov_fora = calcular_aproveitamento(df_fora)
+    casa = kpis[LOCAL_CASA]
+    fora = kpis[LOCAL_FORA]
+    aprov_casa = casa["aproveitamento"]
+    aprov_fora = fora["aproveitamento"]
+
+    def _media_local(grupo, coluna, fmt):
+        return f"{grupo[f'media_{coluna}']:{fmt}}" if grupo["partidas"] > 0 else "—"
  
     metricas_cv = [
         ("Aproveitamento (%)",  f"{aprov_casa:.1f}",  f"{aprov_fora:.1f}"),
-        ("Vitórias",            str((df_casa["resultado"]==RESULTADO_VITORIA).sum()), str((df_fora["resultado"]==RESULTADO_VITORIA).sum())),
-        ("Empates",             str((df_casa["resultado"]==RESULTADO_EMPATE).sum()),  str((df_fora["resultado"]==RESULTADO_EMPATE).sum())),
-        ("Derrotas",            str((df_casa["resultado"]==RESULTADO_DERROTA).sum()), str((df_fora["resultado"]==RESULTADO_DERROTA).sum())),
-        ("Gols pró/jogo",       f"{df_casa['gols_usuario'].mean():.2f}" if len(df_casa)>0 else "—", f"{df_fora['gols_usuario'].mean():.2f}" if len(df_fora)>0 else "—"),
-        ("Gols sofr./jogo",     f"{df_casa['gols_adv'].mean():.2f}" if len(df_casa)>0 else "—",     f"{df_fora['gols_adv'].mean():.2f}" if len(df_fora)>0 else "—"),
-        ("xG médio",            f"{df_casa['xg_usuario'].mean():.2f}" if len(df_casa)>0 else "—",   f"{df_fora['xg_usuario'].mean():.2f}" if len(df_fora)>0 else "—"),
-        ("Posse média (%)",     f"{df_casa['posse_usuario'].mean():.1f}" if len(df_casa)>0 else "—", f"{df_fora['posse_usuario'].mean():.1f}" if len(df_fora)>0 else "—"),
+        ("Vitórias",            str(casa["vitorias"]), str(fora["vitorias"])),
+        ("Empates",             str(casa["empates"]),  str(fora["empates"])),
+        ("Derrotas",            str(casa["derrotas"]), str(fora["derrotas"])),
+        ("Gols pró/jogo",       _media_local(casa, "gols_usuario", ".2f"),  _media_local(fora, "gols_usuario", ".2f")),
+        ("Gols sofr./jogo",     _media_local(casa, "gols_adv", ".2f"),      _media_local(fora, "gols_adv", ".2f")),
+        ("xG médio",            _media_local(casa, "xg_usuario", ".2f"),    _media_local(fora, "xg_usuario", ".2f")),
+        ("Posse média (%)",     _media_local(casa, "posse_usuario", ".1f"), _media_local(fora, "posse_usuario", ".1f")),
     ]
     df_cv = pd.DataFrame(metricas_cv, columns=["Métrica", "🏠 Casa", "✈️ Fora"])
     st.dataframe(df_cv, use_container_width=True, hide_index=True)
@@ -650,50 +822,60 @@ with tab2:
     st.divider()
     st.markdown("## 📈 Tendência e Evolução")
  
-    # Média móvel de 5 jogos para gols, xG e posse
-    df_trend = df_filtrado.copy().reset_index(drop=True)
-    df_trend["gols_mm5"]  = df_trend["gols_usuario"].rolling(5, min_periods=1).mean()
-    df_trend["xg_mm5"]    = df_trend["xg_usuario"].rolling(5, min_periods=1).mean()
-    df_trend["posse_mm5"] = df_trend["posse_usuario"].rolling(5, min_periods=1).mean()
-    df_trend["aprov_mm5"] = df_trend["resultado"].map(
-        {RESULTADO_VITORIA: 100, RESULTADO_EMPATE: 33, RESULTADO_DERROTA: 0}
-    ).rolling(5, min_periods=1).mean()
- 
-    fig_trend = go.Figure()
-    fig_trend.add_trace(go.Scatter(
-        x=df_trend["data"], y=df_trend["gols_mm5"],
-        name="Gols (MM5)", line=dict(color="#22c55e", width=2)
-    ))
-    fig_trend.add_trace(go.Scatter(
-        x=df_trend["data"], y=df_trend["xg_mm5"],
-        name="xG (MM5)", line=dict(color="#3b82f6", width=2, dash="dot")
-    ))
-    fig_trend.update_layout(
-        title="Média Móvel (5 jogos) — Gols vs xG",
-        xaxis_title="Data", yaxis_title="",
-        legend=dict(orientation="h"),
-        height=280, margin=dict(t=40, b=40)
+    col_janela, col_por = st.columns([2, 1])
+    with col_janela:
+        janela_mm = st.select_slider(
+            t("tend_janela", lang), options=[3, 5, 10, 20, 38], value=5, key="dash_janela"
+        )
+    with col_por:
+        por_temporada = st.checkbox(t("tend_por_temporada", lang), key="dash_tend_temporada")
+ 
+    # Médias móveis e aproveitamento acumulado em tempo linear
+    df_trend = calcular_tendencias(
+        df_filtrado, janela=janela_mm, por="temporada" if por_temporada else None
     )
+ 
+    # Calculadas sobre o histórico inteiro; só a exibição segue o período
+    df_trend = filtrar_periodo(df_trend, "data", periodo)
+ 
+    def _fig_trend():
+        fig_trend = go.Figure()
+        for coluna, nome, linha in [
+            ("gols_mm", f"Gols (MM{janela_mm})", dict(color="#22c55e", width=2)),
+            ("xg_mm", f"xG (MM{janela_mm})", dict(color="#3b82f6", width=2, dash="dot")),
+            ("dif_xg_mm", t("tend_dif_xg", lang).format(n=janela_mm), dict(color="#a855f7", width=1, dash="dash")),
+        ]:
+            serie = reduzir_serie(df_trend, "data", coluna, limite_pontos)
+            fig_trend.add_trace(go.Scatter(x=serie["data"], y=serie[coluna], name=nome, line=linha))
+        fig_trend.update_layout(
+            title=f"Média Móvel ({janela_mm} jogos) — Gols vs xG",
+            xaxis_title="Data", yaxis_title="",
+            legend=dict(orientation="h"),
+            height=280, margin=dict(t=40, b=40)
+        )
+        return fig_trend
+    fig_trend = figura_em_cache("tendencia", df_trend[["data", "gols_mm", "xg_mm", "dif_xg_mm"]], (params_linhas, janela_mm), _fig_trend)
     st.plotly_chart(fig_trend, use_container_width=True)
  
     # Aproveitamento acumulado
-    df_trend["aprov_acum"] = [
-        calcular_aproveitamento(df_trend.iloc[:i+1]) for i in range(len(df_trend))
-    ]
-    fig_aprov = go.Figure(go.Scatter(
-        x=df_trend["data"], y=df_trend["aprov_acum"],
-        name="Aproveitamento acumulado",
-        fill="tozeroy", fillcolor="rgba(34,197,94,0.15)",
-        line=dict(color="#22c55e", width=2)
-    ))
-    fig_aprov.add_hline(y=60, line_dash="dash", line_color="#eab308",
-                        annotation_text="Meta 60%", annotation_position="bottom right")
-    fig_aprov.update_layout(
-        title="Aproveitamento Acumulado ao Longo da Temporada",
-        xaxis_title="Data", yaxis_title="Aproveitamento (%)",
-        yaxis=dict(range=[0, 105]),
-        height=260, margin=dict(t=40, b=40)
-    )
+    def _fig_aprov():
+        serie = reduzir_serie(df_trend, "data", "aprov_acum", limite_pontos)
+        fig_aprov = go.Figure(go.Scatter(
+            x=serie["data"], y=serie["aprov_acum"],
+            name="Aproveitamento acumulado",
+            fill="tozeroy", fillcolor="rgba(34,197,94,0.15)",
+            line=dict(color="#22c55e", width=2)
+        ))
+        fig_aprov.add_hline(y=60, line_dash="dash", line_color="#eab308",
+                            annotation_text="Meta 60%", annotation_position="bottom right")
+        fig_aprov.update_layout(
+            title="Aproveitamento Acumulado ao Longo da Temporada",
+            xaxis_title="Data", yaxis_title="Aproveitamento (%)",
+            yaxis=dict(range=[0, 105]),
+            height=260, margin=dict(t=40, b=40)
+        )
+        return fig_aprov
+    fig_aprov = figura_em_cache("aproveitamento", df_trend[["data", "aprov_acum"]], params_linhas, _fig_aprov)
     st.plotly_chart(fig_aprov, use_container_width=True)
 
 
@@ -704,12 +886,12 @@ with tab2:
     st.markdown("## 🌍 Comparativo — Padrão Europeu")
  
     metricas_bench = {
-        "xg_usuario":              (t("xg_por_jogo", lang),       df_filtrado["xg_usuario"].mean(), "maior"),
-        "gols_usuario":            (t("gols_por_jogo", lang),      df_filtrado["gols_usuario"].mean(), "maior"),
-        "remates_usuario":         (t("remates_por_jogo", lang),   df_filtrado["remates_usuario"].mean(), "maior"),
-        "remates_a_baliza_usuario":(t("remates_alvo_label", lang), df_filtrado["remates_a_baliza_usuario"].mean(), "maior"),
-        "posse_usuario":           (t("posse_media_label", lang),  df_filtrado["posse_usuario"].mean(), "maior"),
-        "passes_certos_usuario":   (t("passes_certos_label", lang),df_filtrado["passes_certos_usuario"].mean(), "maior"),
+        "xg_usuario":              (t("xg_por_jogo", lang),       geral["media_xg_usuario"], "maior"),
+        "gols_usuario":            (t("gols_por_jogo", lang),      geral["media_gols_usuario"], "maior"),
+        "remates_usuario":         (t("remates_por_jogo", lang),   geral["media_remates_usuario"], "maior"),
+        "remates_a_baliza_usuario":(t("remates_alvo_label", lang), geral["media_remates_a_baliza_usuario"], "maior"),
+        "posse_usuario":           (t("posse_media_label", lang),  geral["media_posse_usuario"], "maior"),
+        "passes_certos_usuario":   (t("passes_certos_label", lang),geral["media_passes_certos_usuario"], "maior"),
         "aproveitamento":          (t("aproveitamento_label", lang),aproveitamento_geral, "maior"),
     }
  
@@ -725,7 +907,7 @@ with tab2:
         })
     st.dataframe(pd.DataFrame(linhas_bench), use_container_width=True, hide_index=True)
  
-    score = calcular_score_benchmark(df_filtrado, aproveitamento_geral)
+    score = pontuar_benchmark({chave: valor for chave, (_, valor, _) in metricas_bench.items()})
     tipo_msg, msg = diagnostico_geral(score)
     if tipo_msg == "success":
         st.success(f"🎯 {msg}")
@@ -734,6 +916,50 @@ with tab2:
     else:
         st.error(f"📉 {msg}")
 
+    # ── Nível europeu ao longo do tempo (temporadas, competições e janelas móveis) ──
+    st.markdown(f"### {t('nivel_titulo', lang)}")
+    recortes_nivel = pontuacao_temporal(df_filtrado, JANELA_PADRAO)
+    movel = recortes_nivel["movel"]
+    # Só janelas completas, se houver jogos para isso
+    if len(movel) >= JANELA_PADRAO:
+        movel = movel[movel["partidas"] == JANELA_PADRAO]
+    movel = filtrar_periodo(movel, "data", periodo)
+
+    def _fig_nivel():
+        serie = reduzir_serie(movel, "data", "score", limite_pontos)
+        fig_nivel = go.Figure(go.Scatter(
+            x=serie["data"], y=serie["score"], mode="lines",
+            line=dict(color="#3b82f6", width=2, shape="hv"),
+            name=t("nivel_serie", lang).format(n=JANELA_PADRAO)
+        ))
+        # Mesmos cortes de diagnostico_geral (score >= 3 e score < -2)
+        fig_nivel.add_hrect(y0=2.5, y1=7.5, fillcolor="rgba(34,197,94,0.10)", line_width=0)
+        fig_nivel.add_hrect(y0=-7.5, y1=-2.5, fillcolor="rgba(239,68,68,0.10)", line_width=0)
+        fig_nivel.update_layout(
+            title=t("nivel_grafico", lang).format(n=JANELA_PADRAO),
+            xaxis_title=t("nivel_eixo_data", lang), yaxis_title=t("nivel_eixo_score", lang),
+            yaxis=dict(range=[-7.5, 7.5]),
+            height=280, margin=dict(t=40, b=40)
+        )
+        return fig_nivel
+    fig_nivel = figura_em_cache("nivel_europeu", movel[["data", "score"]], params_linhas, _fig_nivel)
+    st.plotly_chart(fig_nivel, use_container_width=True)
+
+    rotulos_bench = {chave: label for chave, (label, _, _) in metricas_bench.items()}
+    rotulos_status = {status: t(f"nivel_status_{chave}", lang) for status, chave in STATUS_CHAVE.items()}
+    col_nt, col_nc = st.columns(2)
+    for coluna_tab, recorte, titulo in [
+        (col_nt, "temporada", t("nivel_por_temporada", lang)),
+        (col_nc, "competicao", t("nivel_por_competicao", lang)),
+    ]:
+        tabela = recortes_nivel[recorte]
+        df_nivel = pd.DataFrame({t("nivel_col_jogos", lang): tabela["partidas"], "Score": tabela["score"]}, index=tabela.index)
+        for chave in METRICAS_BENCHMARK:
+            df_nivel[rotulos_bench.get(chave, chave)] = tabela[f"status_{chave}"].map(rotulos_status).fillna("⚪")
+        with coluna_tab:
+            st.markdown(f"**{titulo}**")
+            st.dataframe(df_nivel.rename_axis(""), use_container_width=True)
+
  
     # ════════════════════════════════════════════════════════════════════
     # SEÇÃO 7 — ANÁLISE DE JOGADORES (só aparece se tiver dados)
@@ -741,47 +967,44 @@ with tab2:
     if tem_jogadores:
         st.divider()
         st.markdown("## 👥 Análise Individual de Jogadores")
-        st.caption(f"Baseado em {df_jog['partida_id'].nunique()} partida(s) com dados de jogadores importados.")
- 
-        # Agrega por jogador (soma de contribuições, média de percentuais)
-        df_agg = df_jog.groupby("nome").agg(
-            partidas        =("partida_id", "nunique"),
-            minutos_total   =("minutos_jogados", "sum"),
-            golos           =("golos", "sum"),
-            assistencias    =("assistencias", "sum"),
-            xg_total        =("xg", "sum"),
-            xa_total        =("xa", "sum"),
-            intercepcoes    =("intercepcoes", "sum"),
-            faltas_cometidas=("faltas_cometidas", "sum"),
-            faltas_sofridas =("faltas_sofridas", "sum"),
-            passes_prog     =("passes_progressivos", "sum"),
-            passes_dec      =("passes_decisivos", "sum"),
-            fintas          =("fintas", "sum"),
-            dist_total      =("distancia_km", "sum"),
-            perc_passes_med =("perc_passes", "mean"),
-        ).reset_index()
- 
-        cols_numericas = [
-            "minutos_total", "golos", "assistencias", "xg_total",
-            "xa_total", "dist_total", "intercepcoes", "faltas_cometidas",
-            "faltas_sofridas", "passes_prog", "passes_dec", "fintas",
-            "perc_passes_med",
-        ]
-        for col in cols_numericas:
-            df_agg[col] = pd.to_numeric(df_agg[col], errors="coerce").fillna(0)
-
-        min_safe = df_agg["minutos_total"].replace(0, float("nan"))
-        df_agg["golos_90"]  = (df_agg["golos"]   / min_safe * 90).round(2)
-        df_agg["xg_90"]     = (df_agg["xg_total"] / min_safe * 90).round(2)
-        df_agg["contrib_90"]= ((df_agg["golos"] + df_agg["assistencias"]) / min_safe * 90).round(2)
-        df_agg["dist_90"]   = (df_agg["dist_total"] / min_safe * 90).round(2)
-        df_agg = df_agg.sort_values("minutos_total", ascending=False)
- 
-        tab_art, tab_rank, tab_vol, tab_criacao = st.tabs([
+        partidas_com_jogadores = contar_partidas_com_jogadores(
+            st.session_state.usuario_id, temporada=filtro_temporada, competicao=filtro_competicao
+        ) or 0
+        st.caption(f"Baseado em {partidas_com_jogadores} partida(s) com dados de jogadores importados.")
+
+        # Exportação do histórico do recorte: blocos do cursor do servidor vão
+        # direto para o CSV, sem montar todas as linhas em memória
+        if st.button(t("exportar_jogadores_preparar", lang), key="dash_exportar_jogadores"):
+            csv_jogadores = io.StringIO()
+            linhas_exportadas = 0
+            try:
+                for bloco in iterar_estatisticas_jogadores(
+                    st.session_state.usuario_id, temporada=filtro_temporada, competicao=filtro_competicao
+                ):
+                    df_bloco = pd.DataFrame(bloco)
+                    df_bloco.to_csv(csv_jogadores, index=False, header=linhas_exportadas == 0)
+                    linhas_exportadas += len(df_bloco)
+            except Exception as e:
+                print(f"Erro ao exportar estatísticas de jogadores: {e}")
+                st.error(t("exportar_jogadores_erro", lang))
+            else:
+                st.download_button(
+                    t("exportar_jogadores_baixar", lang).format(n=linhas_exportadas),
+                    data=csv_jogadores.getvalue(),
+                    file_name="estatisticas_jogadores.csv",
+                    mime="text/csv",
+                )
+ 
+        # Totais por jogador vêm de agregados_jogadores, já com as colunas /90
+        # e ordenados por minutos
+ 
+        tab_art, tab_rank, tab_vol, tab_criacao, tab_forma, tab_sim = st.tabs([
             "🥇 Artilheiros & Assistentes",
             "📊 Ranking Completo",
             "🏃 Físico",
-            "🎯 Criação"
+            "🎯 Criação",
+            t("forma_tab", lang),
+            t("jog_semelhantes_tab", lang)
         ])
  
         with tab_art:
@@ -797,15 +1020,18 @@ with tab2:
                 st.dataframe(top_gols, hide_index=True, use_container_width=True)
  
                 if len(df_agg[df_agg["golos"] > 0]) > 0:
-                    fig_gols = px.bar(
-                        df_agg[df_agg["golos"] > 0].nlargest(8, "golos"),
-                        x="nome", y=["golos", "xg_total"],
-                        barmode="group",
-                        color_discrete_map={"golos": "#22c55e", "xg_total": "#3b82f6"},
-                        labels={"nome": "", "value": "", "variable": ""},
-                        title="Gols vs xG por Jogador"
-                    )
-                    fig_gols.update_layout(height=280, margin=dict(t=40, b=60), showlegend=True)
+                    def _fig_gols():
+                        fig_gols = px.bar(
+                            df_agg[df_agg["golos"] > 0].nlargest(8, "golos"),
+                            x="nome", y=["golos", "xg_total"],
+                            barmode="group",
+                            color_discrete_map={"golos": "#22c55e", "xg_total": "#3b82f6"},
+                            labels={"nome": "", "value": "", "variable": ""},
+                            title="Gols vs xG por Jogador"
+                        )
+                        fig_gols.update_layout(height=280, margin=dict(t=40, b=60), showlegend=True)
+                        return fig_gols
+                    fig_gols = figura_em_cache("gols_jogadores", df_agg, params_fig, _fig_gols)
                     st.plotly_chart(fig_gols, use_container_width=True)
  
             with col_a:
@@ -855,15 +1081,18 @@ with tab2:
             st.dataframe(df_vol, hide_index=True, use_container_width=True, height=400)
  
             # Top distância percorrida
-            fig_dist = px.bar(
-                df_agg.nlargest(10, "dist_total"),
-                x="nome", y="dist_total",
-                color="dist_90",
-                color_continuous_scale="Viridis",
-                labels={"nome": "", "dist_total": "Dist. Total (km)", "dist_90": "Dist./90"},
-                title="Top 10 — Distância Total Percorrida"
-            )
-            fig_dist.update_layout(height=300, margin=dict(t=40, b=60))
+            def _fig_dist():
+                fig_dist = px.bar(
+                    df_agg.nlargest(10, "dist_total"),
+                    x="nome", y="dist_total",
+                    color="dist_90",
+                    color_continuous_scale="Viridis",
+                    labels={"nome": "", "dist_total": "Dist. Total (km)", "dist_90": "Dist./90"},
+                    title="Top 10 — Distância Total Percorrida"
+                )
+                fig_dist.update_layout(height=300, margin=dict(t=40, b=60))
+                return fig_dist
+            fig_dist = figura_em_cache("distancia", df_agg, params_fig, _fig_dist)
             st.plotly_chart(fig_dist, use_container_width=True)
  
         with tab_criacao:
@@ -883,21 +1112,150 @@ with tab2:
             with col_pp:
                 top_pp = df_agg[df_agg["passes_prog"] > 0].nlargest(8, "passes_prog")
                 if not top_pp.empty:
-                    fig_pp = px.bar(top_pp, x="nome", y="passes_prog",
-                                    title="Top Passes Progressivos",
-                                    labels={"nome": "", "passes_prog": ""},
-                                    color_discrete_sequence=["#3b82f6"])
-                    fig_pp.update_layout(height=260, margin=dict(t=40, b=60))
+                    def _fig_pp():
+                        fig_pp = px.bar(top_pp, x="nome", y="passes_prog",
+                                        title="Top Passes Progressivos",
+                                        labels={"nome": "", "passes_prog": ""},
+                                        color_discrete_sequence=["#3b82f6"])
+                        fig_pp.update_layout(height=260, margin=dict(t=40, b=60))
+                        return fig_pp
+                    fig_pp = figura_em_cache("passes_prog", top_pp, params_fig, _fig_pp)
                     st.plotly_chart(fig_pp, use_container_width=True)
             with col_pd:
                 top_pd = df_agg[df_agg["passes_dec"] > 0].nlargest(8, "passes_dec")
                 if not top_pd.empty:
-                    fig_pd = px.bar(top_pd, x="nome", y="passes_dec",
-                                    title="Top Passes Decisivos",
-                                    labels={"nome": "", "passes_dec": ""},
-                                    color_discrete_sequence=["#a855f7"])
-                    fig_pd.update_layout(height=260, margin=dict(t=40, b=60))
+                    def _fig_pd():
+                        fig_pd = px.bar(top_pd, x="nome", y="passes_dec",
+                                        title="Top Passes Decisivos",
+                                        labels={"nome": "", "passes_dec": ""},
+                                        color_discrete_sequence=["#a855f7"])
+                        fig_pd.update_layout(height=260, margin=dict(t=40, b=60))
+                        return fig_pd
+                    fig_pd = figura_em_cache("passes_dec", top_pd, params_fig, _fig_pd)
                     st.plotly_chart(fig_pd, use_container_width=True)
+
+        with tab_forma:
+            st.markdown(f"**{t('forma_titulo', lang)}**")
+            col_tipo, col_n, col_met = st.columns([1, 2, 1])
+            with col_tipo:
+                tipo_janela = st.radio(
+                    t("forma_janela", lang), ["jogos", "dias"],
+                    format_func=lambda v: t(f"forma_janela_{v}", lang), horizontal=True, key="dash_forma_tipo"
+                )
+            with col_n:
+                if tipo_janela == "jogos":
+                    tamanho_janela = st.select_slider(
+                        t("forma_ultimos_jogos", lang), options=[3, 5, 10, 20], value=5, key="dash_forma_jogos"
+                    )
+                    janela_forma = {"jogos": tamanho_janela}
+                else:
+                    tamanho_janela = st.select_slider(
+                        t("forma_ultimos_dias", lang), options=[30, 60, 90, 180, 365], value=90, key="dash_forma_dias"
+                    )
+                    janela_forma = {"dias": tamanho_janela}
+            rotulos_forma = dict(METRICAS_FORMA)
+            with col_met:
+                metrica_forma = st.selectbox(
+                    t("forma_metrica", lang), list(rotulos_forma), format_func=rotulos_forma.get, key="dash_forma_metrica"
+                )
+
+            # Uma passada vetorizada para o elenco inteiro
+            df_series = buscar_series_jogadores_df(
+                st.session_state.usuario_id, temporada=filtro_temporada, competicao=filtro_competicao
+            )
+            df_forma = calcular_forma(df_series, **janela_forma) if not df_series.empty else pd.DataFrame()
+
+            if df_forma.empty:
+                st.info(t("forma_sem_dados", lang))
+            else:
+                atual = forma_atual(df_forma).sort_values(metrica_forma, ascending=False)
+                df_atual = atual[["nome", "jogos", "minutos"] + [c for c, _ in METRICAS_FORMA]].copy()
+                df_atual.columns = [t("forma_col_jogador", lang), t("forma_col_jogos", lang), "Min"] + [
+                    r for _, r in METRICAS_FORMA
+                ]
+                st.dataframe(df_atual.round(2), hide_index=True, use_container_width=True, height=360)
+
+                # Mais utilizados primeiro (df_agg já vem ordenado por minutos)
+                com_forma = set(atual["nome"])
+                nomes_forma = [n for n in df_agg["nome"] if n in com_forma]
+                selecionados = st.multiselect(t("forma_jogadores", lang), nomes_forma, default=nomes_forma[:5])
+                if selecionados:
+                    serie_forma = df_forma[df_forma["nome"].isin(selecionados)][["data", "nome", metrica_forma]]
+
+                    def _fig_forma():
+                        fig_forma = px.line(
+                            serie_forma.assign(nome=serie_forma["nome"].astype(str)),
+                            x="data", y=metrica_forma, color="nome",
+                            labels={"data": "", "nome": "", metrica_forma: rotulos_forma[metrica_forma]},
+                            title=t(f"forma_grafico_{tipo_janela}", lang).format(
+                                metrica=rotulos_forma[metrica_forma], n=tamanho_janela
+                            )
+                        )
+                        fig_forma.update_layout(height=320, margin=dict(t=40, b=40), legend=dict(orientation="h"))
+                        return fig_forma
+                    fig_forma = figura_em_cache(
+                        "forma_jogadores", serie_forma, (params_fig, tipo_janela, tamanho_janela), _fig_forma
+                    )
+                    st.plotly_chart(fig_forma, use_container_width=True)
+
+        with tab_sim:
+            st.markdown(f"**{t('jog_semelhantes_titulo', lang)}**")
+            # Montado uma vez por versão dos dados; cada busca é uma conta vetorizada
+            indice_perfis = indice_perfis_do_usuario(
+                st.session_state.usuario_id, temporada=filtro_temporada, competicao=filtro_competicao
+            )
+
+            if len(indice_perfis) < 2:
+                st.info(t("jog_semelhantes_poucos", lang).format(minutos=MINUTOS_MINIMOS))
+            else:
+                perfis = indice_perfis.perfis
+                nomes_perfis = dict(zip(perfis["jogador_id"], perfis["nome"]))
+                col_jog, col_k = st.columns([2, 1])
+                with col_jog:
+                    jogador_ref = st.selectbox(t("jog_semelhantes_jogador", lang), list(nomes_perfis), format_func=nomes_perfis.get)
+                # Sem key: o máximo muda com o filtro e um valor salvo poderia ficar fora dele
+                k_maximo = min(10, len(indice_perfis) - 1)
+                with col_k:
+                    k_semelhantes = st.slider(
+                        t("jog_semelhantes_qtd", lang), min_value=1, max_value=k_maximo, value=min(5, k_maximo)
+                    ) if k_maximo > 1 else 1
+
+                vizinhos = indice_perfis.semelhantes(jogador_ref, k=k_semelhantes)
+                rotulos_perfil = {coluna: rotulo for coluna, _, rotulo in DIMENSOES_PERFIL}
+                df_viz = vizinhos[["nome", "distancia", "minutos_total"] + list(rotulos_perfil)].rename(
+                    columns={
+                        "nome": t("jog_semelhantes_jogador", lang),
+                        "distancia": t("jog_semelhantes_col_distancia", lang),
+                        "minutos_total": "Min",
+                        **rotulos_perfil,
+                    }
+                )
+                st.dataframe(df_viz.round(2), hide_index=True, use_container_width=True)
+                st.caption(t("jog_semelhantes_legenda", lang))
+
+                # Perfil padronizado do jogador e dos 3 mais próximos
+                comparados = [jogador_ref] + list(vizinhos["jogador_id"][:3])
+                perfis_z = pd.DataFrame(
+                    [indice_perfis.padronizado(j) for j in comparados],
+                    columns=list(rotulos_perfil.values()),
+                    index=[nomes_perfis[j] for j in comparados],
+                )
+
+                def _fig_sim():
+                    fig_sim = go.Figure()
+                    for nome_jog, linha in perfis_z.iterrows():
+                        fig_sim.add_trace(go.Scatterpolar(
+                            r=list(linha.values) + [linha.values[0]],
+                            theta=list(perfis_z.columns) + [perfis_z.columns[0]],
+                            name=nome_jog,
+                        ))
+                    fig_sim.update_layout(
+                        title=t("jog_semelhantes_grafico", lang),
+                        height=380, margin=dict(t=50, b=30), legend=dict(orientation="h")
+                    )
+                    return fig_sim
+                fig_sim = figura_em_cache("jogadores_semelhantes", perfis_z, params_fig, _fig_sim)
+                st.plotly_chart(fig_sim, use_container_width=True)
  
    
 
@@ -905,10 +1263,12 @@ with tab2:
 # =======================
 # TAB 3: HISTÓRICO
 # =======================
-with tab3:
+if vista == "historico":
     st.subheader(t("historico_titulo", lang))
 
-    if not partidas:
+    df = contexto.partidas()
+
+    if df.empty:
         st.info(t("nenhuma_partida_hist", lang))
         st.stop()
 
@@ -924,6 +1284,53 @@ with tab3:
         hide_index=True
     )
 
+    # ── Partidas semelhantes (índice por usuário, remontado após cada escrita) ──
+    st.divider()
+    st.subheader(t("semelhantes_titulo", lang))
+
+    if len(df) < 2:
+        st.info(t("semelhantes_poucas", lang))
+    else:
+        from similaridade import indice_partidas_do_usuario
+
+        rotulos_partidas = {
+            p.id: f"{p.data:%d/%m/%Y} - {p.time_usuario} {p.gols_usuario}x{p.gols_adv} {p.time_adv}"
+            for p in df.itertuples(index=False)
+        }
+        col_ref, col_qtd = st.columns([3, 1])
+        with col_ref:
+            partida_ref = st.selectbox(
+                t("semelhantes_selecionar", lang),
+                options=df["id"].iloc[::-1].tolist(),
+                format_func=rotulos_partidas.get,
+            )
+        with col_qtd:
+            qtd_semelhantes = st.number_input(
+                t("semelhantes_qtd", lang), min_value=1, max_value=min(20, len(df) - 1), value=min(5, len(df) - 1)
+            )
+
+        semelhantes = indice_partidas_do_usuario(st.session_state.usuario_id).semelhantes(
+            partida_ref, k=int(qtd_semelhantes)
+        )
+        if not semelhantes.empty:
+            contagem = semelhantes["resultado"].astype(object).value_counts()
+            st.caption(t("semelhantes_resumo", lang).format(
+                n=len(semelhantes),
+                v=contagem.get(RESULTADO_VITORIA, 0),
+                e=contagem.get(RESULTADO_EMPATE, 0),
+                d=contagem.get(RESULTADO_DERROTA, 0),
+            ))
+            semelhantes["data"] = semelhantes["data"].dt.strftime("%d/%m/%Y")
+            semelhantes["distancia"] = semelhantes["distancia"].round(2)
+            st.dataframe(
+                semelhantes[[
+                    "data", "gols_usuario", "gols_adv", "time_adv", "resultado",
+                    "local", "competicao", "temporada", "distancia"
+                ]],
+                use_container_width=True,
+                hide_index=True
+            )
+
     st.divider()
     st.subheader(t("gerenciar_titulo", lang))
 
@@ -0,0 +1,51 @@
+"""
+Aquecimento do servidor
+
+Na primeira execução de qualquer página (uma vez por processo, via
+st.cache_resource) dispara uma thread que importa os módulos pesados do
+dashboard e abre as conexões mínimas do pool. A página não espera a
+thread: o primeiro usuário não paga esse custo na requisição dele.
+"""
+
+import importlib
+import threading
+import time
+
+import streamlit as st
+
+from conexao import obter_pool
+
+# Módulos usados só no dashboard/importação, carregados sob demanda pelo app
+MODULOS_AQUECIMENTO = [
+    "numpy", "pandas", "plotly.express", "plotly.graph_objects", "plotly.io", "bs4",
+    "metricas", "tendencias", "forma", "similaridade", "nivel_europeu", "graficos", "cache_figuras",
+]
+
+
+def _aquecer(estado):
+    inicio = time.perf_counter()
+
+    for modulo in MODULOS_AQUECIMENTO:
+        try:
+            importlib.import_module(modulo)
+        except Exception as e:
+            print(f"Erro ao pré-carregar {modulo}: {e}")
+    estado["imports_s"] = time.perf_counter() - inicio
+
+    try:
+        pool = obter_pool()
+        conexoes = [pool.obter() for _ in range(pool.minconn)]
+        for conn in conexoes:
+            pool.devolver(conn)
+    except Exception as e:
+        print(f"Erro ao abrir conexões do pool: {e}")
+    estado["total_s"] = time.perf_counter() - inicio
+    estado["concluido"] = True
+
+
+@st.cache_resource(show_spinner=False)
+def iniciar_aquecimento():
+    """Dispara o aquecimento uma única vez por processo e retorna o estado dele."""
+    estado = {"concluido": False}
+    threading.Thread(target=_aquecer, args=(estado,), daemon=True, name="aquecimento").start()
+    return estado
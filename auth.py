@@ -1,21 +1,5 @@
-import psycopg2
-import streamlit as st
-
-# =======================
-# CONEXÃO
-# =======================
-import psycopg2
-import streamlit as st
-
-def conectar():
-    return psycopg2.connect(
-        host=st.secrets["DB_HOST"],
-        database=st.secrets["DB_NAME"],
-        user=st.secrets["DB_USER"],
-        password=st.secrets["DB_PASSWORD"],
-        port=st.secrets["DB_PORT"],
-        sslmode="require"
-    )
+from cache import em_cache
+from conexao import conectar, devolver_conexao
 
 # =======================
 # CRIAR USUÁRIO
@@ -41,7 +25,7 @@ def criar_usuario(usuario, senha):
         return None
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
 
 # =======================
 # BUSCAR USUÁRIO
@@ -62,11 +46,13 @@ def buscar_usuario_por_usuario(usuario):
         return None
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
 
 # =======================
 # BUSCAR USUÁRIO POR ID
 # =======================
+# TTL curto: plano e expiração são alterados fora do app
+@em_cache(ttl_s=60)
 def buscar_usuario(usuario_id):
     conn = conectar()
     cursor = conn.cursor()
@@ -94,7 +80,7 @@ def buscar_usuario(usuario_id):
         return None
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
 
 # =======================
 # LOGIN
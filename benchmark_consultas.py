@@ -0,0 +1,264 @@
+"""
+Benchmark de planos de consulta do database.py
+
+Cria um usuário temporário com um histórico sintético (temporadas ×
+partidas × jogadores), executa cada função de database.py registrando os
+comandos SQL enviados e roda EXPLAIN ANALYZE em cada um. O relatório
+mostra tempo de planejamento/execução e se houve Seq Scan em tabelas
+grandes, para detectar regressões de plano.
+
+    python benchmark_consultas.py [--temporadas 5] [--partidas 50] [--jogadores 20]
+                                  [--saida plano.json] [--comparar plano_anterior.json]
+
+Os dados sintéticos são apagados ao final.
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+
+import psycopg2.extensions
+from psycopg2.extras import execute_values
+
+import database
+from cache import limpar_cache
+from conexao import conectar, devolver_conexao
+from utils import RESULTADO_VITORIA, RESULTADO_EMPATE, RESULTADO_DERROTA, LOCAL_CASA, LOCAL_FORA
+
+# Tabelas em que um Seq Scan indica índice faltando
+TABELAS_GRANDES = {"partidas", "estatisticas_jogadores", "resumo_temporadas", "agregados_jogadores"}
+
+# Aumento de tempo de execução (vs. --comparar) considerado regressão
+LIMIAR_REGRESSAO = 1.5
+
+
+# =======================
+# CURSOR QUE REGISTRA O SQL
+# =======================
+class CursorGravador(psycopg2.extensions.cursor):
+    """Cursor que guarda cada comando (já com parâmetros) executado."""
+
+    comandos = []
+
+    def execute(self, query, vars=None):
+        sql = psycopg2.extensions.cursor(self.connection).mogrify(query, vars)
+        CursorGravador.comandos.append(sql.decode() if isinstance(sql, bytes) else sql)
+        return super().execute(query, vars)
+
+
+# =======================
+# DADOS SINTÉTICOS
+# =======================
+def semear_dados(cursor, temporadas, partidas_por_temporada, jogadores_por_partida):
+    """Cria o usuário de benchmark com histórico sintético. Retorna o usuario_id."""
+    rnd = random.Random(42)
+    cursor.execute(
+        "INSERT INTO usuarios (usuario, senha) VALUES (%s, %s) RETURNING id",
+        (f"__benchmark_{int(time.time())}", "benchmark")
+    )
+    usuario_id = cursor.fetchone()[0]
+
+    partidas = []
+    inicio = date(2025, 8, 1)
+    for t in range(temporadas):
+        for p in range(partidas_por_temporada):
+            gols_u, gols_a = rnd.randint(0, 4), rnd.randint(0, 3)
+            resultado = (
+                RESULTADO_VITORIA if gols_u > gols_a
+                else RESULTADO_DERROTA if gols_u < gols_a
+                else RESULTADO_EMPATE
+            )
+            posse = rnd.randint(30, 70)
+            partidas.append((
+                usuario_id, "Benchmark FC", f"Adversário {rnd.randint(1, 20)}",
+                rnd.choice([LOCAL_CASA, LOCAL_FORA]), rnd.choice(["Liga", "Taça", "Europa"]),
+                f"{2025 + t}/{26 + t}", inicio + timedelta(days=365 * t + 4 * p), p + 1,
+                posse, rnd.randint(5, 20), gols_u + rnd.randint(0, 5), round(rnd.uniform(0.2, 3.0), 2),
+                rnd.randint(0, 4), rnd.randint(0, 10), rnd.randint(300, 700), rnd.randint(250, 600),
+                rnd.randint(5, 30), rnd.randint(1, 10), gols_u,
+                100 - posse, rnd.randint(5, 20), gols_a + rnd.randint(0, 5), round(rnd.uniform(0.2, 3.0), 2),
+                rnd.randint(0, 4), rnd.randint(0, 10), rnd.randint(300, 700), rnd.randint(250, 600),
+                rnd.randint(5, 30), rnd.randint(1, 10), gols_a, resultado,
+            ))
+
+    ids = execute_values(cursor, f"""
+        INSERT INTO partidas ({", ".join(c for c in database.COLUNAS_PARTIDAS if c != "id")})
+        VALUES %s RETURNING id
+    """, partidas, page_size=1000, fetch=True)
+
+    ids_jogadores, _ = database._resolver_ids_jogadores(
+        cursor, usuario_id, [f"Jogador {j + 1}" for j in range(jogadores_por_partida)]
+    )
+
+    jogadores = []
+    for (partida_id,) in ids:
+        for j in range(jogadores_por_partida):
+            jogadores.append((
+                partida_id, usuario_id, ids_jogadores[f"Jogador {j + 1}"], str(j + 1), f"Jogador {j + 1}", rnd.randint(1, 90),
+                round(rnd.uniform(1, 12), 1), rnd.randint(50, 95), round(rnd.uniform(0, 0.8), 2),
+                rnd.randint(0, 1), round(rnd.uniform(0, 1), 2), rnd.randint(0, 1),
+                *[rnd.randint(0, 10) for _ in range(len(database.CAMPOS_ESTATISTICAS_JOGADOR) - 9)],
+            ))
+
+    colunas = ["partida_id", "usuario_id", "jogador_id"] + [campo for campo, _ in database.CAMPOS_ESTATISTICAS_JOGADOR]
+    execute_values(
+        cursor,
+        f"INSERT INTO estatisticas_jogadores ({', '.join(colunas)}) VALUES %s",
+        jogadores, page_size=5000
+    )
+
+    filtro = {"usuario_id": usuario_id}
+    database._aplicar_delta_resumo_temporadas(cursor, "usuario_id = %(usuario_id)s", filtro, +1)
+    database._aplicar_delta_agregados_jogadores(cursor, "e.usuario_id = %(usuario_id)s", filtro, +1)
+    cursor.execute("ANALYZE partidas; ANALYZE estatisticas_jogadores;")
+    return usuario_id, [pid for (pid,) in ids]
+
+
+def apagar_dados(cursor, usuario_id):
+    cursor.execute("DELETE FROM resumo_temporadas WHERE usuario_id = %s", (usuario_id,))
+    cursor.execute("DELETE FROM agregados_jogadores WHERE usuario_id = %s", (usuario_id,))
+    cursor.execute("DELETE FROM estatisticas_jogadores WHERE usuario_id = %s", (usuario_id,))
+    cursor.execute("DELETE FROM jogadores WHERE usuario_id = %s", (usuario_id,))
+    cursor.execute("DELETE FROM partidas WHERE usuario_id = %s", (usuario_id,))
+    cursor.execute("DELETE FROM usuarios WHERE id = %s", (usuario_id,))
+
+
+# =======================
+# CASOS
+# =======================
+def casos_benchmark(usuario_id, partida_ids):
+    """(nome, função sem argumentos) para cada caminho de database.py."""
+    pid = partida_ids[len(partida_ids) // 2]
+    partida_nova = (
+        usuario_id, "Benchmark FC", "Adversário X", LOCAL_CASA, "Liga", "2025/26", date(2025, 8, 2), 1,
+        55, 12, 5, 1.4, 2, 5, 500, 430, 15, 4, 2,
+        45, 9, 3, 0.9, 1, 3, 400, 320, 12, 3, 1, RESULTADO_VITORIA,
+    )
+    return [
+        ("buscar_partidas", lambda: database.buscar_partidas(usuario_id)),
+        ("buscar_partidas_df", lambda: database.buscar_partidas_df(usuario_id)),
+        ("buscar_partidas_filtradas", lambda: database.buscar_partidas_filtradas(usuario_id, "2025/26", "Liga")),
+        ("buscar_resumo_dashboard", lambda: database.buscar_resumo_dashboard(usuario_id)),
+        ("buscar_estatisticas_jogadores", lambda: database.buscar_estatisticas_jogadores(pid, usuario_id)),
+        ("buscar_todas_estatisticas_jogadores", lambda: database.buscar_todas_estatisticas_jogadores(usuario_id)),
+        ("iterar_estatisticas_jogadores", lambda: list(database.iterar_estatisticas_jogadores(usuario_id))),
+        ("buscar_agregados_jogadores", lambda: database.buscar_agregados_jogadores(usuario_id)),
+        ("contar_partidas_com_jogadores", lambda: database.contar_partidas_com_jogadores(usuario_id)),
+        ("buscar_ids_partidas_com_jogadores", lambda: database.buscar_ids_partidas_com_jogadores(usuario_id)),
+        ("contar_partidas_usuario", lambda: database.contar_partidas_usuario(usuario_id)),
+        ("inserir_partida", lambda: database.inserir_partida(partida_nova)),
+        ("inserir_estatisticas_jogadores", lambda: database.inserir_estatisticas_jogadores(
+            pid, usuario_id, database.buscar_estatisticas_jogadores(pid, usuario_id))),
+        ("deletar_partida", lambda: database.deletar_partida(partida_ids[0], usuario_id)),
+    ]
+
+
+def _nos_do_plano(no):
+    yield no
+    for filho in no.get("Plans", []):
+        yield from _nos_do_plano(filho)
+
+
+def explicar(cursor, sql):
+    """Roda EXPLAIN ANALYZE (em transação desfeita ao final) e resume o plano."""
+    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+    plano = cursor.fetchone()[0][0]
+    cursor.connection.rollback()
+
+    nos = list(_nos_do_plano(plano["Plan"]))
+    return {
+        "planejamento_ms": plano.get("Planning Time", 0.0),
+        "execucao_ms": plano.get("Execution Time", 0.0),
+        "no_raiz": plano["Plan"]["Node Type"],
+        "seq_scans": sorted({
+            n["Relation Name"] for n in nos
+            if n["Node Type"] == "Seq Scan" and n.get("Relation Name") in TABELAS_GRANDES
+        }),
+        "indices": sorted({n["Index Name"] for n in nos if "Index Name" in n}),
+    }
+
+
+# =======================
+# EXECUÇÃO
+# =======================
+def executar(temporadas, partidas_por_temporada, jogadores_por_partida):
+    conn = conectar()
+    conn_gravadora = database.conectar()
+    conn_gravadora.cursor_factory = CursorGravador
+    cursor = conn.cursor()
+    usuario_id = None
+
+    conectar_original, devolver_original = database.conectar, database.devolver_conexao
+    resultados = []
+
+    try:
+        usuario_id, partida_ids = semear_dados(cursor, temporadas, partidas_por_temporada, jogadores_por_partida)
+        conn.commit()
+
+        # As funções de database.py passam a usar a conexão gravadora
+        database.conectar = lambda: conn_gravadora
+        database.devolver_conexao = lambda c: c.rollback()
+
+        for nome, funcao in casos_benchmark(usuario_id, partida_ids):
+            # Sem cache: cada caso precisa chegar ao banco para ter o SQL gravado
+            limpar_cache()
+            CursorGravador.comandos = []
+            inicio = time.perf_counter()
+            funcao()
+            total_ms = (time.perf_counter() - inicio) * 1000
+
+            for i, sql in enumerate(CursorGravador.comandos):
+                if sql.lstrip().upper().startswith(("DECLARE", "FETCH", "CLOSE")):
+                    continue
+                resultado = {"consulta": nome if i == 0 else f"{nome}#{i}", "total_python_ms": total_ms}
+                resultado.update(explicar(cursor, sql))
+                resultados.append(resultado)
+
+        return resultados
+
+    finally:
+        database.conectar, database.devolver_conexao = conectar_original, devolver_original
+        conn_gravadora.cursor_factory = psycopg2.extensions.cursor
+        conn_gravadora.rollback()
+        database.devolver_conexao(conn_gravadora)
+        if usuario_id is not None:
+            conn.rollback()
+            apagar_dados(cursor, usuario_id)
+            conn.commit()
+        devolver_conexao(conn)
+
+
+def imprimir(resultados, anteriores=None):
+    anteriores = {r["consulta"]: r for r in (anteriores or [])}
+    print(f"{'consulta':<42} {'plan ms':>8} {'exec ms':>9}  {'nó raiz':<18} seq scans / regressão")
+    print("-" * 110)
+    for r in resultados:
+        alerta = ", ".join(r["seq_scans"])
+        anterior = anteriores.get(r["consulta"])
+        if anterior and anterior["execucao_ms"] > 0 and r["execucao_ms"] > anterior["execucao_ms"] * LIMIAR_REGRESSAO:
+            alerta += f"  ⚠️ {anterior['execucao_ms']:.2f} → {r['execucao_ms']:.2f} ms"
+        print(f"{r['consulta']:<42} {r['planejamento_ms']:>8.2f} {r['execucao_ms']:>9.2f}  {r['no_raiz']:<18} {alerta}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--temporadas", type=int, default=5)
+    parser.add_argument("--partidas", type=int, default=50, help="partidas por temporada")
+    parser.add_argument("--jogadores", type=int, default=20, help="jogadores por partida")
+    parser.add_argument("--saida", help="grava os resultados em JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    args = parser.parse_args()
+
+    resultados = executar(args.temporadas, args.partidas, args.jogadores)
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anteriores = json.load(f)
+    imprimir(resultados, anteriores)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
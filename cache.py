@@ -0,0 +1,186 @@
+"""
+Cache de leituras por usuário, versionado e invalidado nas escritas
+
+Cada usuário tem um número de versão dos seus dados. As funções de escrita
+de database.py chamam invalidar_usuario() depois do commit; a versão muda e
+as entradas antigas deixam de ser alcançáveis (e são descartadas na hora).
+O cache vive no processo do Streamlit e é compartilhado entre as sessões.
+"""
+
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+# =======================
+# CONFIGURAÇÃO
+# =======================
+TTL_PADRAO_S = 300.0
+MAX_ENTRADAS_PADRAO = 512
+
+
+# =======================
+# CLASSE DO CACHE
+# =======================
+class CacheVersionado:
+    """
+    Cache LRU thread-safe com TTL por entrada, chaveado por
+    (função, usuário, versão dos dados do usuário, argumentos).
+    """
+
+    def __init__(self, max_entradas=MAX_ENTRADAS_PADRAO):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._versoes = {}
+        self._geracao = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "expiradas": 0,
+            "despejadas": 0,
+            "invalidacoes": 0,
+        }
+
+    def versao(self, usuario_id):
+        """Versão atual dos dados do usuário (geração global, versão do usuário)."""
+        with self._lock:
+            return self._geracao, self._versoes.get(usuario_id, 0)
+
+    def obter(self, chave, copiar=True):
+        """Retorna (True, cópia do valor) se houver entrada válida, senão (False, None)."""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self._stats["misses"] += 1
+                return False, None
+
+            valor, expira_em = entrada
+            if time.monotonic() >= expira_em:
+                del self._entradas[chave]
+                self._stats["expiradas"] += 1
+                self._stats["misses"] += 1
+                return False, None
+
+            self._entradas.move_to_end(chave)
+            self._stats["hits"] += 1
+
+        return True, copy.deepcopy(valor) if copiar else valor
+
+    def guardar(self, chave, valor, ttl_s, copiar=True):
+        """Guarda uma cópia do valor, despejando as entradas menos usadas se passar do limite."""
+        usuario_id, versao = chave[1], chave[2]
+        if copiar:
+            valor = copy.deepcopy(valor)
+
+        with self._lock:
+            # Uma escrita pode ter acontecido enquanto a leitura rodava
+            if (self._geracao, self._versoes.get(usuario_id, 0)) != versao:
+                return
+
+            self._entradas[chave] = (valor, time.monotonic() + ttl_s)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._stats["despejadas"] += 1
+
+    def invalidar(self, usuario_id):
+        """Avança a versão dos dados do usuário e descarta as entradas dele."""
+        with self._lock:
+            self._versoes[usuario_id] = self._versoes.get(usuario_id, 0) + 1
+            for chave in [c for c in self._entradas if c[1] == usuario_id]:
+                del self._entradas[chave]
+            self._stats["invalidacoes"] += 1
+
+    def limpar(self):
+        """Invalida todos os usuários (ex.: após reconstruir as tabelas de resumo)."""
+        with self._lock:
+            self._geracao += 1
+            self._entradas.clear()
+            self._stats["invalidacoes"] += 1
+
+    def estatisticas(self):
+        """Retorna um snapshot dos contadores (hits, misses, despejos...)."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entradas"] = len(self._entradas)
+        consultas = stats["hits"] + stats["misses"]
+        stats["taxa_acerto"] = stats["hits"] / consultas if consultas else 0.0
+        return stats
+
+
+# =======================
+# CACHE GLOBAL DO PROCESSO
+# =======================
+_cache_global = CacheVersionado()
+
+
+def em_cache(ttl_s=TTL_PADRAO_S, cachear_vazio=False, copiar=True):
+    """
+    Decorador para funções de leitura que recebem `usuario_id`.
+    Chamadas sem usuário (usuario_id=None) não passam pelo cache.
+
+    Args:
+        ttl_s:         Tempo de vida das entradas, em segundos
+        cachear_vazio: Guarda também resultados None/vazios (que podem vir de um erro)
+        copiar:        Se False, devolve o próprio objeto guardado (só para valores imutáveis)
+    """
+    def decorador(funcao):
+        assinatura = inspect.signature(funcao)
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            argumentos = assinatura.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            usuario_id = argumentos.arguments.get("usuario_id")
+            if usuario_id is None:
+                return funcao(*args, **kwargs)
+
+            chave = (
+                funcao.__qualname__,
+                usuario_id,
+                _cache_global.versao(usuario_id),
+                repr(sorted(argumentos.arguments.items())),
+            )
+            encontrado, valor = _cache_global.obter(chave, copiar)
+            if encontrado:
+                return valor
+
+            valor = funcao(*args, **kwargs)
+            if cachear_vazio or _preenchido(valor):
+                _cache_global.guardar(chave, valor, ttl_s, copiar)
+            return valor
+
+        envolvida.sem_cache = funcao
+        return envolvida
+
+    return decorador
+
+
+def _preenchido(valor):
+    if valor is None:
+        return False
+    if hasattr(valor, "empty"):
+        return not valor.empty
+    if hasattr(valor, "__len__"):
+        return len(valor) > 0
+    return True
+
+
+def invalidar_usuario(usuario_id):
+    """Chamada pelas escritas depois do commit: dados do usuário mudaram."""
+    if usuario_id is None:
+        _cache_global.limpar()
+    else:
+        _cache_global.invalidar(usuario_id)
+
+
+def limpar_cache():
+    _cache_global.limpar()
+
+
+def estatisticas_cache():
+    """Hits, misses, expiradas, despejadas, invalidações e taxa de acerto."""
+    return _cache_global.estatisticas()
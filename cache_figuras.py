@@ -0,0 +1,130 @@
+"""
+Cache de figuras Plotly do dashboard
+
+A chave de cada figura é um hash dos dados que ela desenha (o recorte do
+DataFrame/Series), dos filtros e do idioma. A figura é guardada como o
+dict do Plotly (to_plotly_json), num LRU limitado por memória; se nada
+mudou, o rerun remonta a figura desse dict sem validá-la de novo, o que
+custa bem menos que reconstruí-la.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# =======================
+# CONFIGURAÇÃO
+# =======================
+ORCAMENTO_PADRAO_MB = 64
+
+
+# =======================
+# IMPRESSÃO DIGITAL DOS DADOS
+# =======================
+def impressao_digital(*partes):
+    """Hash estável de DataFrames, Series e valores simples (filtros, idioma...)."""
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        if isinstance(parte, pd.DataFrame):
+            h.update(repr(list(parte.columns)).encode())
+            h.update(repr(list(parte.dtypes)).encode())
+            h.update(pd.util.hash_pandas_object(parte, index=True).to_numpy().tobytes())
+        elif isinstance(parte, pd.Series):
+            h.update(repr(parte.name).encode())
+            h.update(repr(parte.dtype).encode())
+            h.update(pd.util.hash_pandas_object(parte, index=True).to_numpy().tobytes())
+        else:
+            h.update(repr(parte).encode())
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+# =======================
+# CLASSE DO CACHE
+# =======================
+class CacheFiguras:
+    """LRU de especificações de figuras, limitado pelo tamanho total (em bytes de JSON)."""
+
+    def __init__(self, orcamento_mb=ORCAMENTO_PADRAO_MB):
+        self.orcamento_bytes = int(orcamento_mb * 1024 * 1024)
+        self._figuras = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "despejadas": 0, "grandes_demais": 0}
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._figuras.get(chave)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            self._figuras.move_to_end(chave)
+            self._stats["hits"] += 1
+            return item[0]
+
+    def guardar(self, chave, especificacao, tamanho):
+        with self._lock:
+            if tamanho > self.orcamento_bytes:
+                self._stats["grandes_demais"] += 1
+                return
+
+            anterior = self._figuras.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+
+            self._figuras[chave] = (especificacao, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.orcamento_bytes:
+                _, (_, tamanho_removida) = self._figuras.popitem(last=False)
+                self._bytes -= tamanho_removida
+                self._stats["despejadas"] += 1
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["figuras"] = len(self._figuras)
+            stats["mb_usados"] = self._bytes / (1024 * 1024)
+        return stats
+
+
+_cache_global = CacheFiguras()
+
+
+def figura_em_cache(nome, dados, parametros, construir):
+    """
+    Retorna a figura do cache ou a constrói (e guarda) se os dados,
+    filtros ou idioma mudaram.
+
+    Args:
+        nome:       Identificador do gráfico
+        dados:      DataFrame/Series (ou tupla deles) que o gráfico desenha
+        parametros: Filtros, idioma e demais opções que alteram a figura
+        construir:  Função sem argumentos que monta a go.Figure
+
+    Returns:
+        go.Figure
+    """
+    partes = dados if isinstance(dados, tuple) else (dados,)
+    chave = (nome, impressao_digital(*partes, parametros))
+
+    especificacao = _cache_global.obter(chave)
+    if especificacao is not None:
+        # A especificação saiu de uma go.Figure já validada; validar de novo
+        # (como fazem pio.from_json e go.Figure(dict)) custa tanto quanto
+        # reconstruir. A figura copia o dict, o cache não é alterado.
+        return go.Figure(especificacao, _validate=False)
+
+    figura = construir()
+    especificacao = figura.to_plotly_json()
+    # O orçamento é medido no tamanho serializado, calculado só no miss
+    _cache_global.guardar(chave, especificacao, len(pio.to_json(especificacao, validate=False)))
+    return figura
+
+
+def estatisticas_figuras():
+    """Hits, misses, despejos e memória usada pelo cache de figuras."""
+    return _cache_global.estatisticas()
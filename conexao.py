@@ -0,0 +1,196 @@
+"""
+Pool de conexões PostgreSQL compartilhado por database.py e auth.py
+"""
+
+import threading
+import time
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2 import extensions
+import streamlit as st
+
+# =======================
+# CONFIGURAÇÃO
+# =======================
+POOL_MIN_PADRAO = 1
+POOL_MAX_PADRAO = 10
+TIMEOUT_CHECKOUT_S = 10.0       # espera máxima por uma conexão livre
+VERIFICAR_APOS_OCIOSO_S = 30.0  # conexões ociosas há mais tempo recebem SELECT 1
+
+
+# =======================
+# CLASSE DO POOL
+# =======================
+class PoolConexoes:
+    """
+    Pool de conexões thread-safe com limite mínimo/máximo,
+    verificação de saúde no checkout e estatísticas de uso.
+    """
+
+    def __init__(self, minconn, maxconn, **parametros):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self._pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, **parametros)
+        self._vagas = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._ultimo_uso = {}
+        # Contagens próprias (o psycopg2 não expõe as dele): o pool do
+        # psycopg2 abre `minconn` conexões ociosas e guarda no máximo isso
+        self._em_uso = 0
+        self._ociosas = minconn
+        self._stats = {
+            "checkouts": 0,
+            "devolucoes": 0,
+            "descartadas": 0,
+            "falhas_saude": 0,
+            "esperas": 0,
+            "timeouts": 0,
+            "espera_total_s": 0.0,
+        }
+
+    def _conexao_saudavel(self, conn):
+        """Confere se a conexão ainda responde antes de entregá-la."""
+        if conn.closed:
+            return False
+
+        ultimo_uso = self._ultimo_uso.get(id(conn))
+        if ultimo_uso is None or time.monotonic() - ultimo_uso < VERIFICAR_APOS_OCIOSO_S:
+            return True
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def obter(self):
+        """Retira uma conexão do pool, aguardando se todas estiverem em uso."""
+        inicio = time.monotonic()
+        if not self._vagas.acquire(blocking=False):
+            with self._lock:
+                self._stats["esperas"] += 1
+            if not self._vagas.acquire(timeout=TIMEOUT_CHECKOUT_S):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise pg_pool.PoolError("Tempo esgotado aguardando conexão livre no pool")
+
+        try:
+            conn = self._retirar()
+            while not self._conexao_saudavel(conn):
+                with self._lock:
+                    self._stats["falhas_saude"] += 1
+                    self._stats["descartadas"] += 1
+                self._ultimo_uso.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+                conn = self._retirar()
+        except Exception:
+            self._vagas.release()
+            raise
+
+        with self._lock:
+            self._em_uso += 1
+            self._stats["checkouts"] += 1
+            self._stats["espera_total_s"] += time.monotonic() - inicio
+        return conn
+
+    def _retirar(self):
+        """getconn do psycopg2: usa uma conexão ociosa, se houver, ou abre uma nova."""
+        conn = self._pool.getconn()
+        with self._lock:
+            self._ociosas = max(self._ociosas - 1, 0)
+        return conn
+
+    def devolver(self, conn):
+        """Devolve a conexão ao pool, descartando transações pendentes."""
+        descartar = conn.closed != 0
+        if not descartar:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                descartar = True
+
+        # Fica ociosa só até `minconn`; as demais são fechadas aqui mesmo,
+        # explicitamente, para que a contagem bata com o pool do psycopg2
+        with self._lock:
+            manter = not descartar and self._ociosas < self.minconn
+            if manter:
+                self._ociosas += 1
+
+        if manter:
+            self._ultimo_uso[id(conn)] = time.monotonic()
+        else:
+            self._ultimo_uso.pop(id(conn), None)
+
+        try:
+            self._pool.putconn(conn, close=not manter)
+        finally:
+            self._vagas.release()
+            with self._lock:
+                self._em_uso -= 1
+                self._stats["devolucoes"] += 1
+                if descartar:
+                    self._stats["descartadas"] += 1
+
+    def estatisticas(self):
+        """Retorna um snapshot das estatísticas do pool."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["em_uso"] = self._em_uso
+            stats["ociosas"] = self._ociosas
+        stats["minimo"] = self.minconn
+        stats["maximo"] = self.maxconn
+        stats["espera_media_ms"] = (
+            stats["espera_total_s"] / stats["checkouts"] * 1000 if stats["checkouts"] else 0.0
+        )
+        return stats
+
+    def fechar(self):
+        self._pool.closeall()
+        with self._lock:
+            self._ociosas = 0
+
+
+# =======================
+# POOL GLOBAL DO PROCESSO
+# =======================
+_pool_global = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool():
+    """Cria (uma única vez por processo) e retorna o pool compartilhado."""
+    global _pool_global
+
+    if _pool_global is None:
+        with _pool_lock:
+            if _pool_global is None:
+                _pool_global = PoolConexoes(
+                    int(st.secrets.get("DB_POOL_MIN", POOL_MIN_PADRAO)),
+                    int(st.secrets.get("DB_POOL_MAX", POOL_MAX_PADRAO)),
+                    host=st.secrets["DB_HOST"],
+                    database=st.secrets["DB_NAME"],
+                    user=st.secrets["DB_USER"],
+                    password=st.secrets["DB_PASSWORD"],
+                    port=st.secrets.get("DB_PORT", 5432),
+                    sslmode=st.secrets.get("DB_SSLMODE", "require"),
+                )
+    return _pool_global
+
+
+def conectar():
+    """Retira uma conexão do pool compartilhado."""
+    return obter_pool().obter()
+
+
+def devolver_conexao(conn):
+    """Devolve ao pool uma conexão obtida com conectar()."""
+    obter_pool().devolver(conn)
+
+
+def estatisticas_pool():
+    """Estatísticas do pool (checkouts, esperas, conexões em uso/ociosas...)."""
+    return obter_pool().estatisticas()
@@ -0,0 +1,78 @@
+"""
+Contexto de dados de uma execução (rerun) do app.py
+
+Cada conjunto de dados é buscado no máximo uma vez por rerun, só quando
+alguma aba pede, e o mesmo DataFrame tipado é entregue a todas as abas.
+"""
+
+from database import (
+    buscar_partidas_df,
+    buscar_ids_partidas_com_jogadores,
+    contar_partidas_usuario,
+)
+
+# Só as colunas que as abas usam (gráficos, nível europeu, histórico e rótulos
+# da importação); os totais do dashboard vêm do cubo de resumo (cubo.py)
+COLUNAS_CONTEXTO = [
+    "id", "data", "rodada", "time_usuario", "time_adv", "local", "competicao", "temporada",
+    "gols_usuario", "gols_adv", "xg_usuario", "xg_adv", "posse_usuario", "resultado",
+    "remates_usuario", "remates_a_baliza_usuario", "passes_certos_usuario",
+]
+
+
+class ContextoDados:
+    """
+    Carregamento preguiçoso dos dados do usuário, memorizado por rerun.
+    Crie um novo a cada execução do script e chame invalidar() depois
+    de qualquer escrita feita no meio dela.
+    """
+
+    def __init__(self, usuario_id):
+        self.usuario_id = usuario_id
+        self._memo = {}
+
+    def _carregar(self, chave, funcao, *args, **kwargs):
+        if chave not in self._memo:
+            self._memo[chave] = funcao(*args, **kwargs)
+        return self._memo[chave]
+
+    @property
+    def num_partidas(self):
+        """
+        Total de partidas do usuário, sem trazer as linhas (usa o frame se já
+        carregado). Uma falha na contagem vale 0 só neste rerun.
+        """
+        if "partidas" in self._memo:
+            return len(self._memo["partidas"])
+        return self._carregar("num_partidas", contar_partidas_usuario, self.usuario_id) or 0
+
+    def partidas(self):
+        """Todas as partidas do usuário como DataFrame tipado, ordenadas por data (asc)."""
+        return self._carregar("partidas", self._partidas_ordenadas, None, None)
+
+    def partidas_filtradas(self, temporada=None, competicao=None):
+        """Partidas de uma temporada/competição, filtradas no banco."""
+        if not temporada and not competicao:
+            return self.partidas()
+        return self._carregar(
+            ("partidas", temporada, competicao), self._partidas_ordenadas, temporada, competicao
+        )
+
+    @property
+    def ids_com_estatisticas(self):
+        """IDs das partidas que já têm estatísticas de jogadores importadas."""
+        return self._carregar(
+            "ids_com_estatisticas", lambda: set(buscar_ids_partidas_com_jogadores(self.usuario_id))
+        )
+
+    def invalidar(self):
+        """Descarta o que já foi carregado (após inserir/deletar no mesmo rerun)."""
+        self._memo.clear()
+
+    def _partidas_ordenadas(self, temporada, competicao):
+        df = buscar_partidas_df(
+            self.usuario_id, temporada=temporada, competicao=competicao, colunas=COLUNAS_CONTEXTO
+        )
+        if df.empty:
+            return df
+        return df.sort_values("data").reset_index(drop=True)
@@ -0,0 +1,101 @@
+"""
+Cubo pré-agregado temporada × competição × local
+
+Montado uma vez por versão dos dados do usuário a partir de
+buscar_resumo_dashboard, que já devolve do banco (GROUP BY CUBE) todas as
+combinações de filtro — inclusive "Todas" em qualquer dimensão. Trocar o
+filtro no dashboard é só uma busca no dicionário.
+"""
+
+import pandas as pd
+
+from cache import em_cache
+from database import COLUNAS_NUMERICAS_PARTIDAS, MEDIDAS_RESUMO, buscar_resumo_dashboard
+from utils import LOCAL_CASA, LOCAL_FORA
+
+DIMENSOES = ["temporada", "competicao", "local"]
+
+# Somas que continuam decimais no resumo (as demais voltam como inteiro)
+_SOMAS_DECIMAIS = {"soma_xg_usuario", "soma_xg_adv"}
+
+
+def _celula_vazia():
+    """Célula sem partidas: contagens e somas zeradas, médias NaN."""
+    celula = {"partidas": 0, "vitorias": 0, "empates": 0, "derrotas": 0, "clean_sheets": 0}
+    for coluna in COLUNAS_NUMERICAS_PARTIDAS:
+        celula[f"soma_{coluna}"] = 0
+        celula[f"media_{coluna}"] = float("nan")
+    return celula
+
+
+def _formatar_celula(medidas):
+    """
+    Célula do cubo: partidas, vitorias, empates, derrotas, clean_sheets,
+    soma_<coluna> e media_<coluna> para COLUNAS_NUMERICAS_PARTIDAS.
+    """
+    celula = {}
+    partidas = medidas["partidas"]
+    for medida in MEDIDAS_RESUMO:
+        valor = medidas[medida]
+        celula[medida] = float(valor) if medida in _SOMAS_DECIMAIS else int(round(valor))
+    for coluna in COLUNAS_NUMERICAS_PARTIDAS:
+        soma = medidas[f"soma_{coluna}"]
+        celula[f"media_{coluna}"] = float(soma) / partidas if partidas > 0 else float("nan")
+    return celula
+
+
+class CuboResumo:
+    """
+    Todas as agregações (temporada|*, competição|*, local|*) de um usuário.
+    None numa dimensão significa "todas".
+    """
+
+    def __init__(self, resumo):
+        self._celulas = {}
+        self.temporadas = []
+        self.competicoes = []
+
+        if resumo.empty:
+            return
+
+        # Uma linha por combinação; None (dimensão agregada) significa "todas"
+        for linha in resumo.to_dict("records"):
+            chave = tuple(None if pd.isna(linha[d]) else linha[d] for d in DIMENSOES)
+            self._celulas[chave] = _formatar_celula(linha)
+
+        self.temporadas = sorted({t for t, c, l in self._celulas if t and c is None and l is None})
+        self.competicoes = sorted({c for t, c, l in self._celulas if c and t is None and l is None})
+
+    def __len__(self):
+        return len(self._celulas)
+
+    @property
+    def partidas(self):
+        return self.celula()["partidas"]
+
+    def celula(self, temporada=None, competicao=None, local=None):
+        """Contagens, somas e médias de uma combinação (cópia; vazia se não existir)."""
+        celula = self._celulas.get((temporada or None, competicao or None, local))
+        return dict(celula) if celula else _celula_vazia()
+
+    def resumo(self, temporada=None, competicao=None):
+        """Células do filtro no geral e por local: {"geral", LOCAL_CASA, LOCAL_FORA}."""
+        return {
+            "geral": self.celula(temporada, competicao),
+            LOCAL_CASA: self.celula(temporada, competicao, LOCAL_CASA),
+            LOCAL_FORA: self.celula(temporada, competicao, LOCAL_FORA),
+        }
+
+    def opcoes(self):
+        """Opções dos filtros do dashboard: {"temporadas", "competicoes", "partidas" (total)}."""
+        return {
+            "temporadas": list(self.temporadas),
+            "competicoes": list(self.competicoes),
+            "partidas": self.partidas,
+        }
+
+
+@em_cache(copiar=False)
+def cubo_do_usuario(usuario_id):
+    """Cubo do usuário, reconstruído só quando a versão dos dados dele muda."""
+    return CuboResumo(buscar_resumo_dashboard(usuario_id))
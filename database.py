@@ -1,17 +1,16 @@
-import psycopg2
-import streamlit as st
+import threading
+import time
 
-# =======================
-# CONEXÃO
-# =======================
-def conectar():
-    return psycopg2.connect(
-        host=st.secrets["DB_HOST"],
-        database=st.secrets["DB_NAME"],
-        user=st.secrets["DB_USER"],
-        password=st.secrets["DB_PASSWORD"],
-        port=5432
-    )
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from cache import em_cache, invalidar_usuario
+from conexao import conectar, devolver_conexao
+from utils import (
+    RESULTADO_VITORIA, RESULTADO_EMPATE, RESULTADO_DERROTA,
+    normalizar_nome_jogador,
+)
 
 # =======================
 # INSERÇÃO
@@ -34,9 +33,15 @@ def inserir_partida(dados):
                 gols_adv, resultado
             )
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
         """, dados)
+        partida_id = cursor.fetchone()[0]
+
+        # Soma a nova partida ao resumo da temporada na mesma transação
+        _aplicar_delta_resumo_temporadas(cursor, "id = %(partida_id)s", {"partida_id": partida_id}, +1)
 
         conn.commit()
+        invalidar_usuario(dados[0])
         return True
 
     except Exception as e:
@@ -45,11 +50,12 @@ def inserir_partida(dados):
         return False
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
         
 # =======================
 # CONSULTA
 # =======================
+@em_cache()
 def buscar_partidas(usuario_id=None):
     conn = conectar()
     cursor = conn.cursor()
@@ -85,57 +91,164 @@ def buscar_partidas(usuario_id=None):
         return []
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
 
 # =======================
-# DELETAR
+# CONSULTA — DATAFRAME TIPADO
 # =======================
-def deletar_partida(id_partida, usuario_id=None):
+# Estatísticas numéricas de cada partida (time do usuário e adversário)
+COLUNAS_NUMERICAS_PARTIDAS = [
+    "posse_usuario", "remates_usuario", "remates_a_baliza_usuario", "xg_usuario",
+    "oportunidades_flagrantes_usuario", "cantos_usuario", "passes_totais_usuario",
+    "passes_certos_usuario", "cruzamentos_totais_usuario", "cruzamentos_certos_usuario",
+    "gols_usuario", "posse_adv", "remates_adv", "remates_a_baliza_adv", "xg_adv",
+    "oportunidades_flagrantes_adv", "cantos_adv", "passes_totais_adv",
+    "passes_certos_adv", "cruzamentos_totais_adv", "cruzamentos_certos_adv",
+    "gols_adv",
+]
+
+# Todas as colunas da tabela partidas, na ordem da tabela
+COLUNAS_PARTIDAS = [
+    "id", "usuario_id", "time_usuario", "time_adv", "local", "competicao", "temporada", "data", "rodada",
+    *COLUNAS_NUMERICAS_PARTIDAS,
+    "resultado",
+]
+
+# Tipos das colunas de partidas no DataFrame; colunas não listadas
+# ficam com o tipo inferido pelo pandas. Colunas que aceitam NULL usam o
+# inteiro anulável do pandas (Int16): um NULL vira <NA>, não um 0 que
+# puxaria as médias para baixo.
+TIPOS_PARTIDAS = {
+    "id": np.int64,
+    "usuario_id": np.int32,
+    "rodada": pd.Int16Dtype(),
+    "local": "category",
+    "resultado": "category",
+    "competicao": "category",
+    "temporada": "category",
+    "time_adv": "category",
+    "data": "datetime64[ns]",
+    **{coluna: pd.Int16Dtype() for coluna in COLUNAS_NUMERICAS_PARTIDAS},
+    "xg_usuario": np.float64,
+    "xg_adv": np.float64,
+}
+
+
+def _coluna_tipada(nome, valores, tipos=TIPOS_PARTIDAS):
+    """Converte os valores de uma coluna (tupla do cursor) para o tipo de `tipos`."""
+    tipo = tipos.get(nome)
+
+    if tipo is None:
+        return pd.Series(valores)
+    if tipo == "category":
+        return pd.Categorical(valores)
+    if tipo == "datetime64[ns]":
+        return pd.to_datetime(pd.Series(valores, dtype=object))
+    if isinstance(tipo, pd.api.extensions.ExtensionDtype):
+        return pd.array(valores, dtype=tipo)
+    if np.issubdtype(tipo, np.integer):
+        return np.fromiter(valores, dtype=tipo, count=len(valores))
+    return np.fromiter(
+        (np.nan if v is None else float(v) for v in valores), dtype=tipo, count=len(valores)
+    )
+
+
+def _partidas_para_df(cursor, tipos=TIPOS_PARTIDAS):
+    """Monta o DataFrame tipado coluna a coluna a partir de um cursor já executado."""
+    colunas = [desc[0] for desc in cursor.description]
+    linhas = cursor.fetchall()
+    valores_por_coluna = list(zip(*linhas)) if linhas else [()] * len(colunas)
+
+    return pd.DataFrame({
+        coluna: _coluna_tipada(coluna, valores, tipos)
+        for coluna, valores in zip(colunas, valores_por_coluna)
+    })
+
+
+def _consulta_partidas(colunas, usuario_id, temporada=None, competicao=None):
+    """Monta o SELECT de partidas de um usuário com os filtros opcionais aplicados no banco."""
+    query = f"SELECT {', '.join(colunas)} FROM partidas WHERE usuario_id = %s"
+    params = [usuario_id]
+
+    if temporada:
+        query += " AND temporada = %s"
+        params.append(temporada)
+
+    if competicao:
+        query += " AND competicao = %s"
+        params.append(competicao)
+
+    query += " ORDER BY data DESC"
+    return query, tuple(params)
+
+
+@em_cache()
+def buscar_partidas_df(usuario_id, temporada=None, competicao=None, colunas=None):
+    """
+    Retorna as partidas de um usuário já como DataFrame tipado:
+    categorias para local/resultado/competição/temporada/adversário,
+    inteiros pequenos para contagens e datetime para `data`.
+    Os nomes das colunas vêm do cursor.
+
+    Args:
+        usuario_id: ID do usuário
+        temporada:  Filtra por temporada no banco (opcional)
+        competicao: Filtra por competição no banco (opcional)
+        colunas:    Subconjunto de COLUNAS_PARTIDAS a trazer (padrão: todas)
+
+    Returns:
+        pd.DataFrame: Uma linha por partida, ordenada por data (desc).
+                      DataFrame vazio em caso de erro ou sem partidas.
+    """
+    colunas = [c for c in COLUNAS_PARTIDAS if colunas is None or c in colunas]
+    query, params = _consulta_partidas(colunas, usuario_id, temporada, competicao)
+
     conn = conectar()
     cursor = conn.cursor()
 
     try:
-        if usuario_id:
-            cursor.execute("""
-                DELETE FROM partidas
-                WHERE id = %s AND usuario_id = %s
-            """, (id_partida, usuario_id))
-        else:
-            cursor.execute("""
-                DELETE FROM partidas
-                WHERE id = %s
-            """, (id_partida,))
-
-        conn.commit()
-        return cursor.rowcount > 0
+        cursor.execute(query, params)
+        return _partidas_para_df(cursor)
 
     except Exception as e:
-        conn.rollback()
-        print(f"Erro ao deletar partida: {e}")
-        return False
+        print(f"Erro ao buscar partidas (DataFrame): {e}")
+        return pd.DataFrame()
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
+
 
 # =======================
-# FILTROS
+# RESUMO DO DASHBOARD (agregado no banco)
 # =======================
-def buscar_partidas_filtradas(usuario_id, temporada=None, competicao=None):
-    conn = conectar()
-    cursor = conn.cursor()
+MEDIDAS_RESUMO = ["partidas", "vitorias", "empates", "derrotas", "clean_sheets"] + [
+    f"soma_{c}" for c in COLUNAS_NUMERICAS_PARTIDAS
+]
 
-    COLUNAS = """
-        id, usuario_id, time_usuario, time_adv, local, competicao, temporada, data, rodada,
-        posse_usuario, remates_usuario, remates_a_baliza_usuario, xg_usuario,
-        oportunidades_flagrantes_usuario, cantos_usuario, passes_totais_usuario,
-        passes_certos_usuario, cruzamentos_totais_usuario, cruzamentos_certos_usuario,
-        gols_usuario, posse_adv, remates_adv, remates_a_baliza_adv, xg_adv,
-        oportunidades_flagrantes_adv, cantos_adv, passes_totais_adv,
-        passes_certos_adv, cruzamentos_totais_adv, cruzamentos_certos_adv,
-        gols_adv, resultado
+
+@em_cache()
+def buscar_resumo_dashboard(usuario_id, temporada=None, competicao=None):
     """
+    Retorna, a partir de resumo_temporadas e em uma única consulta agrupada
+    (GROUP BY CUBE), as contagens e somas usadas pelo dashboard em todas as
+    combinações de temporada × competição × local — inclusive "todas" em
+    cada dimensão, o que cobre o geral e o corte casa/fora. É a carga do
+    cubo (cubo.py), que só indexa as linhas.
+
+    Args:
+        temporada:  Restringe, no banco, a esta temporada (opcional)
+        competicao: Restringe, no banco, a esta competição (opcional)
 
-    query = f"SELECT {COLUNAS} FROM partidas WHERE usuario_id = %s"
+    Returns:
+        pd.DataFrame: temporada, competicao, local (None = todas), partidas,
+                      vitorias, empates, derrotas, clean_sheets e soma_<coluna>
+                      (float). DataFrame vazio em caso de erro ou sem partidas.
+    """
+    query = f"""
+        SELECT temporada, competicao, local, {", ".join(f"SUM({m})" for m in MEDIDAS_RESUMO)}
+        FROM resumo_temporadas
+        WHERE usuario_id = %s AND partidas > 0
+    """
     params = [usuario_id]
 
     if temporada:
@@ -146,10 +259,183 @@ def buscar_partidas_filtradas(usuario_id, temporada=None, competicao=None):
         query += " AND competicao = %s"
         params.append(competicao)
 
-    query += " ORDER BY data DESC"
+    query += " GROUP BY CUBE (temporada, competicao, local)"
+
+    conn = conectar()
+    cursor = conn.cursor()
 
     try:
         cursor.execute(query, tuple(params))
+        linhas = cursor.fetchall()
+        if not linhas:
+            return pd.DataFrame()
+        resumo = pd.DataFrame(linhas, columns=["temporada", "competicao", "local"] + MEDIDAS_RESUMO)
+        resumo[MEDIDAS_RESUMO] = resumo[MEDIDAS_RESUMO].astype(float)
+        return resumo
+
+    except Exception as e:
+        print(f"Erro ao buscar resumo do dashboard: {e}")
+        return pd.DataFrame()
+
+    finally:
+        devolver_conexao(conn)
+
+
+# =======================
+# RESUMO POR TEMPORADA (mantido incrementalmente)
+# =======================
+# Uma linha por (usuário, temporada, competição, local) com contagens e a
+# soma de cada estatística numérica. Atualizada na mesma transação de
+# inserir_partida/deletar_partida; o dashboard lê daqui em vez de
+# reagregar a tabela partidas.
+SQL_CRIAR_RESUMO_TEMPORADAS = f"""
+    CREATE TABLE IF NOT EXISTS resumo_temporadas (
+        usuario_id    INTEGER NOT NULL,
+        temporada     TEXT    NOT NULL,
+        competicao    TEXT    NOT NULL,
+        local         TEXT    NOT NULL,
+        partidas      INTEGER NOT NULL DEFAULT 0,
+        vitorias      INTEGER NOT NULL DEFAULT 0,
+        empates       INTEGER NOT NULL DEFAULT 0,
+        derrotas      INTEGER NOT NULL DEFAULT 0,
+        pontos        INTEGER NOT NULL DEFAULT 0,
+        clean_sheets  INTEGER NOT NULL DEFAULT 0,
+        {", ".join(f"soma_{c} NUMERIC NOT NULL DEFAULT 0" for c in COLUNAS_NUMERICAS_PARTIDAS)},
+        PRIMARY KEY (usuario_id, temporada, competicao, local)
+    )
+"""
+
+_CONTAGENS_RESUMO = ["partidas", "vitorias", "empates", "derrotas", "pontos", "clean_sheets"]
+
+
+def _aplicar_delta_resumo_temporadas(cursor, filtro_partidas, params, sinal):
+    """
+    Soma (sinal=+1) ou subtrai (sinal=-1) ao resumo_temporadas as partidas
+    que satisfazem `filtro_partidas` (cláusula WHERE com parâmetros nomeados).
+    Deve rodar dentro da transação que insere/apaga as partidas.
+    """
+    colunas_soma = [f"soma_{c}" for c in COLUNAS_NUMERICAS_PARTIDAS]
+    todas = _CONTAGENS_RESUMO + colunas_soma
+
+    cursor.execute(f"""
+        INSERT INTO resumo_temporadas AS r (
+            usuario_id, temporada, competicao, local, {", ".join(todas)}
+        )
+        SELECT
+            usuario_id, COALESCE(temporada, ''), COALESCE(competicao, ''), COALESCE(local, ''),
+            %(sinal)s * COUNT(*),
+            %(sinal)s * COUNT(*) FILTER (WHERE resultado = %(vitoria)s),
+            %(sinal)s * COUNT(*) FILTER (WHERE resultado = %(empate)s),
+            %(sinal)s * COUNT(*) FILTER (WHERE resultado = %(derrota)s),
+            %(sinal)s * (3 * COUNT(*) FILTER (WHERE resultado = %(vitoria)s)
+                         + COUNT(*) FILTER (WHERE resultado = %(empate)s)),
+            %(sinal)s * COUNT(*) FILTER (WHERE gols_adv = 0),
+            {", ".join(f"%(sinal)s * COALESCE(SUM({c}), 0)" for c in COLUNAS_NUMERICAS_PARTIDAS)}
+        FROM partidas
+        WHERE {filtro_partidas}
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (usuario_id, temporada, competicao, local) DO UPDATE SET
+            {", ".join(f"{c} = r.{c} + EXCLUDED.{c}" for c in todas)}
+    """, {
+        **params,
+        "sinal": sinal,
+        "vitoria": RESULTADO_VITORIA,
+        "empate": RESULTADO_EMPATE,
+        "derrota": RESULTADO_DERROTA,
+    })
+
+    if sinal < 0:
+        cursor.execute(f"""
+            DELETE FROM resumo_temporadas
+            WHERE partidas <= 0
+              AND usuario_id IN (SELECT usuario_id FROM partidas WHERE {filtro_partidas})
+        """, params)
+
+
+def reconstruir_resumo_temporadas(usuario_id=None):
+    """
+    Recalcula do zero o resumo_temporadas (de um usuário ou de todos),
+    criando a tabela se necessário. Usado na carga inicial e para reparos.
+
+    Returns:
+        bool: True em caso de sucesso
+    """
+    conn = conectar()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(SQL_CRIAR_RESUMO_TEMPORADAS)
+
+        if usuario_id:
+            cursor.execute("DELETE FROM resumo_temporadas WHERE usuario_id = %s", (usuario_id,))
+            _aplicar_delta_resumo_temporadas(cursor, "usuario_id = %(usuario_id)s", {"usuario_id": usuario_id}, +1)
+        else:
+            cursor.execute("DELETE FROM resumo_temporadas")
+            _aplicar_delta_resumo_temporadas(cursor, "TRUE", {}, +1)
+
+        conn.commit()
+        invalidar_usuario(usuario_id)
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Erro ao reconstruir resumo das temporadas: {e}")
+        return False
+
+    finally:
+        devolver_conexao(conn)
+
+
+# =======================
+# DELETAR
+# =======================
+def deletar_partida(id_partida, usuario_id=None):
+    conn = conectar()
+    cursor = conn.cursor()
+
+    try:
+        # Trava a linha antes de descontar: num segundo DELETE concorrente da
+        # mesma partida, este SELECT espera o primeiro terminar e já não a encontra
+        filtro = "id = %(partida_id)s" + (" AND usuario_id = %(usuario_id)s" if usuario_id else "")
+        params = {"partida_id": id_partida, "usuario_id": usuario_id}
+        cursor.execute(f"SELECT usuario_id FROM partidas WHERE {filtro} FOR UPDATE", params)
+        donos = {row[0] for row in cursor.fetchall()}
+        if not donos:
+            conn.rollback()
+            return False
+
+        # Desconta a partida dos resumos antes de apagá-la
+        _aplicar_delta_resumo_temporadas(cursor, filtro, params, -1)
+        filtro_jogadores = "e.partida_id = %(partida_id)s" + (" AND e.usuario_id = %(usuario_id)s" if usuario_id else "")
+        _aplicar_delta_agregados_jogadores(cursor, filtro_jogadores, params, -1)
+
+        cursor.execute(f"DELETE FROM partidas WHERE {filtro}", params)
+
+        conn.commit()
+        for dono in donos:
+            invalidar_usuario(dono)
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Erro ao deletar partida: {e}")
+        return False
+
+    finally:
+        devolver_conexao(conn)
+
+# =======================
+# FILTROS
+# =======================
+@em_cache()
+def buscar_partidas_filtradas(usuario_id, temporada=None, competicao=None):
+    conn = conectar()
+    cursor = conn.cursor()
+
+    query, params = _consulta_partidas(COLUNAS_PARTIDAS, usuario_id, temporada, competicao)
+
+    try:
+        cursor.execute(query, params)
         return cursor.fetchall()
 
     except Exception as e:
@@ -157,88 +443,222 @@ def buscar_partidas_filtradas(usuario_id, temporada=None, competicao=None):
         return []
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
 
 
 
+# =======================
+# JOGADORES (identidade por usuário)
+# =======================
+# Cada jogador ganha um id inteiro por usuário; variações de grafia do
+# mesmo nome (acentos, maiúsculas, espaços) caem no mesmo id.
+SQL_CRIAR_JOGADORES = """
+    CREATE TABLE IF NOT EXISTS jogadores (
+        id                SERIAL PRIMARY KEY,
+        usuario_id        INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+        nome              TEXT    NOT NULL,
+        nome_normalizado  TEXT    NOT NULL,
+        UNIQUE (usuario_id, nome_normalizado)
+    )
+"""
+
+# Índice em memória {usuario_id: {nome_normalizado: jogador_id}}, carregado
+# do banco na primeira importação do usuário no processo. Só recebe ids já
+# commitados: cada importação trabalha numa cópia e a publica após o commit.
+_indice_jogadores = {}
+_lock_indice_jogadores = threading.Lock()
+
+
+def _copiar_indice_jogadores(cursor, usuario_id: int) -> dict:
+    """Cópia privada do índice do usuário (lida do banco se ainda não estiver em memória)."""
+    with _lock_indice_jogadores:
+        indice = _indice_jogadores.get(usuario_id)
+        if indice is not None:
+            return dict(indice)
+
+    cursor.execute(
+        "SELECT nome_normalizado, id FROM jogadores WHERE usuario_id = %s", (usuario_id,)
+    )
+    return dict(cursor.fetchall())
+
+
+def _publicar_indice_jogadores(usuario_id: int, indice: dict):
+    """Junta ao índice em memória os ids de `indice`. Chamar só depois do commit."""
+    with _lock_indice_jogadores:
+        _indice_jogadores.setdefault(usuario_id, {}).update(indice)
+
+
+def _resolver_ids_jogadores(cursor, usuario_id: int, nomes):
+    """
+    Resolve nomes de jogadores para ids, criando os que ainda não existem.
+    Deve rodar dentro da transação que grava as estatísticas; o índice
+    retornado só deve ser publicado (_publicar_indice_jogadores) após o commit.
+    `nomes` deve vir numa ordem estável (a primeira grafia de um jogador
+    novo vira o nome de exibição).
+
+    Returns:
+        tuple: ({nome como veio: jogador_id}, cópia do índice com os ids novos)
+    """
+    indice = _copiar_indice_jogadores(cursor, usuario_id)
+
+    # Primeira grafia vista de cada jogador novo vira o nome de exibição
+    novos = {}
+    for nome in nomes:
+        chave = normalizar_nome_jogador(nome)
+        if chave and chave not in indice:
+            novos.setdefault(chave, nome.strip())
+
+    if novos:
+        # DO UPDATE (sem efeito) para o RETURNING trazer também ids já existentes
+        retornados = execute_values(
+            cursor,
+            """
+            INSERT INTO jogadores (usuario_id, nome, nome_normalizado) VALUES %s
+            ON CONFLICT (usuario_id, nome_normalizado)
+                DO UPDATE SET nome_normalizado = EXCLUDED.nome_normalizado
+            RETURNING nome_normalizado, id
+            """,
+            [(usuario_id, nome, chave) for chave, nome in novos.items()],
+            page_size=len(novos),
+            fetch=True,
+        )
+        indice.update(retornados)
+
+    ids = {}
+    for nome in nomes:
+        chave = normalizar_nome_jogador(nome)
+        if chave:
+            ids[nome] = indice[chave]
+    return ids, indice
+
+
 # =======================
 # ESTATÍSTICAS DE JOGADORES
 # =======================
 
-def inserir_estatisticas_jogadores(partida_id: int, usuario_id: int, jogadores: list) -> bool:
+# Campos gravados por jogador, na ordem das colunas da tabela.
+# numero/nome/minutos_jogados não têm valor padrão (ficam NULL se ausentes).
+CAMPOS_ESTATISTICAS_JOGADOR = [
+    ("numero", None), ("nome", None), ("minutos_jogados", None),
+    ("distancia_km", 0), ("perc_passes", 0), ("xa", 0), ("assistencias", 0), ("xg", 0), ("golos", 0),
+    ("perc_cruzamentos", 0), ("passes_progressivos", 0), ("oportunidades_flagrantes", 0), ("passes_decisivos", 0),
+    ("perc_remates", 0), ("fintas", 0), ("faltas_sofridas", 0), ("remate_na_barra", 0),
+    ("perc_desarmes", 0), ("perc_cabeceamentos", 0), ("faltas_cometidas", 0), ("intercepcoes", 0),
+    ("alivios", 0), ("desarmes_decisivos", 0),
+    ("defesas_seguras", 0), ("defesas_ponta_dedos", 0), ("defesas_desviadas", 0), ("remates_sofridos", 0),
+    ("lancamentos", 0), ("cantos", 0), ("livres_defensivos", 0), ("livres_ofensivos", 0),
+]
+
+
+def _gravar_estatisticas_jogadores(cursor, usuario_id: int, estatisticas_por_partida: dict):
     """
-    Insere (ou substitui) as estatísticas dos jogadores de uma partida.
-    Apaga registros anteriores da mesma partida antes de inserir.
+    Substitui as estatísticas das partidas informadas usando um único
+    DELETE e um único INSERT multi-linha (execute_values).
+
+    Returns:
+        tuple: (número de linhas gravadas, índice de jogadores a publicar após o commit)
+    """
+    partida_ids = list(estatisticas_por_partida.keys())
+    filtro = "e.usuario_id = %(usuario_id)s AND e.partida_id = ANY(%(partida_ids)s)"
+    params = {"usuario_id": usuario_id, "partida_ids": partida_ids}
+
+    # Trava as partidas (em ordem de id, contra deadlock entre lotes): uma
+    # reimportação ou exclusão concorrente espera o commit desta e desconta
+    # dos agregados o que de fato ficou gravado
+    cursor.execute(
+        "SELECT id FROM partidas WHERE usuario_id = %s AND id = ANY(%s) ORDER BY id FOR UPDATE",
+        (usuario_id, partida_ids)
+    )
+
+    # Desconta dos agregados o lançamento anterior e o remove
+    # (permite reimportar o mesmo HTML)
+    _aplicar_delta_agregados_jogadores(cursor, filtro, params, -1)
+    cursor.execute(
+        "DELETE FROM estatisticas_jogadores WHERE usuario_id = %s AND partida_id = ANY(%s)",
+        (usuario_id, partida_ids)
+    )
+
+    # dict.fromkeys: sem repetição e na ordem do arquivo (a primeira grafia vence)
+    ids_jogadores, indice = _resolver_ids_jogadores(cursor, usuario_id, list(dict.fromkeys(
+        j["nome"] for jogadores in estatisticas_por_partida.values() for j in jogadores if j.get("nome")
+    )))
+
+    linhas = [
+        (partida_id, usuario_id, ids_jogadores.get(j.get("nome")),
+         *(j.get(campo, padrao) for campo, padrao in CAMPOS_ESTATISTICAS_JOGADOR))
+        for partida_id, jogadores in estatisticas_por_partida.items()
+        for j in jogadores
+    ]
+    if not linhas:
+        return 0, indice
+
+    colunas = ", ".join(
+        ["partida_id", "usuario_id", "jogador_id"] + [campo for campo, _ in CAMPOS_ESTATISTICAS_JOGADOR]
+    )
+    execute_values(
+        cursor,
+        f"INSERT INTO estatisticas_jogadores ({colunas}) VALUES %s",
+        linhas,
+        page_size=len(linhas)
+    )
+    _aplicar_delta_agregados_jogadores(cursor, filtro, params, +1)
+    return len(linhas), indice
+
+
+def inserir_estatisticas_jogadores_em_lote(usuario_id: int, estatisticas_por_partida: dict):
+    """
+    Grava as estatísticas de várias partidas de uma vez, numa única transação.
+    Mantém o comportamento de substituição: registros anteriores das
+    partidas informadas são apagados antes da inserção.
 
     Args:
-        partida_id: ID da partida já cadastrada
-        usuario_id: ID do usuário dono da partida
-        jogadores:  Lista de dicts retornada por parsear_html_fm()
+        usuario_id:               ID do usuário dono das partidas
+        estatisticas_por_partida: {partida_id: lista de dicts de parsear_html_fm()}
 
     Returns:
-        bool: True em caso de sucesso
+        dict | None: {"partidas", "linhas", "segundos"} em caso de sucesso, None em caso de erro
     """
+    inicio = time.perf_counter()
     conn = conectar()
     cursor = conn.cursor()
 
     try:
-        # Remove lançamento anterior (permite reimportar o mesmo HTML)
-        cursor.execute(
-            "DELETE FROM estatisticas_jogadores WHERE partida_id = %s AND usuario_id = %s",
-            (partida_id, usuario_id)
-        )
-
-        for j in jogadores:
-            cursor.execute("""
-                INSERT INTO estatisticas_jogadores (
-                    partida_id, usuario_id,
-                    numero, nome, minutos_jogados,
-                    distancia_km, perc_passes, xa, assistencias, xg, golos,
-                    perc_cruzamentos, passes_progressivos, oportunidades_flagrantes, passes_decisivos,
-                    perc_remates, fintas, faltas_sofridas, remate_na_barra,
-                    perc_desarmes, perc_cabeceamentos, faltas_cometidas, intercepcoes, alivios, desarmes_decisivos,
-                    defesas_seguras, defesas_ponta_dedos, defesas_desviadas, remates_sofridos,
-                    lancamentos, cantos, livres_defensivos, livres_ofensivos
-                ) VALUES (
-                    %s, %s,
-                    %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s
-                )
-            """, (
-                partida_id, usuario_id,
-                j.get("numero"), j.get("nome"), j.get("minutos_jogados"),
-                j.get("distancia_km", 0), j.get("perc_passes", 0), j.get("xa", 0),
-                j.get("assistencias", 0), j.get("xg", 0), j.get("golos", 0),
-                j.get("perc_cruzamentos", 0), j.get("passes_progressivos", 0),
-                j.get("oportunidades_flagrantes", 0), j.get("passes_decisivos", 0),
-                j.get("perc_remates", 0), j.get("fintas", 0),
-                j.get("faltas_sofridas", 0), j.get("remate_na_barra", 0),
-                j.get("perc_desarmes", 0), j.get("perc_cabeceamentos", 0),
-                j.get("faltas_cometidas", 0), j.get("intercepcoes", 0),
-                j.get("alivios", 0), j.get("desarmes_decisivos", 0),
-                j.get("defesas_seguras", 0), j.get("defesas_ponta_dedos", 0),
-                j.get("defesas_desviadas", 0), j.get("remates_sofridos", 0),
-                j.get("lancamentos", 0), j.get("cantos", 0),
-                j.get("livres_defensivos", 0), j.get("livres_ofensivos", 0),
-            ))
-
+        linhas, indice = _gravar_estatisticas_jogadores(cursor, usuario_id, estatisticas_por_partida)
         conn.commit()
-        return True
+        _publicar_indice_jogadores(usuario_id, indice)
+        invalidar_usuario(usuario_id)
+        return {
+            "partidas": len(estatisticas_por_partida),
+            "linhas": linhas,
+            "segundos": time.perf_counter() - inicio,
+        }
 
     except Exception as e:
         conn.rollback()
-        print(f"Erro ao inserir estatísticas de jogadores: {e}")
-        return False
+        print(f"Erro ao inserir estatísticas de jogadores em lote: {e}")
+        return None
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
+
+
+def inserir_estatisticas_jogadores(partida_id: int, usuario_id: int, jogadores: list) -> bool:
+    """
+    Insere (ou substitui) as estatísticas dos jogadores de uma partida.
+    Apaga registros anteriores da mesma partida antes de inserir.
+
+    Args:
+        partida_id: ID da partida já cadastrada
+        usuario_id: ID do usuário dono da partida
+        jogadores:  Lista de dicts retornada por parsear_html_fm()
+
+    Returns:
+        bool: True em caso de sucesso
+    """
+    return inserir_estatisticas_jogadores_em_lote(usuario_id, {partida_id: jogadores}) is not None
 
 
+@em_cache()
 def buscar_estatisticas_jogadores(partida_id: int, usuario_id: int) -> list:
     """
     Retorna as estatísticas dos jogadores de uma partida específica.
@@ -273,14 +693,15 @@ def buscar_estatisticas_jogadores(partida_id: int, usuario_id: int) -> list:
         return []
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
 
+@em_cache()
 def buscar_todas_estatisticas_jogadores(usuario_id: int) -> list:
     """
     Retorna as estatísticas de jogadores de TODAS as partidas de um usuário.
 
     Returns:
-        list[dict]: Lista de dicts com todos os campos + partida_id,
+        list[dict]: Lista de dicts com todos os campos + partida_id e jogador_id,
                     ordenada por partida_id e minutos (desc).
                     Retorna lista vazia se não houver registros.
     """
@@ -290,7 +711,7 @@ def buscar_todas_estatisticas_jogadores(usuario_id: int) -> list:
     try:
         cursor.execute("""
             SELECT
-                partida_id,
+                partida_id, jogador_id,
                 numero, nome, minutos_jogados,
                 distancia_km, perc_passes, xa, assistencias, xg, golos,
                 perc_cruzamentos, passes_progressivos, oportunidades_flagrantes, passes_decisivos,
@@ -311,10 +732,378 @@ def buscar_todas_estatisticas_jogadores(usuario_id: int) -> list:
         return []
 
     finally:
-        conn.close()
+        devolver_conexao(conn)
+
+
+def iterar_estatisticas_jogadores(usuario_id: int, tamanho_lote: int = 2000, temporada=None, competicao=None):
+    """
+    Percorre as estatísticas de jogadores de TODAS as partidas de um usuário
+    com um cursor nomeado (server-side), sem trazer o histórico inteiro
+    para a memória de uma vez.
+
+    Args:
+        usuario_id:   ID do usuário
+        tamanho_lote: Linhas buscadas no servidor a cada bloco
+        temporada:    Restringe, no banco, às partidas desta temporada (opcional)
+        competicao:   Restringe, no banco, às partidas desta competição (opcional)
+
+    Yields:
+        dict[str, list]: Bloco colunar {coluna: valores} com até `tamanho_lote`
+                         linhas, pronto para pd.DataFrame(bloco).
+
+    Raises:
+        psycopg2.Error: Erros do banco sobem para quem consome: um histórico
+                        interrompido no meio não pode parecer completo.
+    """
+    query = """
+        SELECT
+            e.partida_id, e.jogador_id,
+            e.numero, e.nome, e.minutos_jogados,
+            e.distancia_km, e.perc_passes, e.xa, e.assistencias, e.xg, e.golos,
+            e.perc_cruzamentos, e.passes_progressivos, e.oportunidades_flagrantes, e.passes_decisivos,
+            e.perc_remates, e.fintas, e.faltas_sofridas, e.remate_na_barra,
+            e.perc_desarmes, e.perc_cabeceamentos, e.faltas_cometidas, e.intercepcoes, e.alivios, e.desarmes_decisivos,
+            e.defesas_seguras, e.defesas_ponta_dedos, e.defesas_desviadas, e.remates_sofridos,
+            e.lancamentos, e.cantos, e.livres_defensivos, e.livres_ofensivos
+        FROM estatisticas_jogadores e
+        JOIN partidas p ON p.id = e.partida_id
+        WHERE e.usuario_id = %s
+    """
+    params = [usuario_id]
+
+    if temporada:
+        query += " AND p.temporada = %s"
+        params.append(temporada)
+
+    if competicao:
+        query += " AND p.competicao = %s"
+        params.append(competicao)
+
+    query += " ORDER BY e.partida_id DESC, e.minutos_jogados DESC NULLS LAST, e.nome ASC"
+
+    conn = conectar()
+    cursor = conn.cursor(name="iterar_estatisticas_jogadores")
+    cursor.itersize = tamanho_lote
+
+    try:
+        cursor.execute(query, tuple(params))
+
+        colunas = None
+        while True:
+            linhas = cursor.fetchmany(tamanho_lote)
+            if not linhas:
+                break
+            if colunas is None:
+                colunas = [desc[0] for desc in cursor.description]
+            yield {coluna: list(valores) for coluna, valores in zip(colunas, zip(*linhas))}
+
+        cursor.close()
+        conn.commit()
+
+    finally:
+        # Abandonado no meio ou com erro, devolver_conexao faz o rollback
+        # e o cursor nomeado é fechado junto com a transação
+        devolver_conexao(conn)
+
+
+# Tipos da série partida a partida dos jogadores (buscar_series_jogadores_df)
+TIPOS_SERIES_JOGADORES = {
+    "jogador_id": np.int32,
+    "nome": "category",
+    "partida_id": np.int64,
+    "data": "datetime64[ns]",
+    "minutos_jogados": pd.Int16Dtype(),
+    "golos": pd.Int16Dtype(),
+    "assistencias": pd.Int16Dtype(),
+    "xg": np.float64,
+    "xa": np.float64,
+    "distancia_km": np.float64,
+    "perc_passes": np.float64,
+}
+
+
+@em_cache()
+def buscar_series_jogadores_df(usuario_id: int, temporada=None, competicao=None) -> pd.DataFrame:
+    """
+    Estatísticas de cada jogador em cada partida, com a data da partida,
+    para as janelas de forma (forma.py).
+
+    Returns:
+        pd.DataFrame: jogador_id, nome, partida_id, data, minutos_jogados, golos,
+                      assistencias, xg, xa, distancia_km e perc_passes, ordenado
+                      por jogador e data. DataFrame vazio em caso de erro.
+    """
+    query = """
+        SELECT
+            e.jogador_id, j.nome, e.partida_id, p.data,
+            e.minutos_jogados, e.golos, e.assistencias, e.xg, e.xa, e.distancia_km, e.perc_passes
+        FROM estatisticas_jogadores e
+        JOIN partidas p ON p.id = e.partida_id
+        JOIN jogadores j ON j.id = e.jogador_id
+        WHERE e.usuario_id = %s
+    """
+    params = [usuario_id]
+
+    if temporada:
+        query += " AND p.temporada = %s"
+        params.append(temporada)
+
+    if competicao:
+        query += " AND p.competicao = %s"
+        params.append(competicao)
+
+    query += " ORDER BY e.jogador_id, p.data, e.partida_id"
+
+    conn = conectar()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(query, tuple(params))
+        return _partidas_para_df(cursor, TIPOS_SERIES_JOGADORES)
+
+    except Exception as e:
+        print(f"Erro ao buscar séries de jogadores: {e}")
+        return pd.DataFrame()
+
+    finally:
+        devolver_conexao(conn)
+
+
+# =======================
+# AGREGADOS DE JOGADORES (mantidos incrementalmente)
+# =======================
+# Estatísticas somadas por jogador; percentuais entram como soma para
+# que a média seja soma / partidas.
+CAMPOS_AGREGADOS_JOGADOR = [
+    "minutos_jogados", "distancia_km", "xa", "assistencias", "xg", "golos",
+    "passes_progressivos", "oportunidades_flagrantes", "passes_decisivos",
+    "fintas", "faltas_sofridas", "remate_na_barra",
+    "faltas_cometidas", "intercepcoes", "alivios", "desarmes_decisivos",
+    "defesas_seguras", "defesas_ponta_dedos", "defesas_desviadas", "remates_sofridos",
+    "lancamentos", "cantos", "livres_defensivos", "livres_ofensivos",
+    "perc_passes",
+]
+
+# Uma linha por (usuário, jogador, temporada, competição), chaveada pelo id
+# inteiro do jogador. Atualizada na mesma transação que substitui/apaga as
+# estatísticas de uma partida.
+SQL_CRIAR_AGREGADOS_JOGADORES = f"""
+    CREATE TABLE IF NOT EXISTS agregados_jogadores (
+        usuario_id  INTEGER NOT NULL,
+        jogador_id  INTEGER NOT NULL REFERENCES jogadores(id) ON DELETE CASCADE,
+        temporada   TEXT    NOT NULL,
+        competicao  TEXT    NOT NULL,
+        partidas    INTEGER NOT NULL DEFAULT 0,
+        {", ".join(f"soma_{c} NUMERIC NOT NULL DEFAULT 0" for c in CAMPOS_AGREGADOS_JOGADOR)},
+        PRIMARY KEY (usuario_id, jogador_id, temporada, competicao)
+    )
+"""
+
+
+def _aplicar_delta_agregados_jogadores(cursor, filtro_estatisticas, params, sinal):
+    """
+    Soma (sinal=+1) ou subtrai (sinal=-1) aos agregados_jogadores as linhas de
+    estatisticas_jogadores (alias `e`) que satisfazem `filtro_estatisticas`.
+    Deve rodar dentro da transação que grava/apaga as estatísticas.
+    """
+    todas = ["partidas"] + [f"soma_{c}" for c in CAMPOS_AGREGADOS_JOGADOR]
+
+    cursor.execute(f"""
+        INSERT INTO agregados_jogadores AS a (
+            usuario_id, jogador_id, temporada, competicao, {", ".join(todas)}
+        )
+        SELECT
+            e.usuario_id, e.jogador_id, COALESCE(p.temporada, ''), COALESCE(p.competicao, ''),
+            %(sinal)s * COUNT(*),
+            {", ".join(f"%(sinal)s * COALESCE(SUM(e.{c}), 0)" for c in CAMPOS_AGREGADOS_JOGADOR)}
+        FROM estatisticas_jogadores e
+        JOIN partidas p ON p.id = e.partida_id
+        WHERE {filtro_estatisticas} AND e.jogador_id IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (usuario_id, jogador_id, temporada, competicao) DO UPDATE SET
+            {", ".join(f"{c} = a.{c} + EXCLUDED.{c}" for c in todas)}
+    """, {**params, "sinal": sinal})
+
+    if sinal < 0:
+        cursor.execute(f"""
+            DELETE FROM agregados_jogadores
+            WHERE partidas <= 0
+              AND usuario_id IN (SELECT e.usuario_id FROM estatisticas_jogadores e WHERE {filtro_estatisticas})
+        """, params)
+
+
+def reconstruir_agregados_jogadores(usuario_id=None):
+    """
+    Recalcula do zero os agregados_jogadores (de um usuário ou de todos),
+    criando a tabela se necessário.
+
+    Returns:
+        bool: True em caso de sucesso
+    """
+    conn = conectar()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(SQL_CRIAR_JOGADORES)
+        cursor.execute(SQL_CRIAR_AGREGADOS_JOGADORES)
+
+        if usuario_id:
+            cursor.execute("DELETE FROM agregados_jogadores WHERE usuario_id = %s", (usuario_id,))
+            _aplicar_delta_agregados_jogadores(cursor, "e.usuario_id = %(usuario_id)s", {"usuario_id": usuario_id}, +1)
+        else:
+            cursor.execute("DELETE FROM agregados_jogadores")
+            _aplicar_delta_agregados_jogadores(cursor, "TRUE", {}, +1)
+
+        conn.commit()
+        invalidar_usuario(usuario_id)
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Erro ao reconstruir agregados de jogadores: {e}")
+        return False
+
+    finally:
+        devolver_conexao(conn)
+
+
+@em_cache()
+def buscar_agregados_jogadores(usuario_id: int, temporada=None, competicao=None) -> pd.DataFrame:
+    """
+    Retorna os totais de carreira de cada jogador (opcionalmente restritos a
+    uma temporada/competição), já com as colunas por 90 minutos.
+
+    Returns:
+        pd.DataFrame: Uma linha por jogador com jogador_id, nome, partidas,
+                      minutos_total, golos, assistencias, xg_total, xa_total, dist_total, passes_prog,
+                      passes_dec, intercepcoes, faltas_*, fintas, perc_passes_med,
+                      golos_90, xg_90, contrib_90 e dist_90.
+                      DataFrame vazio se não houver dados.
+    """
+    query = """
+        SELECT
+            a.jogador_id,
+            j.nome,
+            SUM(a.partidas)                  AS partidas,
+            SUM(a.soma_minutos_jogados)      AS minutos_total,
+            SUM(a.soma_golos)                AS golos,
+            SUM(a.soma_assistencias)         AS assistencias,
+            SUM(a.soma_xg)                   AS xg_total,
+            SUM(a.soma_xa)                   AS xa_total,
+            SUM(a.soma_intercepcoes)         AS intercepcoes,
+            SUM(a.soma_faltas_cometidas)     AS faltas_cometidas,
+            SUM(a.soma_faltas_sofridas)      AS faltas_sofridas,
+            SUM(a.soma_passes_progressivos)  AS passes_prog,
+            SUM(a.soma_passes_decisivos)     AS passes_dec,
+            SUM(a.soma_fintas)               AS fintas,
+            SUM(a.soma_distancia_km)         AS dist_total,
+            SUM(a.soma_perc_passes) / NULLIF(SUM(a.partidas), 0) AS perc_passes_med
+        FROM agregados_jogadores a
+        JOIN jogadores j ON j.id = a.jogador_id
+        WHERE a.usuario_id = %s
+    """
+    params = [usuario_id]
+
+    if temporada:
+        query += " AND a.temporada = %s"
+        params.append(temporada)
+
+    if competicao:
+        query += " AND a.competicao = %s"
+        params.append(competicao)
+
+    query += " GROUP BY a.jogador_id, j.nome ORDER BY minutos_total DESC"
+
+    conn = conectar()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(query, tuple(params))
+        colunas = [desc[0] for desc in cursor.description]
+        df = pd.DataFrame(cursor.fetchall(), columns=colunas)
+
+        for coluna in colunas[2:]:
+            df[coluna] = pd.to_numeric(df[coluna], errors="coerce").astype(float).fillna(0)
+        df["partidas"] = df["partidas"].astype(int)
+        df["jogador_id"] = df["jogador_id"].astype(np.int64)
+
+        min_safe = df["minutos_total"].replace(0, float("nan"))
+        df["golos_90"]   = (df["golos"]      / min_safe * 90).round(2)
+        df["xg_90"]      = (df["xg_total"]   / min_safe * 90).round(2)
+        df["contrib_90"] = ((df["golos"] + df["assistencias"]) / min_safe * 90).round(2)
+        df["dist_90"]    = (df["dist_total"] / min_safe * 90).round(2)
+        return df
+
+    except Exception as e:
+        print(f"Erro ao buscar agregados de jogadores: {e}")
+        return pd.DataFrame()
+
+    finally:
+        devolver_conexao(conn)
+
+
+@em_cache()
+def contar_partidas_com_jogadores(usuario_id: int, temporada=None, competicao=None):
+    """
+    Conta as partidas (no filtro informado) que têm estatísticas de jogadores importadas.
+    None em caso de erro (não entra no cache, ao contrário de um 0 real).
+    """
+    query = """
+        SELECT COUNT(DISTINCT e.partida_id)
+        FROM estatisticas_jogadores e
+        JOIN partidas p ON p.id = e.partida_id
+        WHERE e.usuario_id = %s
+    """
+    params = [usuario_id]
+
+    if temporada:
+        query += " AND p.temporada = %s"
+        params.append(temporada)
+
+    if competicao:
+        query += " AND p.competicao = %s"
+        params.append(competicao)
+
+    conn = conectar()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(query, tuple(params))
+        return cursor.fetchone()[0]
+
+    except Exception as e:
+        print(f"Erro ao contar partidas com jogadores: {e}")
+        return None
+
+    finally:
+        devolver_conexao(conn)
+
+
+@em_cache()
+def buscar_ids_partidas_com_jogadores(usuario_id: int) -> list:
+    """IDs das partidas do usuário que têm estatísticas de jogadores importadas."""
+    conn = conectar()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            SELECT DISTINCT partida_id
+            FROM estatisticas_jogadores
+            WHERE usuario_id = %s
+        """, (usuario_id,))
+        return [row[0] for row in cursor.fetchall()]
+
+    except Exception as e:
+        print(f"Erro ao buscar partidas com jogadores: {e}")
+        return []
+
+    finally:
+        devolver_conexao(conn)
 
 
+@em_cache()
 def contar_partidas_usuario(usuario_id):
+    """Total de partidas do usuário; None em caso de erro (não entra no cache)."""
     conn = conectar()
     cursor = conn.cursor()
 
@@ -328,7 +1117,13 @@ def contar_partidas_usuario(usuario_id):
 
     except Exception as e:
         print(f"Erro ao contar partidas: {e}")
-        return 0
+        return None
 
     finally:
-        conn.close()
\ No newline at end of file
+        devolver_conexao(conn)
+
+
+if __name__ == "__main__":
+    # Carga inicial das tabelas de resumo a partir das partidas existentes
+    print("Resumo das temporadas reconstruído:", reconstruir_resumo_temporadas())
+    print("Agregados de jogadores reconstruídos:", reconstruir_agregados_jogadores())
@@ -0,0 +1,169 @@
+"""
+Forma dos jogadores em janelas móveis
+
+Para cada jogador e cada partida: xG, xA, G+A e distância por 90 minutos e
+% de passes certos nas últimas N partidas ou nos últimos N dias. O elenco
+inteiro é calculado numa passada só: as linhas vêm ordenadas por
+(jogador, data), cada janela é um intervalo [inicio, i] dentro do grupo do
+jogador e a soma dela sai de um único cumsum global.
+
+    python forma.py [--jogadores 40 --temporadas 5]   # benchmark
+"""
+
+import numpy as np
+import pandas as pd
+
+# =======================
+# CONFIGURAÇÃO
+# =======================
+# Abaixo disso (na janela) os valores por 90 minutos ficam vazios: uma
+# entrada de 5 minutos não vira "2 xG/90"
+MINUTOS_MINIMOS = 90
+
+# Métricas de forma: (coluna, rótulo)
+METRICAS_FORMA = [
+    ("xg_90", "xG/90"),
+    ("xa_90", "xA/90"),
+    ("contrib_90", "G+A/90"),
+    ("dist_90", "Dist./90 (km)"),
+    ("perc_passes", "% Passes"),
+]
+
+
+# =======================
+# KERNELS
+# =======================
+def _codigos_grupo(chaves):
+    """Códigos densos 0..G-1 de um array já agrupado (grupos contíguos)."""
+    if len(chaves) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate([[0], np.cumsum(chaves[1:] != chaves[:-1])]).astype(np.int64)
+
+
+def inicio_por_jogos(codigos, jogos):
+    """Primeira linha da janela das últimas `jogos` linhas de cada grupo."""
+    n = len(codigos)
+    posicao = np.arange(n)
+    mudou = np.concatenate([[True], codigos[1:] != codigos[:-1]]) if n else np.zeros(0, dtype=bool)
+    primeira_do_grupo = np.maximum.accumulate(np.where(mudou, posicao, 0)) if n else posicao
+    return np.maximum(posicao - jogos + 1, primeira_do_grupo)
+
+
+def inicio_por_dias(codigos, dias, janela_dias):
+    """
+    Primeira linha da janela dos últimos `janela_dias` dias (a data da
+    própria linha conta como o último dia) de cada grupo.
+    """
+    if len(codigos) == 0:
+        return np.zeros(0, dtype=np.int64)
+    dias = dias - dias.min()
+    # Chave composta crescente; o espaço entre grupos é maior que a janela
+    # e a busca nunca atravessa para o jogador anterior
+    passo = int(dias.max()) + janela_dias + 1
+    chave = codigos * passo + dias
+    return np.searchsorted(chave, chave - janela_dias + 1, side="left")
+
+
+def soma_janela(valores, inicio):
+    """Soma de valores[inicio[i]:i + 1] para cada i, por diferença de cumsum."""
+    acumulado = np.concatenate([[0.0], np.cumsum(valores, dtype=np.float64)])
+    return acumulado[1:] - acumulado[inicio]
+
+
+# =======================
+# FORMA DO ELENCO
+# =======================
+def calcular_forma(df, jogos=None, dias=None, minutos_minimos=MINUTOS_MINIMOS):
+    """
+    Janelas móveis de todos os jogadores.
+
+    Args:
+        df:              Saída de buscar_series_jogadores_df (jogador_id, nome,
+                         partida_id, data, minutos_jogados, golos, assistencias,
+                         xg, xa, distancia_km, perc_passes)
+        jogos:           Tamanho da janela em partidas do jogador
+        dias:            Tamanho da janela em dias (usado se `jogos` for None)
+        minutos_minimos: Minutos na janela para exibir os valores por 90
+
+    Returns:
+        pd.DataFrame: jogador_id, nome, partida_id, data, jogos, minutos, xg_90,
+                      xa_90, contrib_90, dist_90 e perc_passes, uma linha por
+                      (jogador, partida), ordenado por jogador e data
+    """
+    if (jogos is None) == (dias is None):
+        raise ValueError("Informe exatamente um de `jogos` ou `dias`.")
+
+    df = df[df["data"].notna()].sort_values(["jogador_id", "data", "partida_id"], kind="stable")
+    codigos = _codigos_grupo(df["jogador_id"].to_numpy())
+
+    if jogos is not None:
+        inicio = inicio_por_jogos(codigos, int(jogos))
+    else:
+        dias_partida = df["data"].to_numpy().astype("datetime64[D]").astype(np.int64)
+        inicio = inicio_por_dias(codigos, dias_partida, int(dias))
+
+    def _coluna(nome):
+        return np.nan_to_num(df[nome].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    minutos = soma_janela(_coluna("minutos_jogados"), inicio)
+    por_90 = np.where(minutos >= max(minutos_minimos, 1), 90.0 / np.maximum(minutos, 1), np.nan)
+
+    passes = df["perc_passes"].to_numpy(dtype=np.float64, na_value=np.nan)
+    passes_validos = soma_janela(~np.isnan(passes), inicio)
+
+    forma = df[["jogador_id", "nome", "partida_id", "data"]].reset_index(drop=True)
+    forma["jogos"] = (np.arange(len(df)) - inicio + 1).astype(np.int16)
+    forma["minutos"] = minutos
+    forma["xg_90"] = soma_janela(_coluna("xg"), inicio) * por_90
+    forma["xa_90"] = soma_janela(_coluna("xa"), inicio) * por_90
+    forma["contrib_90"] = soma_janela(_coluna("golos") + _coluna("assistencias"), inicio) * por_90
+    forma["dist_90"] = soma_janela(_coluna("distancia_km"), inicio) * por_90
+    forma["perc_passes"] = soma_janela(np.nan_to_num(passes), inicio) / np.where(
+        passes_validos > 0, passes_validos, np.nan
+    )
+    return forma
+
+
+def forma_atual(forma):
+    """Última janela de cada jogador (a forma "hoje")."""
+    ids = forma["jogador_id"].to_numpy()
+    ultima = np.concatenate([ids[1:] != ids[:-1], [True]]) if len(ids) else np.zeros(0, dtype=bool)
+    return forma[ultima].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark da forma dos jogadores")
+    parser.add_argument("--jogadores", type=int, default=40)
+    parser.add_argument("--temporadas", type=int, default=5)
+    parser.add_argument("--partidas-por-temporada", type=int, default=55)
+    args = parser.parse_args()
+
+    rnd = np.random.default_rng(0)
+    n_partidas = args.temporadas * args.partidas_por_temporada
+    datas = pd.date_range("2020-08-01", periods=n_partidas, freq="6D")
+
+    # Cada jogador participa de ~60% das partidas
+    linhas = rnd.random((args.jogadores, n_partidas)) < 0.6
+    jogador, partida = np.nonzero(linhas)
+    n = len(jogador)
+    df = pd.DataFrame({
+        "jogador_id": jogador.astype(np.int32),
+        "nome": pd.Categorical([f"Jogador {j}" for j in jogador]),
+        "partida_id": partida.astype(np.int64),
+        "data": datas[partida],
+        "minutos_jogados": rnd.integers(1, 91, n).astype(np.int16),
+        "golos": rnd.poisson(0.15, n).astype(np.int16),
+        "assistencias": rnd.poisson(0.1, n).astype(np.int16),
+        "xg": rnd.gamma(0.5, 0.3, n),
+        "xa": rnd.gamma(0.5, 0.2, n),
+        "distancia_km": rnd.uniform(1, 12, n),
+        "perc_passes": rnd.uniform(50, 95, n),
+    })
+
+    for janela in ({"jogos": 5}, {"jogos": 10}, {"dias": 30}, {"dias": 90}):
+        inicio = time.perf_counter()
+        calcular_forma(df, **janela)
+        print(f"{n} linhas, {janela}: {(time.perf_counter() - inicio) * 1000:.2f} ms")
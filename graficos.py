@@ -0,0 +1,202 @@
+"""
+Utilitários de gráficos do dashboard
+
+- Redução de pontos para históricos longos: Largest-Triangle-Three-Buckets
+  (LTTB) mantém o primeiro e o último ponto e, em cada balde intermediário,
+  o ponto que forma o maior triângulo com o ponto escolhido antes e a
+  média do balde seguinte. Preserva picos e vales com uma fração dos pontos.
+- Reta de tendência por mínimos quadrados (com R² e faixa de confiança),
+  feita com numpy em vez do trendline="ols" do Plotly (statsmodels).
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# =======================
+# CONFIGURAÇÃO
+# =======================
+LIMITE_PONTOS_PADRAO = 600   # acima disso as séries são reduzidas
+LIMITE_WEBGL = 300           # acima disso os scatters usam WebGL
+
+
+def _como_numero(x):
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def _como_float(valores):
+    """Array float de uma Series (inteiros anuláveis: <NA> vira NaN) ou sequência."""
+    if isinstance(valores, pd.Series):
+        return valores.to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(valores, dtype=float)
+
+
+def lttb_indices(x, y, limite):
+    """
+    Índices dos pontos mantidos pelo LTTB.
+
+    Args:
+        x, y:   Arrays do mesmo tamanho (x numérico ou datetime64, crescente)
+        limite: Quantidade de pontos desejada (>= 3)
+
+    Returns:
+        np.ndarray: Índices crescentes; todos os índices se len(x) <= limite
+    """
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    x = _como_numero(np.asarray(x))
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+
+    # Baldes para os pontos entre o primeiro e o último
+    bordas = np.linspace(1, n - 1, limite - 1).astype(int)
+    indices = np.empty(limite, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        prox_inicio, prox_fim = bordas[i + 1], bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def reduzir_serie(df, x, y, limite=LIMITE_PONTOS_PADRAO):
+    """
+    Recorte de df com no máximo `limite` linhas, escolhidas pelo LTTB sobre (x, y).
+    DataFrames menores que o limite voltam inalterados.
+    """
+    if len(df) <= limite:
+        return df
+    indices = lttb_indices(df[x].to_numpy(), _como_float(df[y]), limite)
+    return df.iloc[indices]
+
+
+def filtrar_periodo(df, coluna, periodo):
+    """Linhas de df com `coluna` dentro do intervalo (inicio, fim), inclusive."""
+    if periodo is None:
+        return df
+    inicio, fim = (pd.Timestamp(p) for p in periodo)
+    datas = df[coluna]
+    return df[(datas >= inicio) & (datas <= fim + pd.Timedelta(days=1) - pd.Timedelta(1))]
+
+
+# =======================
+# RETA DE TENDÊNCIA (MÍNIMOS QUADRADOS)
+# =======================
+# Quantil 97,5% da t de Student para 1..30 graus de liberdade;
+# acima disso usa-se a normal (1,96).
+_T_975 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+
+def _t_critico(graus_liberdade):
+    if graus_liberdade <= 0:
+        return float("nan")
+    if graus_liberdade <= len(_T_975):
+        return _T_975[graus_liberdade - 1]
+    return 1.96
+
+
+def ajustar_reta(x, y):
+    """
+    Ajuste y = intercepto + inclinacao * x por mínimos quadrados.
+
+    Returns:
+        dict | None: inclinacao, intercepto, r2, n e os termos para a faixa de
+                     confiança (media_x, sxx, erro_padrao, t). None se houver
+                     menos de 2 pontos ou x constante.
+    """
+    x = _como_float(x)
+    y = _como_float(y)
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+
+    n = len(x)
+    if n < 2:
+        return None
+
+    media_x, media_y = x.mean(), y.mean()
+    dx = x - media_x
+    sxx = float(dx @ dx)
+    if sxx == 0:
+        return None
+
+    inclinacao = float(dx @ (y - media_y)) / sxx
+    intercepto = media_y - inclinacao * media_x
+    residuos = y - (intercepto + inclinacao * x)
+    sqr = float(residuos @ residuos)
+    sqt = float((y - media_y) @ (y - media_y))
+
+    return {
+        "inclinacao": inclinacao,
+        "intercepto": intercepto,
+        "r2": 1 - sqr / sqt if sqt > 0 else 1.0,
+        "n": n,
+        "media_x": media_x,
+        "sxx": sxx,
+        "erro_padrao": np.sqrt(sqr / (n - 2)) if n > 2 else float("nan"),
+        "t": _t_critico(n - 2),
+    }
+
+
+def pontos_reta(ajuste, x_min, x_max, pontos=50):
+    """
+    Pontos da reta ajustada e da faixa de confiança de 95% da média.
+
+    Returns:
+        tuple: (x, y, y_inferior, y_superior) como arrays
+    """
+    x = np.linspace(x_min, x_max, pontos)
+    y = ajuste["intercepto"] + ajuste["inclinacao"] * x
+    margem = ajuste["t"] * ajuste["erro_padrao"] * np.sqrt(
+        1 / ajuste["n"] + (x - ajuste["media_x"]) ** 2 / ajuste["sxx"]
+    )
+    return x, y, y - margem, y + margem
+
+
+def adicionar_reta_tendencia(fig, x, y, nome, cor, cor_faixa=None):
+    """
+    Adiciona à figura a reta de tendência de (x, y) e, se houver pontos
+    suficientes, a faixa de confiança. Retorna o ajuste (ou None).
+    """
+    ajuste = ajustar_reta(x, y)
+    if ajuste is None:
+        return None
+
+    x_arr = _como_float(x)
+    xs, ys, inferior, superior = pontos_reta(ajuste, np.nanmin(x_arr), np.nanmax(x_arr))
+
+    if cor_faixa and not np.isnan(ajuste["erro_padrao"]):
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([xs, xs[::-1]]),
+            y=np.concatenate([superior, inferior[::-1]]),
+            fill="toself", fillcolor=cor_faixa, line=dict(width=0),
+            hoverinfo="skip", showlegend=False, legendgroup=nome,
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=xs, y=ys, mode="lines", line=dict(color=cor, width=2),
+        name=f"{nome} (R²={ajuste['r2']:.2f})", legendgroup=nome,
+        hovertemplate=(
+            f"y = {ajuste['intercepto']:.3f} + {ajuste['inclinacao']:.3f}·x"
+            f"<br>R² = {ajuste['r2']:.3f}<extra></extra>"
+        ),
+    ))
+    return ajuste
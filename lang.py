@@ -93,6 +93,11 @@ STRINGS = {
         "btn_deletar": "🗑️ Deletar partida selecionada",
         "deletar_sucesso": "✅ Partida deletada com sucesso!",
         "deletar_erro": "❌ Erro ao deletar partida.",
+        "semelhantes_titulo": "🔎 Partidas Semelhantes",
+        "semelhantes_selecionar": "Partida de referência",
+        "semelhantes_qtd": "Quantidade",
+        "semelhantes_poucas": "Cadastre pelo menos 2 partidas para comparar.",
+        "semelhantes_resumo": "Nas {n} partidas mais parecidas: {v} vitória(s), {e} empate(s), {d} derrota(s).",
         "ia_titulo": "🧠 Assistente IA — Performance Analyst",
         "ia_descricao": "Análise tática baseada nos dados das suas partidas cadastradas.",
         "ia_sem_partidas": "⚠️ Nenhuma partida cadastrada. Adicione partidas para ativar o Assistente IA.",
@@ -135,8 +140,69 @@ STRINGS = {
         "importar_tab_gr": "🧤 Guarda-Redes",
         "importar_tab_bolas_paradas": "⚽ Bolas Paradas",
         "importar_reimportar_aviso": "⚠️ Esta partida já possui estatísticas importadas. Confirmar substituirá os dados anteriores.",
+        "importar_modo": "Modo de importação",
+        "importar_modo_unico": "📄 Uma partida",
+        "importar_modo_lote": "📚 Temporada (vários arquivos)",
+        "importar_lote_temporada": "Temporada das partidas",
+        "importar_lote_upload_label": "📂 Carregar arquivos HTML da temporada",
+        "importar_lote_mapeamento": "Confira a partida vinculada a cada arquivo (ordem dos arquivos × data das partidas)",
+        "importar_lote_col_arquivo": "Arquivo",
+        "importar_lote_col_partida": "Partida",
+        "importar_lote_duplicada": "⚠️ Cada partida só pode receber um arquivo.",
+        "importar_lote_confirmar": "✅ Processar e Salvar {n} arquivo(s)",
+        "importar_lote_lendo": "Lendo arquivos... {atual}/{total}",
+        "importar_lote_salvando": "Salvando estatísticas...",
+        "importar_lote_sucesso": "✅ {linhas} linhas de {partidas} partida(s) salvas em {segundos:.2f}s.",
+        "importar_lote_falhas": "⚠️ Arquivos ignorados (inválidos ou sem jogadores): {arquivos}",
         "ver_stats_jogadores": "👥 Ver Estatísticas dos Jogadores",
         "sem_stats_jogadores": "Nenhuma estatística de jogadores importada para esta partida.",
+        # --- Forma dos jogadores ---
+        "forma_tab": "📈 Forma",
+        "forma_titulo": "Forma recente — janelas móveis por jogador",
+        "forma_janela": "Janela",
+        "forma_janela_jogos": "Jogos",
+        "forma_janela_dias": "Dias",
+        "forma_ultimos_jogos": "Últimos N jogos",
+        "forma_ultimos_dias": "Últimos N dias",
+        "forma_metrica": "Métrica",
+        "forma_sem_dados": "Sem partidas datadas com estatísticas de jogadores.",
+        "forma_col_jogador": "Jogador",
+        "forma_col_jogos": "Jogos",
+        "forma_jogadores": "Jogadores",
+        "forma_grafico_jogos": "{metrica} — últimos {n} jogos",
+        "forma_grafico_dias": "{metrica} — últimos {n} dias",
+        # --- Jogadores semelhantes ---
+        "jog_semelhantes_tab": "🧬 Semelhantes",
+        "jog_semelhantes_titulo": "Jogadores com perfil parecido (estatísticas por 90 padronizadas)",
+        "jog_semelhantes_poucos": "São necessários ao menos 2 jogadores com {minutos}+ minutos.",
+        "jog_semelhantes_jogador": "Jogador",
+        "jog_semelhantes_qtd": "Quantidade",
+        "jog_semelhantes_col_distancia": "Distância",
+        "jog_semelhantes_legenda": "Distância 0 = perfis idênticos; ~1,4 = dois jogadores quaisquer do elenco.",
+        "jog_semelhantes_grafico": "Perfil padronizado (z-score)",
+        # --- Nível europeu ao longo do tempo ---
+        "nivel_titulo": "📅 Evolução do nível europeu",
+        "nivel_serie": "Score (últimos {n} jogos)",
+        "nivel_grafico": "Score vs padrão europeu — janela móvel de {n} jogos",
+        "nivel_eixo_data": "Data",
+        "nivel_eixo_score": "Score (−7 a 7)",
+        "nivel_por_temporada": "Por temporada",
+        "nivel_por_competicao": "Por competição",
+        "nivel_col_jogos": "Jogos",
+        "nivel_status_acima": "🟢 Acima",
+        "nivel_status_dentro": "🟡 Dentro",
+        "nivel_status_abaixo": "🔴 Abaixo",
+        # --- Exportação das estatísticas de jogadores ---
+        "exportar_jogadores_preparar": "📦 Preparar CSV das estatísticas de jogadores",
+        "exportar_jogadores_baixar": "⬇️ Baixar CSV ({n} linhas)",
+        "exportar_jogadores_erro": "❌ Erro ao exportar as estatísticas de jogadores. Tente novamente.",
+        # --- Tendência e evolução ---
+        "tend_janela": "Janela da média móvel (jogos)",
+        "tend_por_temporada": "Reiniciar a cada temporada",
+        "tend_dif_xg": "xG pró − contra (MM{n})",
+        # --- Período dos gráficos por jogo ---
+        "periodo_graficos": "Período dos gráficos por jogo",
+        "periodo_legenda": "Histórico longo: no máximo {n} pontos por série. Reduza o período para ver todos os jogos.",
     },
     "en": {
         "header_titulo": "⚽ FM Analytics 26",
@@ -230,6 +296,11 @@ STRINGS = {
         "btn_deletar": "🗑️ Delete selected match",
         "deletar_sucesso": "✅ Match deleted successfully!",
         "deletar_erro": "❌ Error deleting match.",
+        "semelhantes_titulo": "🔎 Similar Matches",
+        "semelhantes_selecionar": "Reference match",
+        "semelhantes_qtd": "How many",
+        "semelhantes_poucas": "Add at least 2 matches to compare.",
+        "semelhantes_resumo": "In the {n} most similar matches: {v} win(s), {e} draw(s), {d} loss(es).",
         "ia_titulo": "🧠 AI Assistant — Performance Analyst",
         "ia_descricao": "Tactical analysis based on your registered match data.",
         "ia_sem_partidas": "⚠️ No matches registered. Add matches to activate the AI Assistant.",
@@ -272,8 +343,69 @@ STRINGS = {
         "importar_tab_gr": "🧤 Goalkeeper",
         "importar_tab_bolas_paradas": "⚽ Set Pieces",
         "importar_reimportar_aviso": "⚠️ This match already has imported statistics. Confirming will replace the previous data.",
+        "importar_modo": "Import mode",
+        "importar_modo_unico": "📄 Single match",
+        "importar_modo_lote": "📚 Season (multiple files)",
+        "importar_lote_temporada": "Season of the matches",
+        "importar_lote_upload_label": "📂 Upload the season's HTML files",
+        "importar_lote_mapeamento": "Check the match linked to each file (file order × match date)",
+        "importar_lote_col_arquivo": "File",
+        "importar_lote_col_partida": "Match",
+        "importar_lote_duplicada": "⚠️ Each match can only receive one file.",
+        "importar_lote_confirmar": "✅ Process and Save {n} file(s)",
+        "importar_lote_lendo": "Reading files... {atual}/{total}",
+        "importar_lote_salvando": "Saving statistics...",
+        "importar_lote_sucesso": "✅ {linhas} rows from {partidas} match(es) saved in {segundos:.2f}s.",
+        "importar_lote_falhas": "⚠️ Skipped files (invalid or without players): {arquivos}",
         "ver_stats_jogadores": "👥 View Player Statistics",
         "sem_stats_jogadores": "No player statistics imported for this match.",
+        # --- Player form ---
+        "forma_tab": "📈 Form",
+        "forma_titulo": "Recent form — rolling windows per player",
+        "forma_janela": "Window",
+        "forma_janela_jogos": "Matches",
+        "forma_janela_dias": "Days",
+        "forma_ultimos_jogos": "Last N matches",
+        "forma_ultimos_dias": "Last N days",
+        "forma_metrica": "Metric",
+        "forma_sem_dados": "No dated matches with player statistics.",
+        "forma_col_jogador": "Player",
+        "forma_col_jogos": "Matches",
+        "forma_jogadores": "Players",
+        "forma_grafico_jogos": "{metrica} — last {n} matches",
+        "forma_grafico_dias": "{metrica} — last {n} days",
+        # --- Similar players ---
+        "jog_semelhantes_tab": "🧬 Similar",
+        "jog_semelhantes_titulo": "Players with a similar profile (standardized per-90 statistics)",
+        "jog_semelhantes_poucos": "At least 2 players with {minutos}+ minutes are needed.",
+        "jog_semelhantes_jogador": "Player",
+        "jog_semelhantes_qtd": "How many",
+        "jog_semelhantes_col_distancia": "Distance",
+        "jog_semelhantes_legenda": "Distance 0 = identical profiles; ~1.4 = any two players in the squad.",
+        "jog_semelhantes_grafico": "Standardized profile (z-score)",
+        # --- European level over time ---
+        "nivel_titulo": "📅 European level over time",
+        "nivel_serie": "Score (last {n} matches)",
+        "nivel_grafico": "Score vs European standard — rolling {n}-match window",
+        "nivel_eixo_data": "Date",
+        "nivel_eixo_score": "Score (−7 to 7)",
+        "nivel_por_temporada": "By season",
+        "nivel_por_competicao": "By competition",
+        "nivel_col_jogos": "Matches",
+        "nivel_status_acima": "🟢 Above",
+        "nivel_status_dentro": "🟡 Within",
+        "nivel_status_abaixo": "🔴 Below",
+        # --- Player statistics export ---
+        "exportar_jogadores_preparar": "📦 Prepare player statistics CSV",
+        "exportar_jogadores_baixar": "⬇️ Download CSV ({n} rows)",
+        "exportar_jogadores_erro": "❌ Error exporting player statistics. Please try again.",
+        # --- Trend and evolution ---
+        "tend_janela": "Moving average window (matches)",
+        "tend_por_temporada": "Restart every season",
+        "tend_dif_xg": "xG for − against (MA{n})",
+        # --- Per-match chart period ---
+        "periodo_graficos": "Per-match chart period",
+        "periodo_legenda": "Long history: at most {n} points per series. Narrow the period to see every match.",
     },
     "es": {
         "header_titulo": "⚽ FM Analytics 26",
@@ -367,6 +499,11 @@ STRINGS = {
         "btn_deletar": "🗑️ Eliminar partido seleccionado",
         "deletar_sucesso": "✅ ¡Partido eliminado con éxito!",
         "deletar_erro": "❌ Error al eliminar el partido.",
+        "semelhantes_titulo": "🔎 Partidos Similares",
+        "semelhantes_selecionar": "Partido de referencia",
+        "semelhantes_qtd": "Cantidad",
+        "semelhantes_poucas": "Registra al menos 2 partidos para comparar.",
+        "semelhantes_resumo": "En los {n} partidos más parecidos: {v} victoria(s), {e} empate(s), {d} derrota(s).",
         "ia_titulo": "🧠 Asistente IA — Analista de Rendimiento",
         "ia_descricao": "Análisis táctico basado en los datos de tus partidos registrados.",
         "ia_sem_partidas": "⚠️ Ningún partido registrado. Añade partidos para activar el Asistente IA.",
@@ -409,8 +546,69 @@ STRINGS = {
         "importar_tab_gr": "🧤 Portero",
         "importar_tab_bolas_paradas": "⚽ Balones Parados",
         "importar_reimportar_aviso": "⚠️ Este partido ya tiene estadísticas importadas. Confirmar reemplazará los datos anteriores.",
+        "importar_modo": "Modo de importación",
+        "importar_modo_unico": "📄 Un partido",
+        "importar_modo_lote": "📚 Temporada (varios archivos)",
+        "importar_lote_temporada": "Temporada de los partidos",
+        "importar_lote_upload_label": "📂 Subir archivos HTML de la temporada",
+        "importar_lote_mapeamento": "Revisa el partido vinculado a cada archivo (orden de archivos × fecha de los partidos)",
+        "importar_lote_col_arquivo": "Archivo",
+        "importar_lote_col_partida": "Partido",
+        "importar_lote_duplicada": "⚠️ Cada partido solo puede recibir un archivo.",
+        "importar_lote_confirmar": "✅ Procesar y Guardar {n} archivo(s)",
+        "importar_lote_lendo": "Leyendo archivos... {atual}/{total}",
+        "importar_lote_salvando": "Guardando estadísticas...",
+        "importar_lote_sucesso": "✅ {linhas} filas de {partidas} partido(s) guardadas en {segundos:.2f}s.",
+        "importar_lote_falhas": "⚠️ Archivos ignorados (inválidos o sin jugadores): {arquivos}",
         "ver_stats_jogadores": "👥 Ver Estadísticas de Jugadores",
         "sem_stats_jogadores": "No hay estadísticas de jugadores importadas para este partido.",
+        # --- Forma de los jugadores ---
+        "forma_tab": "📈 Forma",
+        "forma_titulo": "Forma reciente — ventanas móviles por jugador",
+        "forma_janela": "Ventana",
+        "forma_janela_jogos": "Partidos",
+        "forma_janela_dias": "Días",
+        "forma_ultimos_jogos": "Últimos N partidos",
+        "forma_ultimos_dias": "Últimos N días",
+        "forma_metrica": "Métrica",
+        "forma_sem_dados": "No hay partidos con fecha y estadísticas de jugadores.",
+        "forma_col_jogador": "Jugador",
+        "forma_col_jogos": "Partidos",
+        "forma_jogadores": "Jugadores",
+        "forma_grafico_jogos": "{metrica} — últimos {n} partidos",
+        "forma_grafico_dias": "{metrica} — últimos {n} días",
+        # --- Jugadores similares ---
+        "jog_semelhantes_tab": "🧬 Similares",
+        "jog_semelhantes_titulo": "Jugadores con perfil parecido (estadísticas por 90 estandarizadas)",
+        "jog_semelhantes_poucos": "Se necesitan al menos 2 jugadores con {minutos}+ minutos.",
+        "jog_semelhantes_jogador": "Jugador",
+        "jog_semelhantes_qtd": "Cantidad",
+        "jog_semelhantes_col_distancia": "Distancia",
+        "jog_semelhantes_legenda": "Distancia 0 = perfiles idénticos; ~1,4 = dos jugadores cualesquiera de la plantilla.",
+        "jog_semelhantes_grafico": "Perfil estandarizado (z-score)",
+        # --- Nivel europeo a lo largo del tiempo ---
+        "nivel_titulo": "📅 Evolución del nivel europeo",
+        "nivel_serie": "Score (últimos {n} partidos)",
+        "nivel_grafico": "Score vs estándar europeo — ventana móvil de {n} partidos",
+        "nivel_eixo_data": "Fecha",
+        "nivel_eixo_score": "Score (−7 a 7)",
+        "nivel_por_temporada": "Por temporada",
+        "nivel_por_competicao": "Por competición",
+        "nivel_col_jogos": "Partidos",
+        "nivel_status_acima": "🟢 Por encima",
+        "nivel_status_dentro": "🟡 Dentro",
+        "nivel_status_abaixo": "🔴 Por debajo",
+        # --- Exportación de estadísticas de jugadores ---
+        "exportar_jogadores_preparar": "📦 Preparar CSV de estadísticas de jugadores",
+        "exportar_jogadores_baixar": "⬇️ Descargar CSV ({n} filas)",
+        "exportar_jogadores_erro": "❌ Error al exportar las estadísticas de jugadores. Inténtalo de nuevo.",
+        # --- Tendencia y evolución ---
+        "tend_janela": "Ventana de la media móvil (partidos)",
+        "tend_por_temporada": "Reiniciar en cada temporada",
+        "tend_dif_xg": "xG a favor − en contra (MM{n})",
+        # --- Período de los gráficos por partido ---
+        "periodo_graficos": "Período de los gráficos por partido",
+        "periodo_legenda": "Historial largo: como máximo {n} puntos por serie. Reduce el período para ver todos los partidos.",
     },
     "pt-pt": {
         "header_titulo": "⚽ FM Analytics 26",
@@ -504,6 +702,11 @@ STRINGS = {
         "btn_deletar": "🗑️ Apagar partida selecionada",
         "deletar_sucesso": "✅ Partida apagada com sucesso!",
         "deletar_erro": "❌ Erro ao apagar a partida.",
+        "semelhantes_titulo": "🔎 Partidas Semelhantes",
+        "semelhantes_selecionar": "Partida de referência",
+        "semelhantes_qtd": "Quantidade",
+        "semelhantes_poucas": "Regista pelo menos 2 partidas para comparar.",
+        "semelhantes_resumo": "Nas {n} partidas mais parecidas: {v} vitória(s), {e} empate(s), {d} derrota(s).",
         "ia_titulo": "🧠 Assistente IA — Analista de Desempenho",
         "ia_descricao": "Análise tática baseada nos dados das tuas partidas registadas.",
         "ia_sem_partidas": "⚠️ Nenhuma partida registada. Adiciona partidas para ativar o Assistente IA.",
@@ -546,8 +749,69 @@ STRINGS = {
         "importar_tab_gr": "🧤 Guarda-Redes",
         "importar_tab_bolas_paradas": "⚽ Bolas Paradas",
         "importar_reimportar_aviso": "⚠️ Este jogo já tem estatísticas importadas. Confirmar substituirá os dados anteriores.",
+        "importar_modo": "Modo de importação",
+        "importar_modo_unico": "📄 Um jogo",
+        "importar_modo_lote": "📚 Temporada (vários ficheiros)",
+        "importar_lote_temporada": "Temporada dos jogos",
+        "importar_lote_upload_label": "📂 Carregar ficheiros HTML da temporada",
+        "importar_lote_mapeamento": "Confirma o jogo associado a cada ficheiro (ordem dos ficheiros × data dos jogos)",
+        "importar_lote_col_arquivo": "Ficheiro",
+        "importar_lote_col_partida": "Jogo",
+        "importar_lote_duplicada": "⚠️ Cada jogo só pode receber um ficheiro.",
+        "importar_lote_confirmar": "✅ Processar e Guardar {n} ficheiro(s)",
+        "importar_lote_lendo": "A ler ficheiros... {atual}/{total}",
+        "importar_lote_salvando": "A guardar estatísticas...",
+        "importar_lote_sucesso": "✅ {linhas} linhas de {partidas} jogo(s) guardadas em {segundos:.2f}s.",
+        "importar_lote_falhas": "⚠️ Ficheiros ignorados (inválidos ou sem jogadores): {arquivos}",
         "ver_stats_jogadores": "👥 Ver Estatísticas dos Jogadores",
         "sem_stats_jogadores": "Nenhuma estatística de jogadores importada para este jogo.",
+        # --- Forma dos jogadores ---
+        "forma_tab": "📈 Forma",
+        "forma_titulo": "Forma recente — janelas móveis por jogador",
+        "forma_janela": "Janela",
+        "forma_janela_jogos": "Jogos",
+        "forma_janela_dias": "Dias",
+        "forma_ultimos_jogos": "Últimos N jogos",
+        "forma_ultimos_dias": "Últimos N dias",
+        "forma_metrica": "Métrica",
+        "forma_sem_dados": "Sem jogos com data e estatísticas de jogadores.",
+        "forma_col_jogador": "Jogador",
+        "forma_col_jogos": "Jogos",
+        "forma_jogadores": "Jogadores",
+        "forma_grafico_jogos": "{metrica} — últimos {n} jogos",
+        "forma_grafico_dias": "{metrica} — últimos {n} dias",
+        # --- Jogadores semelhantes ---
+        "jog_semelhantes_tab": "🧬 Semelhantes",
+        "jog_semelhantes_titulo": "Jogadores com perfil parecido (estatísticas por 90 padronizadas)",
+        "jog_semelhantes_poucos": "São precisos pelo menos 2 jogadores com {minutos}+ minutos.",
+        "jog_semelhantes_jogador": "Jogador",
+        "jog_semelhantes_qtd": "Quantidade",
+        "jog_semelhantes_col_distancia": "Distância",
+        "jog_semelhantes_legenda": "Distância 0 = perfis idênticos; ~1,4 = dois jogadores quaisquer do plantel.",
+        "jog_semelhantes_grafico": "Perfil padronizado (z-score)",
+        # --- Nível europeu ao longo do tempo ---
+        "nivel_titulo": "📅 Evolução do nível europeu",
+        "nivel_serie": "Score (últimos {n} jogos)",
+        "nivel_grafico": "Score vs padrão europeu — janela móvel de {n} jogos",
+        "nivel_eixo_data": "Data",
+        "nivel_eixo_score": "Score (−7 a 7)",
+        "nivel_por_temporada": "Por época",
+        "nivel_por_competicao": "Por competição",
+        "nivel_col_jogos": "Jogos",
+        "nivel_status_acima": "🟢 Acima",
+        "nivel_status_dentro": "🟡 Dentro",
+        "nivel_status_abaixo": "🔴 Abaixo",
+        # --- Exportação das estatísticas de jogadores ---
+        "exportar_jogadores_preparar": "📦 Preparar CSV das estatísticas de jogadores",
+        "exportar_jogadores_baixar": "⬇️ Descarregar CSV ({n} linhas)",
+        "exportar_jogadores_erro": "❌ Erro ao exportar as estatísticas de jogadores. Tenta novamente.",
+        # --- Tendência e evolução ---
+        "tend_janela": "Janela da média móvel (jogos)",
+        "tend_por_temporada": "Reiniciar a cada época",
+        "tend_dif_xg": "xG pró − contra (MM{n})",
+        # --- Período dos gráficos por jogo ---
+        "periodo_graficos": "Período dos gráficos por jogo",
+        "periodo_legenda": "Histórico longo: no máximo {n} pontos por série. Reduz o período para ver todos os jogos.",
     },
 }
 
@@ -0,0 +1,241 @@
+"""
+Motor de métricas (KPIs) do time
+
+Registro declarativo dos KPIs do dashboard. Todas as métricas são
+derivadas de uma "base" por grupo (contagens e somas): a base vem do
+cubo de resumo (cubo.CuboResumo.resumo, montado de resumo_temporadas) ou de uma única
+passada agrupada sobre um DataFrame tipado de partidas. Cada métrica é
+avaliada de uma vez para todos os grupos (geral, casa, fora), com numpy.
+
+O resultado é imutável; a interface (ou uma exportação) só formata.
+
+    python metricas.py [--partidas 5000] [--repeticoes 50]   # benchmark
+"""
+
+from types import MappingProxyType
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from database import COLUNAS_NUMERICAS_PARTIDAS
+from utils import RESULTADO_VITORIA, RESULTADO_EMPATE, RESULTADO_DERROTA, LOCAL_CASA, LOCAL_FORA
+
+# =======================
+# BASE (contagens e somas por grupo)
+# =======================
+CONTAGENS_BASE = ["partidas", "vitorias", "empates", "derrotas", "clean_sheets"]
+SOMAS_BASE = [f"soma_{coluna}" for coluna in COLUNAS_NUMERICAS_PARTIDAS]
+COLUNAS_BASE = CONTAGENS_BASE + SOMAS_BASE
+
+GRUPOS = ["geral", LOCAL_CASA, LOCAL_FORA]
+
+
+def base_do_resumo(resumo):
+    """Base a partir do dict de CuboResumo.resumo (agregado no banco)."""
+    return pd.DataFrame(
+        [[resumo[grupo].get(coluna, 0) for coluna in COLUNAS_BASE] for grupo in GRUPOS],
+        index=GRUPOS, columns=COLUNAS_BASE, dtype=float,
+    )
+
+
+def base_do_frame(df):
+    """
+    Base a partir de um DataFrame de partidas, numa única passada agrupada
+    por local. O total geral é a soma dos grupos.
+    """
+    if df.empty:
+        return pd.DataFrame(0.0, index=GRUPOS, columns=COLUNAS_BASE)
+
+    resultado = df["resultado"].astype(object)
+    colunas = {
+        "partidas": np.ones(len(df)),
+        "vitorias": (resultado == RESULTADO_VITORIA).to_numpy(float),
+        "empates": (resultado == RESULTADO_EMPATE).to_numpy(float),
+        "derrotas": (resultado == RESULTADO_DERROTA).to_numpy(float),
+        "clean_sheets": (df["gols_adv"] == 0).to_numpy(float, na_value=0.0),
+    }
+    for coluna in COLUNAS_NUMERICAS_PARTIDAS:
+        if coluna in df.columns:
+            colunas[f"soma_{coluna}"] = df[coluna].to_numpy(float, na_value=0.0)
+        else:
+            colunas[f"soma_{coluna}"] = np.zeros(len(df))
+
+    por_local = (
+        pd.DataFrame(colunas, index=df.index)
+        .groupby(df["local"].astype(object), dropna=False)
+        .sum()
+    )
+
+    base = pd.DataFrame(0.0, index=GRUPOS, columns=COLUNAS_BASE)
+    base.loc["geral"] = por_local.sum()
+    for local in (LOCAL_CASA, LOCAL_FORA):
+        if local in por_local.index:
+            base.loc[local] = por_local.loc[local]
+    return base
+
+
+# =======================
+# FUNÇÕES VETORIZADAS
+# =======================
+# Recebem arrays (um valor por grupo); mesmas regras de utils.py
+# (percentual 0 quando o denominador é 0).
+def _valor(x):
+    return x
+
+
+def _media(soma, partidas):
+    return np.divide(soma, partidas, out=np.full_like(soma, np.nan), where=partidas > 0)
+
+
+def _percentual(parte, total):
+    return np.divide(parte * 100, total, out=np.zeros_like(parte), where=total > 0)
+
+
+def _diferenca(a, b):
+    return a - b
+
+
+def _aproveitamento(vitorias, empates, partidas):
+    return _percentual(vitorias * 3 + empates, partidas * 3)
+
+
+# =======================
+# REGISTRO DE MÉTRICAS
+# =======================
+# (chave, função, colunas de entrada, tipo de saída). As entradas podem ser
+# colunas da base ou métricas registradas antes.
+METRICAS = [
+    *[(coluna, _valor, (coluna,), int) for coluna in CONTAGENS_BASE],
+    *[
+        (f"soma_{c}", _valor, (f"soma_{c}",), float if c.startswith("xg_") else int)
+        for c in COLUNAS_NUMERICAS_PARTIDAS
+    ],
+    *[(f"media_{c}", _media, (f"soma_{c}", "partidas"), float) for c in COLUNAS_NUMERICAS_PARTIDAS],
+    ("aproveitamento",    _aproveitamento, ("vitorias", "empates", "partidas"), float),
+    ("saldo_gols",        _diferenca,  ("soma_gols_usuario", "soma_gols_adv"), int),
+    ("diff_xg",           _diferenca,  ("soma_gols_usuario", "soma_xg_usuario"), float),
+    ("diff_xg_def",       _diferenca,  ("soma_gols_adv", "soma_xg_adv"), float),
+    ("perc_passes",       _percentual, ("soma_passes_certos_usuario", "soma_passes_totais_usuario"), float),
+    ("perc_cruzamentos",  _percentual, ("soma_cruzamentos_certos_usuario", "soma_cruzamentos_totais_usuario"), float),
+    ("perc_finalizacao",  _percentual, ("soma_remates_a_baliza_usuario", "soma_remates_usuario"), float),
+    ("perc_clean_sheets", _percentual, ("clean_sheets", "partidas"), float),
+]
+
+
+class ResultadoMetricas(Mapping):
+    """Métricas avaliadas de um grupo. Somente leitura: acesso por chave ou atributo."""
+
+    __slots__ = ("_valores",)
+
+    def __init__(self, valores):
+        object.__setattr__(self, "_valores", MappingProxyType(dict(valores)))
+
+    def __getitem__(self, chave):
+        return self._valores[chave]
+
+    def __iter__(self):
+        return iter(self._valores)
+
+    def __len__(self):
+        return len(self._valores)
+
+    def __getattr__(self, nome):
+        try:
+            return self._valores[nome]
+        except KeyError:
+            raise AttributeError(nome) from None
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("ResultadoMetricas é imutável")
+
+    def __repr__(self):
+        return f"ResultadoMetricas({dict(self._valores)!r})"
+
+
+def avaliar_metricas(base):
+    """
+    Avalia todo o registro METRICAS sobre a base, de uma vez para todos os grupos.
+
+    Args:
+        base: DataFrame de base_do_resumo() ou base_do_frame()
+
+    Returns:
+        dict: {grupo: ResultadoMetricas} para "geral", LOCAL_CASA e LOCAL_FORA
+    """
+    vetores = {coluna: base[coluna].to_numpy(float) for coluna in base.columns}
+    saida = {}
+
+    for chave, funcao, entradas, tipo in METRICAS:
+        vetores[chave] = funcao(*(vetores[entrada] for entrada in entradas))
+        saida[chave] = (vetores[chave], tipo)
+
+    resultados = {}
+    for i, grupo in enumerate(base.index):
+        valores = {}
+        for chave, (vetor, tipo) in saida.items():
+            valor = vetor[i]
+            valores[chave] = int(round(valor)) if tipo is int and not np.isnan(valor) else float(valor)
+        resultados[grupo] = ResultadoMetricas(valores)
+    return resultados
+
+
+def metricas_do_resumo(resumo):
+    """Atalho: KPIs a partir do resumo agregado no banco."""
+    return avaliar_metricas(base_do_resumo(resumo))
+
+
+def metricas_do_frame(df):
+    """Atalho: KPIs a partir de um DataFrame de partidas (exportações, API)."""
+    return avaliar_metricas(base_do_frame(df))
+
+
+# =======================
+# BENCHMARK
+# =======================
+def _frame_sintetico(n, semente=0):
+    rnd = np.random.default_rng(semente)
+    gols_usuario = rnd.poisson(1.5, n)
+    gols_adv = rnd.poisson(1.2, n)
+    df = pd.DataFrame({
+        coluna: rnd.integers(0, 30, n).astype(np.int16) for coluna in COLUNAS_NUMERICAS_PARTIDAS
+    })
+    df["xg_usuario"] = rnd.gamma(2.0, 0.7, n)
+    df["xg_adv"] = rnd.gamma(2.0, 0.6, n)
+    df["gols_usuario"] = gols_usuario.astype(np.int16)
+    df["gols_adv"] = gols_adv.astype(np.int16)
+    df["local"] = pd.Categorical(rnd.choice([LOCAL_CASA, LOCAL_FORA], n))
+    df["resultado"] = pd.Categorical(np.select(
+        [gols_usuario > gols_adv, gols_usuario == gols_adv],
+        [RESULTADO_VITORIA, RESULTADO_EMPATE],
+        RESULTADO_DERROTA,
+    ))
+    return df
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark do motor de métricas")
+    parser.add_argument("--partidas", type=int, default=5000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    df = _frame_sintetico(args.partidas)
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticoes):
+        base = base_do_frame(df)
+    t_base = (time.perf_counter() - inicio) / args.repeticoes * 1000
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticoes):
+        resultado = avaliar_metricas(base)
+    t_avaliar = (time.perf_counter() - inicio) / args.repeticoes * 1000
+
+    print(f"{args.partidas} partidas, {len(METRICAS)} métricas × {len(GRUPOS)} grupos")
+    print(f"base_do_frame:    {t_base:8.3f} ms")
+    print(f"avaliar_metricas: {t_avaliar:8.3f} ms")
+    geral = resultado["geral"]
+    print(f"aproveitamento geral: {geral.aproveitamento:.1f}%  saldo: {geral.saldo_gols:+d}")
@@ -0,0 +1,588 @@
+"""
+Migrações versionadas do schema do FM Analytics
+
+Cada migração roda uma única vez, em transação própria, e fica registrada
+em schema_migracoes. Para aplicar as pendentes:
+
+    python migracoes.py
+"""
+
+import unicodedata
+
+from psycopg2.extras import execute_values
+
+from conexao import conectar, devolver_conexao
+
+# =======================
+# MIGRAÇÕES
+# =======================
+# Cada passo é um comando SQL ou uma função que recebe o cursor da transação.
+
+V1_TABELAS_BASE = """
+    CREATE TABLE IF NOT EXISTS usuarios (
+        id              SERIAL PRIMARY KEY,
+        usuario         TEXT NOT NULL UNIQUE,
+        senha           TEXT NOT NULL,
+        plano           TEXT NOT NULL DEFAULT 'FREE',
+        data_expiracao  TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS partidas (
+        id                                SERIAL PRIMARY KEY,
+        usuario_id                        INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+        time_usuario                      TEXT NOT NULL,
+        time_adv                          TEXT NOT NULL,
+        local                             TEXT,
+        competicao                        TEXT,
+        temporada                         TEXT,
+        data                              TEXT,
+        rodada                            INTEGER,
+        posse_usuario                     INTEGER DEFAULT 0,
+        remates_usuario                   INTEGER DEFAULT 0,
+        remates_a_baliza_usuario          INTEGER DEFAULT 0,
+        xg_usuario                        NUMERIC(6, 2) DEFAULT 0,
+        oportunidades_flagrantes_usuario  INTEGER DEFAULT 0,
+        cantos_usuario                    INTEGER DEFAULT 0,
+        passes_totais_usuario             INTEGER DEFAULT 0,
+        passes_certos_usuario             INTEGER DEFAULT 0,
+        cruzamentos_totais_usuario        INTEGER DEFAULT 0,
+        cruzamentos_certos_usuario        INTEGER DEFAULT 0,
+        gols_usuario                      INTEGER DEFAULT 0,
+        posse_adv                         INTEGER DEFAULT 0,
+        remates_adv                       INTEGER DEFAULT 0,
+        remates_a_baliza_adv              INTEGER DEFAULT 0,
+        xg_adv                            NUMERIC(6, 2) DEFAULT 0,
+        oportunidades_flagrantes_adv      INTEGER DEFAULT 0,
+        cantos_adv                        INTEGER DEFAULT 0,
+        passes_totais_adv                 INTEGER DEFAULT 0,
+        passes_certos_adv                 INTEGER DEFAULT 0,
+        cruzamentos_totais_adv            INTEGER DEFAULT 0,
+        cruzamentos_certos_adv            INTEGER DEFAULT 0,
+        gols_adv                          INTEGER DEFAULT 0,
+        resultado                         TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS estatisticas_jogadores (
+        id                        SERIAL PRIMARY KEY,
+        partida_id                INTEGER NOT NULL REFERENCES partidas(id) ON DELETE CASCADE,
+        usuario_id                INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+        numero                    TEXT,
+        nome                      TEXT,
+        minutos_jogados           INTEGER,
+        distancia_km              NUMERIC(5, 2) DEFAULT 0,
+        perc_passes               INTEGER DEFAULT 0,
+        xa                        NUMERIC(5, 2) DEFAULT 0,
+        assistencias              INTEGER DEFAULT 0,
+        xg                        NUMERIC(5, 2) DEFAULT 0,
+        golos                     INTEGER DEFAULT 0,
+        perc_cruzamentos          INTEGER DEFAULT 0,
+        passes_progressivos       INTEGER DEFAULT 0,
+        oportunidades_flagrantes  INTEGER DEFAULT 0,
+        passes_decisivos          INTEGER DEFAULT 0,
+        perc_remates              INTEGER DEFAULT 0,
+        fintas                    INTEGER DEFAULT 0,
+        faltas_sofridas           INTEGER DEFAULT 0,
+        remate_na_barra           INTEGER DEFAULT 0,
+        perc_desarmes             INTEGER DEFAULT 0,
+        perc_cabeceamentos        INTEGER DEFAULT 0,
+        faltas_cometidas          INTEGER DEFAULT 0,
+        intercepcoes              INTEGER DEFAULT 0,
+        alivios                   INTEGER DEFAULT 0,
+        desarmes_decisivos        INTEGER DEFAULT 0,
+        defesas_seguras           INTEGER DEFAULT 0,
+        defesas_ponta_dedos       INTEGER DEFAULT 0,
+        defesas_desviadas         INTEGER DEFAULT 0,
+        remates_sofridos          INTEGER DEFAULT 0,
+        lancamentos               INTEGER DEFAULT 0,
+        cantos                    INTEGER DEFAULT 0,
+        livres_defensivos         INTEGER DEFAULT 0,
+        livres_ofensivos          INTEGER DEFAULT 0
+    );
+"""
+
+# `data` era gravada como texto (str(date)); passa a ser date de verdade
+V2_DATA_COMO_DATE = """
+    ALTER TABLE partidas ALTER COLUMN data TYPE date USING NULLIF(data::text, '')::date;
+"""
+
+# Índices compostos nos caminhos de acesso quentes de database.py
+V3_INDICES = """
+    CREATE INDEX IF NOT EXISTS idx_partidas_usuario_data
+        ON partidas (usuario_id, data DESC);
+    CREATE INDEX IF NOT EXISTS idx_partidas_usuario_temporada_competicao
+        ON partidas (usuario_id, temporada, competicao);
+    CREATE INDEX IF NOT EXISTS idx_estatisticas_usuario_partida
+        ON estatisticas_jogadores (usuario_id, partida_id);
+    CREATE INDEX IF NOT EXISTS idx_estatisticas_partida
+        ON estatisticas_jogadores (partida_id);
+"""
+
+
+# As migrações guardam o próprio SQL (cópia congelada do que era o schema
+# na época): mudanças posteriores em database.py não alteram o que uma
+# migração já publicada faz.
+V4_CRIAR_RESUMO_TEMPORADAS = """
+    CREATE TABLE IF NOT EXISTS resumo_temporadas (
+        usuario_id    INTEGER NOT NULL,
+        temporada     TEXT    NOT NULL,
+        competicao    TEXT    NOT NULL,
+        local         TEXT    NOT NULL,
+        partidas      INTEGER NOT NULL DEFAULT 0,
+        vitorias      INTEGER NOT NULL DEFAULT 0,
+        empates       INTEGER NOT NULL DEFAULT 0,
+        derrotas      INTEGER NOT NULL DEFAULT 0,
+        pontos        INTEGER NOT NULL DEFAULT 0,
+        clean_sheets  INTEGER NOT NULL DEFAULT 0,
+        soma_posse_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_remates_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_remates_a_baliza_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_xg_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_oportunidades_flagrantes_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_cantos_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_passes_totais_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_passes_certos_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_cruzamentos_totais_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_cruzamentos_certos_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_gols_usuario NUMERIC NOT NULL DEFAULT 0,
+        soma_posse_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_remates_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_remates_a_baliza_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_xg_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_oportunidades_flagrantes_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_cantos_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_passes_totais_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_passes_certos_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_cruzamentos_totais_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_cruzamentos_certos_adv NUMERIC NOT NULL DEFAULT 0,
+        soma_gols_adv NUMERIC NOT NULL DEFAULT 0,
+        PRIMARY KEY (usuario_id, temporada, competicao, local)
+    )
+"""
+
+V4_CARGA_RESUMO_TEMPORADAS = """
+    INSERT INTO resumo_temporadas (
+        usuario_id, temporada, competicao, local,
+        partidas, vitorias, empates, derrotas, pontos, clean_sheets,
+        soma_posse_usuario,
+        soma_remates_usuario,
+        soma_remates_a_baliza_usuario,
+        soma_xg_usuario,
+        soma_oportunidades_flagrantes_usuario,
+        soma_cantos_usuario,
+        soma_passes_totais_usuario,
+        soma_passes_certos_usuario,
+        soma_cruzamentos_totais_usuario,
+        soma_cruzamentos_certos_usuario,
+        soma_gols_usuario,
+        soma_posse_adv,
+        soma_remates_adv,
+        soma_remates_a_baliza_adv,
+        soma_xg_adv,
+        soma_oportunidades_flagrantes_adv,
+        soma_cantos_adv,
+        soma_passes_totais_adv,
+        soma_passes_certos_adv,
+        soma_cruzamentos_totais_adv,
+        soma_cruzamentos_certos_adv,
+        soma_gols_adv
+    )
+    SELECT
+        usuario_id, COALESCE(temporada, ''), COALESCE(competicao, ''), COALESCE(local, ''),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE resultado = 'Vitória'),
+        COUNT(*) FILTER (WHERE resultado = 'Empate'),
+        COUNT(*) FILTER (WHERE resultado = 'Derrota'),
+        3 * COUNT(*) FILTER (WHERE resultado = 'Vitória') + COUNT(*) FILTER (WHERE resultado = 'Empate'),
+        COUNT(*) FILTER (WHERE gols_adv = 0),
+        COALESCE(SUM(posse_usuario), 0),
+        COALESCE(SUM(remates_usuario), 0),
+        COALESCE(SUM(remates_a_baliza_usuario), 0),
+        COALESCE(SUM(xg_usuario), 0),
+        COALESCE(SUM(oportunidades_flagrantes_usuario), 0),
+        COALESCE(SUM(cantos_usuario), 0),
+        COALESCE(SUM(passes_totais_usuario), 0),
+        COALESCE(SUM(passes_certos_usuario), 0),
+        COALESCE(SUM(cruzamentos_totais_usuario), 0),
+        COALESCE(SUM(cruzamentos_certos_usuario), 0),
+        COALESCE(SUM(gols_usuario), 0),
+        COALESCE(SUM(posse_adv), 0),
+        COALESCE(SUM(remates_adv), 0),
+        COALESCE(SUM(remates_a_baliza_adv), 0),
+        COALESCE(SUM(xg_adv), 0),
+        COALESCE(SUM(oportunidades_flagrantes_adv), 0),
+        COALESCE(SUM(cantos_adv), 0),
+        COALESCE(SUM(passes_totais_adv), 0),
+        COALESCE(SUM(passes_certos_adv), 0),
+        COALESCE(SUM(cruzamentos_totais_adv), 0),
+        COALESCE(SUM(cruzamentos_certos_adv), 0),
+        COALESCE(SUM(gols_adv), 0)
+    FROM partidas
+    GROUP BY 1, 2, 3, 4
+"""
+
+V4_CRIAR_AGREGADOS_JOGADORES = """
+    CREATE TABLE IF NOT EXISTS agregados_jogadores (
+        usuario_id  INTEGER NOT NULL,
+        nome        TEXT    NOT NULL,
+        temporada   TEXT    NOT NULL,
+        competicao  TEXT    NOT NULL,
+        partidas    INTEGER NOT NULL DEFAULT 0,
+        soma_minutos_jogados NUMERIC NOT NULL DEFAULT 0,
+        soma_distancia_km NUMERIC NOT NULL DEFAULT 0,
+        soma_xa NUMERIC NOT NULL DEFAULT 0,
+        soma_assistencias NUMERIC NOT NULL DEFAULT 0,
+        soma_xg NUMERIC NOT NULL DEFAULT 0,
+        soma_golos NUMERIC NOT NULL DEFAULT 0,
+        soma_passes_progressivos NUMERIC NOT NULL DEFAULT 0,
+        soma_oportunidades_flagrantes NUMERIC NOT NULL DEFAULT 0,
+        soma_passes_decisivos NUMERIC NOT NULL DEFAULT 0,
+        soma_fintas NUMERIC NOT NULL DEFAULT 0,
+        soma_faltas_sofridas NUMERIC NOT NULL DEFAULT 0,
+        soma_remate_na_barra NUMERIC NOT NULL DEFAULT 0,
+        soma_faltas_cometidas NUMERIC NOT NULL DEFAULT 0,
+        soma_intercepcoes NUMERIC NOT NULL DEFAULT 0,
+        soma_alivios NUMERIC NOT NULL DEFAULT 0,
+        soma_desarmes_decisivos NUMERIC NOT NULL DEFAULT 0,
+        soma_defesas_seguras NUMERIC NOT NULL DEFAULT 0,
+        soma_defesas_ponta_dedos NUMERIC NOT NULL DEFAULT 0,
+        soma_defesas_desviadas NUMERIC NOT NULL DEFAULT 0,
+        soma_remates_sofridos NUMERIC NOT NULL DEFAULT 0,
+        soma_lancamentos NUMERIC NOT NULL DEFAULT 0,
+        soma_cantos NUMERIC NOT NULL DEFAULT 0,
+        soma_livres_defensivos NUMERIC NOT NULL DEFAULT 0,
+        soma_livres_ofensivos NUMERIC NOT NULL DEFAULT 0,
+        soma_perc_passes NUMERIC NOT NULL DEFAULT 0,
+        PRIMARY KEY (usuario_id, nome, temporada, competicao)
+    )
+"""
+
+V4_CARGA_AGREGADOS_JOGADORES = """
+    INSERT INTO agregados_jogadores (
+        usuario_id, nome, temporada, competicao, partidas,
+        soma_minutos_jogados,
+        soma_distancia_km,
+        soma_xa,
+        soma_assistencias,
+        soma_xg,
+        soma_golos,
+        soma_passes_progressivos,
+        soma_oportunidades_flagrantes,
+        soma_passes_decisivos,
+        soma_fintas,
+        soma_faltas_sofridas,
+        soma_remate_na_barra,
+        soma_faltas_cometidas,
+        soma_intercepcoes,
+        soma_alivios,
+        soma_desarmes_decisivos,
+        soma_defesas_seguras,
+        soma_defesas_ponta_dedos,
+        soma_defesas_desviadas,
+        soma_remates_sofridos,
+        soma_lancamentos,
+        soma_cantos,
+        soma_livres_defensivos,
+        soma_livres_ofensivos,
+        soma_perc_passes
+    )
+    SELECT
+        e.usuario_id, e.nome, COALESCE(p.temporada, ''), COALESCE(p.competicao, ''),
+        COUNT(*),
+        COALESCE(SUM(e.minutos_jogados), 0),
+        COALESCE(SUM(e.distancia_km), 0),
+        COALESCE(SUM(e.xa), 0),
+        COALESCE(SUM(e.assistencias), 0),
+        COALESCE(SUM(e.xg), 0),
+        COALESCE(SUM(e.golos), 0),
+        COALESCE(SUM(e.passes_progressivos), 0),
+        COALESCE(SUM(e.oportunidades_flagrantes), 0),
+        COALESCE(SUM(e.passes_decisivos), 0),
+        COALESCE(SUM(e.fintas), 0),
+        COALESCE(SUM(e.faltas_sofridas), 0),
+        COALESCE(SUM(e.remate_na_barra), 0),
+        COALESCE(SUM(e.faltas_cometidas), 0),
+        COALESCE(SUM(e.intercepcoes), 0),
+        COALESCE(SUM(e.alivios), 0),
+        COALESCE(SUM(e.desarmes_decisivos), 0),
+        COALESCE(SUM(e.defesas_seguras), 0),
+        COALESCE(SUM(e.defesas_ponta_dedos), 0),
+        COALESCE(SUM(e.defesas_desviadas), 0),
+        COALESCE(SUM(e.remates_sofridos), 0),
+        COALESCE(SUM(e.lancamentos), 0),
+        COALESCE(SUM(e.cantos), 0),
+        COALESCE(SUM(e.livres_defensivos), 0),
+        COALESCE(SUM(e.livres_ofensivos), 0),
+        COALESCE(SUM(e.perc_passes), 0)
+    FROM estatisticas_jogadores e
+    JOIN partidas p ON p.id = e.partida_id
+    WHERE e.nome IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def _v4_tabelas_resumo(cursor):
+    """Cria as tabelas de resumo e faz a carga inicial a partir dos dados existentes."""
+    cursor.execute(V4_CRIAR_RESUMO_TEMPORADAS)
+    cursor.execute(V4_CRIAR_AGREGADOS_JOGADORES)
+    cursor.execute("DELETE FROM resumo_temporadas")
+    cursor.execute("DELETE FROM agregados_jogadores")
+    cursor.execute(V4_CARGA_RESUMO_TEMPORADAS)
+    cursor.execute(V4_CARGA_AGREGADOS_JOGADORES)
+
+
+V5_CRIAR_JOGADORES = """
+    CREATE TABLE IF NOT EXISTS jogadores (
+        id                SERIAL PRIMARY KEY,
+        usuario_id        INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+        nome              TEXT    NOT NULL,
+        nome_normalizado  TEXT    NOT NULL,
+        UNIQUE (usuario_id, nome_normalizado)
+    );
+
+    ALTER TABLE estatisticas_jogadores
+        ADD COLUMN IF NOT EXISTS jogador_id INTEGER REFERENCES jogadores(id) ON DELETE SET NULL;
+
+    CREATE INDEX IF NOT EXISTS idx_estatisticas_usuario_jogador
+        ON estatisticas_jogadores (usuario_id, jogador_id);
+"""
+
+V5_CRIAR_AGREGADOS_JOGADORES = """
+    CREATE TABLE IF NOT EXISTS agregados_jogadores (
+        usuario_id  INTEGER NOT NULL,
+        jogador_id  INTEGER NOT NULL REFERENCES jogadores(id) ON DELETE CASCADE,
+        temporada   TEXT    NOT NULL,
+        competicao  TEXT    NOT NULL,
+        partidas    INTEGER NOT NULL DEFAULT 0,
+        soma_minutos_jogados NUMERIC NOT NULL DEFAULT 0,
+        soma_distancia_km NUMERIC NOT NULL DEFAULT 0,
+        soma_xa NUMERIC NOT NULL DEFAULT 0,
+        soma_assistencias NUMERIC NOT NULL DEFAULT 0,
+        soma_xg NUMERIC NOT NULL DEFAULT 0,
+        soma_golos NUMERIC NOT NULL DEFAULT 0,
+        soma_passes_progressivos NUMERIC NOT NULL DEFAULT 0,
+        soma_oportunidades_flagrantes NUMERIC NOT NULL DEFAULT 0,
+        soma_passes_decisivos NUMERIC NOT NULL DEFAULT 0,
+        soma_fintas NUMERIC NOT NULL DEFAULT 0,
+        soma_faltas_sofridas NUMERIC NOT NULL DEFAULT 0,
+        soma_remate_na_barra NUMERIC NOT NULL DEFAULT 0,
+        soma_faltas_cometidas NUMERIC NOT NULL DEFAULT 0,
+        soma_intercepcoes NUMERIC NOT NULL DEFAULT 0,
+        soma_alivios NUMERIC NOT NULL DEFAULT 0,
+        soma_desarmes_decisivos NUMERIC NOT NULL DEFAULT 0,
+        soma_defesas_seguras NUMERIC NOT NULL DEFAULT 0,
+        soma_defesas_ponta_dedos NUMERIC NOT NULL DEFAULT 0,
+        soma_defesas_desviadas NUMERIC NOT NULL DEFAULT 0,
+        soma_remates_sofridos NUMERIC NOT NULL DEFAULT 0,
+        soma_lancamentos NUMERIC NOT NULL DEFAULT 0,
+        soma_cantos NUMERIC NOT NULL DEFAULT 0,
+        soma_livres_defensivos NUMERIC NOT NULL DEFAULT 0,
+        soma_livres_ofensivos NUMERIC NOT NULL DEFAULT 0,
+        soma_perc_passes NUMERIC NOT NULL DEFAULT 0,
+        PRIMARY KEY (usuario_id, jogador_id, temporada, competicao)
+    )
+"""
+
+V5_CARGA_AGREGADOS_JOGADORES = """
+    INSERT INTO agregados_jogadores (
+        usuario_id, jogador_id, temporada, competicao, partidas,
+        soma_minutos_jogados,
+        soma_distancia_km,
+        soma_xa,
+        soma_assistencias,
+        soma_xg,
+        soma_golos,
+        soma_passes_progressivos,
+        soma_oportunidades_flagrantes,
+        soma_passes_decisivos,
+        soma_fintas,
+        soma_faltas_sofridas,
+        soma_remate_na_barra,
+        soma_faltas_cometidas,
+        soma_intercepcoes,
+        soma_alivios,
+        soma_desarmes_decisivos,
+        soma_defesas_seguras,
+        soma_defesas_ponta_dedos,
+        soma_defesas_desviadas,
+        soma_remates_sofridos,
+        soma_lancamentos,
+        soma_cantos,
+        soma_livres_defensivos,
+        soma_livres_ofensivos,
+        soma_perc_passes
+    )
+    SELECT
+        e.usuario_id, e.jogador_id, COALESCE(p.temporada, ''), COALESCE(p.competicao, ''),
+        COUNT(*),
+        COALESCE(SUM(e.minutos_jogados), 0),
+        COALESCE(SUM(e.distancia_km), 0),
+        COALESCE(SUM(e.xa), 0),
+        COALESCE(SUM(e.assistencias), 0),
+        COALESCE(SUM(e.xg), 0),
+        COALESCE(SUM(e.golos), 0),
+        COALESCE(SUM(e.passes_progressivos), 0),
+        COALESCE(SUM(e.oportunidades_flagrantes), 0),
+        COALESCE(SUM(e.passes_decisivos), 0),
+        COALESCE(SUM(e.fintas), 0),
+        COALESCE(SUM(e.faltas_sofridas), 0),
+        COALESCE(SUM(e.remate_na_barra), 0),
+        COALESCE(SUM(e.faltas_cometidas), 0),
+        COALESCE(SUM(e.intercepcoes), 0),
+        COALESCE(SUM(e.alivios), 0),
+        COALESCE(SUM(e.desarmes_decisivos), 0),
+        COALESCE(SUM(e.defesas_seguras), 0),
+        COALESCE(SUM(e.defesas_ponta_dedos), 0),
+        COALESCE(SUM(e.defesas_desviadas), 0),
+        COALESCE(SUM(e.remates_sofridos), 0),
+        COALESCE(SUM(e.lancamentos), 0),
+        COALESCE(SUM(e.cantos), 0),
+        COALESCE(SUM(e.livres_defensivos), 0),
+        COALESCE(SUM(e.livres_ofensivos), 0),
+        COALESCE(SUM(e.perc_passes), 0)
+    FROM estatisticas_jogadores e
+    JOIN partidas p ON p.id = e.partida_id
+    WHERE e.jogador_id IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def _v5_normalizar_nome(nome):
+    """Cópia congelada de utils.normalizar_nome_jogador na época da v5."""
+    sem_acentos = "".join(
+        ch for ch in unicodedata.normalize("NFKD", str(nome)) if not unicodedata.combining(ch)
+    )
+    return " ".join(sem_acentos.casefold().split())
+
+
+def _v5_jogadores(cursor):
+    """
+    Cria a tabela de jogadores, preenche estatisticas_jogadores.jogador_id a
+    partir dos nomes já gravados e recria agregados_jogadores chaveada pelo id.
+    """
+    cursor.execute(V5_CRIAR_JOGADORES)
+
+    # Cada grafia na ordem em que foi gravada pela primeira vez
+    cursor.execute("""
+        SELECT usuario_id, nome
+        FROM estatisticas_jogadores
+        WHERE nome IS NOT NULL
+        GROUP BY usuario_id, nome
+        ORDER BY usuario_id, MIN(id)
+    """)
+    nomes = [(usuario_id, nome, _v5_normalizar_nome(nome)) for usuario_id, nome in cursor.fetchall()]
+    nomes = [(usuario_id, nome, chave) for usuario_id, nome, chave in nomes if chave]
+
+    if nomes:
+        # Primeira grafia gravada de cada jogador vira o nome de exibição
+        jogadores = {}
+        for usuario_id, nome, chave in nomes:
+            jogadores.setdefault((usuario_id, chave), nome.strip())
+        execute_values(
+            cursor,
+            """
+            INSERT INTO jogadores (usuario_id, nome, nome_normalizado) VALUES %s
+            ON CONFLICT (usuario_id, nome_normalizado) DO NOTHING
+            """,
+            [(usuario_id, nome, chave) for (usuario_id, chave), nome in jogadores.items()],
+        )
+        execute_values(
+            cursor,
+            """
+            UPDATE estatisticas_jogadores e SET jogador_id = j.id
+            FROM (VALUES %s) AS v (usuario_id, nome, nome_normalizado)
+            JOIN jogadores j ON j.usuario_id = v.usuario_id AND j.nome_normalizado = v.nome_normalizado
+            WHERE e.usuario_id = v.usuario_id AND e.nome = v.nome
+            """,
+            nomes,
+        )
+
+    cursor.execute("DROP TABLE IF EXISTS agregados_jogadores")
+    cursor.execute(V5_CRIAR_AGREGADOS_JOGADORES)
+    cursor.execute(V5_CARGA_AGREGADOS_JOGADORES)
+
+
+MIGRACOES = [
+    (1, "Tabelas base (usuarios, partidas, estatisticas_jogadores)", [V1_TABELAS_BASE]),
+    (2, "partidas.data como date", [V2_DATA_COMO_DATE]),
+    (3, "Índices compostos para as consultas do dashboard", [V3_INDICES]),
+    (4, "Tabelas resumo_temporadas e agregados_jogadores", [_v4_tabelas_resumo]),
+    (5, "Tabela jogadores e agregados_jogadores por jogador_id", [_v5_jogadores]),
+]
+
+
+# =======================
+# EXECUÇÃO
+# =======================
+SQL_CRIAR_CONTROLE = """
+    CREATE TABLE IF NOT EXISTS schema_migracoes (
+        versao       INTEGER PRIMARY KEY,
+        descricao    TEXT NOT NULL,
+        aplicada_em  TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+# Chave do advisory lock que impede dois processos migrando ao mesmo tempo
+_CHAVE_LOCK = 20260826
+
+
+def versao_atual(cursor):
+    """Retorna a maior versão já aplicada (0 se nenhuma)."""
+    cursor.execute(SQL_CRIAR_CONTROLE)
+    cursor.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_migracoes")
+    return cursor.fetchone()[0]
+
+
+def aplicar_migracoes(ate_versao=None):
+    """
+    Aplica, em ordem, as migrações ainda não registradas em schema_migracoes.
+    Cada versão roda na sua própria transação.
+
+    Args:
+        ate_versao: Para na versão informada (padrão: aplica todas)
+
+    Returns:
+        list[int]: Versões aplicadas nesta execução
+    """
+    aplicadas = []
+    conn = conectar()
+    cursor = conn.cursor()
+
+    try:
+        for versao, descricao, passos in MIGRACOES:
+            if ate_versao is not None and versao > ate_versao:
+                break
+
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (_CHAVE_LOCK,))
+            if versao <= versao_atual(cursor):
+                conn.commit()
+                continue
+
+            for passo in passos:
+                if callable(passo):
+                    passo(cursor)
+                else:
+                    cursor.execute(passo)
+
+            cursor.execute(
+                "INSERT INTO schema_migracoes (versao, descricao) VALUES (%s, %s)",
+                (versao, descricao)
+            )
+            conn.commit()
+            aplicadas.append(versao)
+            print(f"Migração {versao} aplicada: {descricao}")
+
+        return aplicadas
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Erro ao aplicar migrações: {e}")
+        raise
+
+    finally:
+        devolver_conexao(conn)
+
+
+if __name__ == "__main__":
+    aplicadas = aplicar_migracoes()
+    if not aplicadas:
+        print("Schema já está na versão mais recente.")
@@ -0,0 +1,197 @@
+"""
+Nível europeu ao longo do tempo
+
+Score −7..7 e status de cada métrica (acima / dentro / abaixo do
+BENCHMARK) para todas as temporadas, todas as competições e todas as
+janelas móveis de N jogos. pontuar_benchmark (o score geral do dashboard)
+é a mesma regra aplicada a uma única linha.
+
+Cada partida vira uma linha de quantidades somáveis (jogos, pontos, soma e
+presença de cada métrica). As somas por grupo saem de um único np.add.at,
+as das janelas de uma diferença de cumsum, e as médias, os status e os
+scores de todos os grupos/janelas são calculados de uma vez sobre a matriz.
+
+    python nivel_europeu.py [--partidas 5000]   # benchmark
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import BENCHMARK, RESULTADO_VITORIA, RESULTADO_EMPATE
+
+# =======================
+# CONFIGURAÇÃO
+# =======================
+JANELA_PADRAO = 10
+
+# Métricas na ordem do BENCHMARK; todas são médias por jogo, exceto o aproveitamento
+METRICAS_BENCHMARK = list(BENCHMARK)
+COLUNAS_MEDIA = [chave for chave in METRICAS_BENCHMARK if chave != "aproveitamento"]
+
+_MINIMOS = np.array([BENCHMARK[chave]["min"] for chave in METRICAS_BENCHMARK], dtype=np.float64)
+_MAXIMOS = np.array([BENCHMARK[chave]["max"] for chave in METRICAS_BENCHMARK], dtype=np.float64)
+
+# Status → sufixo das chaves nivel_status_* do lang.py
+STATUS_CHAVE = {1: "acima", 0: "dentro", -1: "abaixo"}
+
+# Colunas de partidas necessárias
+COLUNAS_NIVEL = ["data", "temporada", "competicao", "resultado"] + COLUNAS_MEDIA
+
+
+# =======================
+# MOTOR
+# =======================
+def pontuar_matriz(valores):
+    """
+    Status e score de cada linha de uma matriz (linhas × METRICAS_BENCHMARK).
+
+    Returns:
+        tuple: (score, status) — score int (−7..7) por linha; status float com
+               +1 acima, 0 dentro, −1 abaixo e NaN sem dados (não pontua)
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    status = np.where(valores > _MAXIMOS, 1.0, np.where(valores < _MINIMOS, -1.0, 0.0))
+    status[np.isnan(valores)] = np.nan
+    score = np.nansum(status, axis=1).astype(np.int64)
+    return score, status
+
+
+def pontuar_benchmark(metricas):
+    """
+    Score de um único conjunto de valores já agregados (ex.: médias vindas do banco).
+
+    Args:
+        metricas: Dict {chave do BENCHMARK: valor do usuário}; ausentes e NaN não pontuam
+
+    Returns:
+        int: Score de -7 a 7
+    """
+    linha = [np.nan if pd.isna(metricas.get(chave)) else metricas[chave] for chave in METRICAS_BENCHMARK]
+    score, _ = pontuar_matriz([linha])
+    return int(score[0])
+
+
+def _quantidades(df):
+    """
+    Matriz (partidas × 2 + 2k) com jogos, pontos e, para cada métrica de
+    média, a soma do valor e a presença (1 se não for nulo).
+    """
+    resultado = df["resultado"].astype(object).to_numpy()
+    pontos = np.where(resultado == RESULTADO_VITORIA, 3.0, np.where(resultado == RESULTADO_EMPATE, 1.0, 0.0))
+
+    medias = df[COLUNAS_MEDIA].to_numpy(dtype=np.float64, na_value=np.nan)
+    presentes = ~np.isnan(medias)
+    return np.column_stack([np.ones(len(df)), pontos, np.nan_to_num(medias), presentes])
+
+
+def _valores(somas):
+    """Médias e aproveitamento (linhas × METRICAS_BENCHMARK) a partir de somas de _quantidades."""
+    k = len(COLUNAS_MEDIA)
+    jogos, pontos = somas[:, 0], somas[:, 1]
+    presentes = somas[:, 2 + k:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        medias = np.where(presentes > 0, somas[:, 2:2 + k] / presentes, np.nan)
+        aproveitamento = np.where(jogos > 0, pontos / (jogos * 3) * 100, np.nan)
+
+    valores = np.empty((len(somas), len(METRICAS_BENCHMARK)))
+    valores[:, [METRICAS_BENCHMARK.index(c) for c in COLUNAS_MEDIA]] = medias
+    valores[:, METRICAS_BENCHMARK.index("aproveitamento")] = aproveitamento
+    return valores
+
+
+def _tabela(somas, indice):
+    """DataFrame com partidas, score, valor_<métrica> e status_<métrica> de cada linha."""
+    valores = _valores(somas)
+    score, status = pontuar_matriz(valores)
+
+    tabela = pd.DataFrame({"partidas": somas[:, 0].astype(np.int64), "score": score}, index=indice)
+    for i, chave in enumerate(METRICAS_BENCHMARK):
+        tabela[f"valor_{chave}"] = valores[:, i]
+        tabela[f"status_{chave}"] = status[:, i]
+    return tabela
+
+
+# =======================
+# RECORTES
+# =======================
+def pontuacao_por_grupo(df, coluna):
+    """
+    Score e status de cada valor de `coluna` (ex.: temporada, competição).
+
+    Returns:
+        pd.DataFrame: Uma linha por grupo (índice ordenado); vazio se df for vazio
+    """
+    grupos = df[coluna].astype(object).fillna("").to_numpy()
+    validos = grupos != ""
+    rotulos, codigos = np.unique(grupos[validos], return_inverse=True)
+
+    somas = np.zeros((len(rotulos), 2 + 2 * len(COLUNAS_MEDIA)))
+    np.add.at(somas, codigos, _quantidades(df[validos]))
+    return _tabela(somas, pd.Index(rotulos, name=coluna))
+
+
+def pontuacao_movel(df, janela=JANELA_PADRAO):
+    """
+    Score e status de cada janela das últimas `janela` partidas (df em ordem
+    de data). As primeiras janelas têm menos partidas (coluna `partidas`).
+
+    Returns:
+        pd.DataFrame: data, partidas, score, valor_* e status_*, no índice de df
+    """
+    quantidades = _quantidades(df)
+    acumulado = np.vstack([np.zeros((1, quantidades.shape[1])), np.cumsum(quantidades, axis=0)])
+    inicio = np.maximum(np.arange(len(df)) - janela + 1, 0)
+
+    tabela = _tabela(acumulado[1:] - acumulado[inicio], df.index)
+    tabela.insert(0, "data", df["data"])
+    return tabela
+
+
+def pontuacao_temporal(df, janela=JANELA_PADRAO):
+    """
+    Todos os recortes de uma vez.
+
+    Returns:
+        dict: {"temporada", "competicao", "movel"} → DataFrames de pontuação
+    """
+    df = df.sort_values("data", kind="stable")
+    return {
+        "temporada": pontuacao_por_grupo(df, "temporada"),
+        "competicao": pontuacao_por_grupo(df, "competicao"),
+        "movel": pontuacao_movel(df, janela),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from utils import RESULTADO_DERROTA
+
+    parser = argparse.ArgumentParser(description="Benchmark da pontuação de nível europeu")
+    parser.add_argument("--partidas", type=int, default=5000)
+    parser.add_argument("--janela", type=int, default=JANELA_PADRAO)
+    args = parser.parse_args()
+
+    rnd = np.random.default_rng(0)
+    n = args.partidas
+    df = pd.DataFrame({
+        "data": pd.date_range("2000-01-01", periods=n, freq="3D"),
+        "temporada": pd.Categorical(np.repeat(np.arange(n // 50 + 1), 50)[:n].astype(str)),
+        "competicao": pd.Categorical(rnd.choice(["Liga", "Taça", "Europa"], n)),
+        "resultado": pd.Categorical(rnd.choice([RESULTADO_VITORIA, RESULTADO_EMPATE, RESULTADO_DERROTA], n)),
+        "xg_usuario": rnd.gamma(2.0, 0.7, n),
+        "gols_usuario": rnd.poisson(1.5, n).astype(np.int16),
+        "remates_usuario": rnd.integers(5, 20, n).astype(np.int16),
+        "remates_a_baliza_usuario": rnd.integers(1, 10, n).astype(np.int16),
+        "posse_usuario": rnd.integers(30, 70, n).astype(np.int16),
+        "passes_certos_usuario": rnd.integers(250, 600, n).astype(np.int16),
+    })
+
+    inicio = time.perf_counter()
+    recortes = pontuacao_temporal(df, args.janela)
+    decorrido = (time.perf_counter() - inicio) * 1000
+    print(
+        f"{n} partidas: {len(recortes['temporada'])} temporadas, {len(recortes['competicao'])} competições, "
+        f"{len(recortes['movel'])} janelas em {decorrido:.2f} ms"
+    )
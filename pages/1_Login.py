@@ -1,8 +1,12 @@
 import streamlit as st
 from auth import criar_usuario, autenticar_usuario, buscar_usuario
+from aquecimento import iniciar_aquecimento
 
 st.set_page_config(page_title="Login - FM Analytics", page_icon="🔐")
 
+# Aquece o servidor enquanto o usuário digita as credenciais
+iniciar_aquecimento()
+
 # =======================
 # VERIFICA SE JÁ ESTÁ LOGADO
 # =======================
@@ -0,0 +1,85 @@
+"""
+Perfil de tempo de importação dos módulos do FM Analytics
+
+Roda `python -X importtime -c "import <módulo>"` em um processo limpo para
+cada módulo e resume o relatório: tempo total de cada um e os pacotes
+mais caros (tempo acumulado).
+
+    python perfil_imports.py [--top 15] [modulo ...]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Módulos do app e dependências pesadas, na ordem em que o app.py os usa
+MODULOS_PADRAO = [
+    "streamlit", "pandas", "numpy", "psycopg2", "plotly.express", "plotly.graph_objects", "bs4",
+    "lang", "utils", "licencas", "conexao", "auth", "database", "contexto",
+    "metricas", "tendencias", "forma", "similaridade", "nivel_europeu", "graficos", "cache_figuras",
+]
+
+
+def medir(modulo):
+    """
+    Importa o módulo num processo novo com -X importtime.
+
+    Returns:
+        list[tuple]: (pacote, self_us, acumulado_us, profundidade) na ordem do relatório
+    """
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True, text=True,
+    )
+    if processo.returncode != 0:
+        erro = processo.stderr.strip().splitlines()
+        raise RuntimeError(erro[-1] if erro else f"falha ao importar {modulo}")
+
+    linhas = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        self_us, acumulado_us, pacote = linha[len("import time:"):].split("|")
+        profundidade = (len(pacote) - len(pacote.lstrip())) // 2
+        linhas.append((pacote.strip(), int(self_us), int(acumulado_us), profundidade))
+    return linhas
+
+
+def imprimir(resultados, top):
+    print(f"{'Módulo':<24}{'Total (ms)':>12}")
+    print("-" * 36)
+    for modulo, linhas in resultados:
+        if isinstance(linhas, Exception):
+            print(f"{modulo:<24}{'erro':>12}  {linhas}")
+            continue
+        total = max((acumulado for _, _, acumulado, _ in linhas), default=0)
+        print(f"{modulo:<24}{total / 1000:>12.1f}")
+
+    # Pacotes mais caros (acumulado) entre todas as medições
+    maiores = {}
+    for _, linhas in resultados:
+        if isinstance(linhas, Exception):
+            continue
+        for pacote, _, acumulado, _ in linhas:
+            maiores[pacote] = max(maiores.get(pacote, 0), acumulado)
+
+    print(f"\nTop {top} pacotes por tempo acumulado")
+    print("-" * 36)
+    for pacote, acumulado in sorted(maiores.items(), key=lambda item: -item[1])[:top]:
+        print(f"{pacote:<40}{acumulado / 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perfil de tempo de importação")
+    parser.add_argument("modulos", nargs="*", default=MODULOS_PADRAO)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    resultados = []
+    for modulo in args.modulos:
+        try:
+            resultados.append((modulo, medir(modulo)))
+        except RuntimeError as e:
+            resultados.append((modulo, e))
+
+    imprimir(resultados, args.top)
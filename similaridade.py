@@ -0,0 +1,251 @@
+"""
+Busca de semelhantes ("jogadores como X", "partidas como esta")
+
+- Jogadores: vetor de estatísticas por 90 minutos (mais % de passes),
+  a partir de agregados_jogadores (que o banco mantém incrementalmente).
+- Partidas: as 22 estatísticas numéricas do time e do adversário.
+
+Os vetores são padronizados (z-score) e a distância é a raiz da média dos
+quadrados das diferenças padronizadas: 0 é idêntico, ~1,4 é a distância
+típica entre dois itens quaisquer. Cada índice é uma matriz numpy montada
+uma vez por versão dos dados do usuário (toda escrita a invalida); cada
+consulta é um produto vetorizado sobre a matriz inteira.
+
+    python similaridade.py [--jogadores 2000]   # benchmark
+"""
+
+import numpy as np
+import pandas as pd
+
+from cache import em_cache
+from database import COLUNAS_NUMERICAS_PARTIDAS, buscar_agregados_jogadores, buscar_partidas_df
+
+# =======================
+# CONFIGURAÇÃO
+# =======================
+# Jogadores com menos minutos ficam fora do índice (por 90 instável)
+MINUTOS_MINIMOS = 270
+
+# Dimensões do perfil: (coluna no vetor, coluna de total em agregados ou None, rótulo).
+# Com total, o valor é total / minutos * 90; sem total, a coluna é usada como está.
+DIMENSOES_PERFIL = [
+    ("golos_90",            "golos",            "Gols/90"),
+    ("xg_90",               "xg_total",         "xG/90"),
+    ("assistencias_90",     "assistencias",     "Assists/90"),
+    ("xa_90",               "xa_total",         "xA/90"),
+    ("passes_prog_90",      "passes_prog",      "Passes Prog./90"),
+    ("passes_dec_90",       "passes_dec",       "Passes Dec./90"),
+    ("intercepcoes_90",     "intercepcoes",     "Intercepções/90"),
+    ("fintas_90",           "fintas",           "Fintas/90"),
+    ("dist_90",             "dist_total",       "Dist./90"),
+    ("faltas_cometidas_90", "faltas_cometidas", "Faltas Com./90"),
+    ("faltas_sofridas_90",  "faltas_sofridas",  "Faltas Sofr./90"),
+    ("perc_passes_med",     None,               "% Passes"),
+]
+COLUNAS_PERFIL = [coluna for coluna, _, _ in DIMENSOES_PERFIL]
+
+# Colunas de partidas que acompanham o resultado da busca
+COLUNAS_DESCRICAO_PARTIDA = [
+    "id", "data", "time_adv", "local", "competicao", "temporada", "gols_usuario", "gols_adv", "resultado",
+]
+
+
+def perfis_por_90(agregados, minutos_minimos=MINUTOS_MINIMOS):
+    """
+    Perfis por 90 dos jogadores com minutos suficientes.
+
+    Returns:
+        pd.DataFrame: jogador_id, nome, minutos_total e COLUNAS_PERFIL
+    """
+    if agregados.empty:
+        return pd.DataFrame(columns=["jogador_id", "nome", "minutos_total"] + COLUNAS_PERFIL)
+
+    elegiveis = agregados[agregados["minutos_total"] >= max(minutos_minimos, 1)]
+    perfis = elegiveis[["jogador_id", "nome", "minutos_total"]].reset_index(drop=True)
+    fator = 90.0 / elegiveis["minutos_total"].to_numpy(dtype=np.float64)
+    for coluna, total, _ in DIMENSOES_PERFIL:
+        valores = elegiveis[total if total else coluna].to_numpy(dtype=np.float64)
+        perfis[coluna] = valores * fator if total else valores
+    return perfis
+
+
+# =======================
+# ÍNDICE
+# =======================
+class IndiceVizinhos:
+    """
+    Matriz padronizada (linhas × dimensões) com busca dos k vizinhos mais
+    próximos de uma linha. Base dos índices de jogadores e de partidas.
+    """
+
+    def __init__(self, brutos):
+        brutos = np.nan_to_num(np.asarray(brutos, dtype=np.float64))
+        dimensoes = brutos.shape[1]
+
+        self.media = brutos.mean(axis=0) if len(brutos) else np.zeros(dimensoes)
+        desvio = brutos.std(axis=0) if len(brutos) else np.ones(dimensoes)
+        # Dimensão constante não distingue ninguém
+        self.desvio = np.where(desvio > 0, desvio, 1.0)
+
+        self.matriz = (brutos - self.media) / self.desvio
+        self._normas = np.einsum("ij,ij->i", self.matriz, self.matriz)
+
+    def __len__(self):
+        return len(self.matriz)
+
+    def distancias(self, vetor):
+        """Distância padronizada de `vetor` (já padronizado) a todas as linhas."""
+        # |a - b|² = |a|² + |b|² - 2·a·b, para a matriz inteira de uma vez
+        quadrados = self._normas + vetor @ vetor - 2 * (self.matriz @ vetor)
+        return np.sqrt(np.maximum(quadrados, 0.0) / self.matriz.shape[1])
+
+    def vizinhos(self, posicao, k):
+        """
+        As k linhas mais próximas da linha `posicao` (sem ela mesma).
+
+        Returns:
+            tuple: (posições, distâncias), da mais à menos parecida
+        """
+        distancias = self.distancias(self.matriz[posicao])
+        distancias[posicao] = np.inf
+
+        k = min(k, len(self) - 1)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        proximos = np.argpartition(distancias, k - 1)[:k]
+        proximos = proximos[np.argsort(distancias[proximos], kind="stable")]
+        return proximos, distancias[proximos]
+
+
+class IndicePerfis(IndiceVizinhos):
+    """Índice dos perfis por 90 do elenco, consultado por jogador_id."""
+
+    def __init__(self, agregados, minutos_minimos=MINUTOS_MINIMOS):
+        self.perfis = perfis_por_90(agregados, minutos_minimos)
+        super().__init__(self.perfis[COLUNAS_PERFIL].to_numpy(dtype=np.float64))
+        self._posicao = {int(j): i for i, j in enumerate(self.perfis["jogador_id"])}
+
+    def __contains__(self, jogador_id):
+        return int(jogador_id) in self._posicao
+
+    def padronizado(self, jogador_id):
+        """Vetor padronizado do jogador (z-score por dimensão)."""
+        return self.matriz[self._posicao[int(jogador_id)]]
+
+    def semelhantes(self, jogador_id, k=5):
+        """
+        Os k jogadores mais próximos de `jogador_id` (sem ele mesmo).
+
+        Returns:
+            pd.DataFrame: jogador_id, nome, minutos_total, distancia e
+                          COLUNAS_PERFIL, do mais ao menos parecido.
+                          Vazio se o jogador não estiver no índice.
+        """
+        if jogador_id not in self:
+            return self.perfis.iloc[0:0].assign(distancia=pd.Series(dtype=float))
+
+        proximos, distancias = self.vizinhos(self._posicao[int(jogador_id)], k)
+        resultado = self.perfis.iloc[proximos].reset_index(drop=True)
+        resultado.insert(3, "distancia", distancias)
+        return resultado
+
+
+class IndicePartidas(IndiceVizinhos):
+    """Índice das partidas do usuário pelas estatísticas do jogo, consultado por id."""
+
+    def __init__(self, partidas):
+        colunas = [c for c in COLUNAS_DESCRICAO_PARTIDA if c in partidas.columns]
+        self.partidas = partidas[colunas].reset_index(drop=True)
+        super().__init__(
+            partidas.reindex(columns=COLUNAS_NUMERICAS_PARTIDAS).to_numpy(dtype=np.float64, na_value=np.nan)
+        )
+        self._posicao = {int(p): i for i, p in enumerate(self.partidas["id"])} if len(partidas) else {}
+
+    def __contains__(self, partida_id):
+        return int(partida_id) in self._posicao
+
+    def semelhantes(self, partida_id, k=5):
+        """
+        As k partidas mais parecidas com `partida_id` (sem ela mesma).
+
+        Returns:
+            pd.DataFrame: COLUNAS_DESCRICAO_PARTIDA e distancia, da mais à
+                          menos parecida. Vazio se a partida não estiver no índice.
+        """
+        if partida_id not in self:
+            return self.partidas.iloc[0:0].assign(distancia=pd.Series(dtype=float))
+
+        proximos, distancias = self.vizinhos(self._posicao[int(partida_id)], k)
+        resultado = self.partidas.iloc[proximos].reset_index(drop=True)
+        resultado["distancia"] = distancias
+        return resultado
+
+
+@em_cache(copiar=False)
+def indice_perfis_do_usuario(usuario_id, temporada=None, competicao=None):
+    """Índice de perfis do usuário, reconstruído só quando a versão dos dados dele muda."""
+    return IndicePerfis(buscar_agregados_jogadores(usuario_id, temporada=temporada, competicao=competicao))
+
+
+@em_cache(copiar=False)
+def indice_partidas_do_usuario(usuario_id):
+    """
+    Índice das partidas do usuário. inserir_partida/deletar_partida avançam a
+    versão dos dados dele, e o índice é remontado na próxima consulta.
+    """
+    return IndicePartidas(buscar_partidas_df(
+        usuario_id, colunas=COLUNAS_DESCRICAO_PARTIDA + COLUNAS_NUMERICAS_PARTIDAS
+    ))
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from utils import RESULTADO_VITORIA, RESULTADO_EMPATE, RESULTADO_DERROTA
+
+    parser = argparse.ArgumentParser(description="Benchmark da busca de semelhantes")
+    parser.add_argument("--jogadores", type=int, default=2000)
+    parser.add_argument("--partidas", type=int, default=5000)
+    parser.add_argument("--consultas", type=int, default=1000)
+    args = parser.parse_args()
+
+    rnd = np.random.default_rng(0)
+    n = args.jogadores
+    agregados = pd.DataFrame({
+        "jogador_id": np.arange(n, dtype=np.int64),
+        "nome": [f"Jogador {i}" for i in range(n)],
+        "minutos_total": rnd.uniform(300, 15000, n),
+        **{total: rnd.gamma(2.0, 20.0, n) for _, total, _ in DIMENSOES_PERFIL if total},
+        "perc_passes_med": rnd.uniform(50, 95, n),
+    })
+
+    inicio = time.perf_counter()
+    indice = IndicePerfis(agregados)
+    print(f"Índice com {len(indice)} jogadores: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    alvos = rnd.integers(0, n, args.consultas)
+    inicio = time.perf_counter()
+    for alvo in alvos:
+        indice.semelhantes(alvo, k=5)
+    por_consulta = (time.perf_counter() - inicio) * 1000 / args.consultas
+    print(f"semelhantes(k=5): {por_consulta:.3f} ms por consulta")
+
+    m = args.partidas
+    partidas = pd.DataFrame({
+        "id": np.arange(m, dtype=np.int64),
+        "data": pd.date_range("2000-01-01", periods=m, freq="3D"),
+        "resultado": pd.Categorical(rnd.choice([RESULTADO_VITORIA, RESULTADO_EMPATE, RESULTADO_DERROTA], m)),
+        **{coluna: rnd.integers(0, 30, m).astype(np.int16) for coluna in COLUNAS_NUMERICAS_PARTIDAS},
+    })
+
+    inicio = time.perf_counter()
+    indice_partidas = IndicePartidas(partidas)
+    print(f"\nÍndice com {len(indice_partidas)} partidas: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    alvos = rnd.integers(0, m, args.consultas)
+    inicio = time.perf_counter()
+    for alvo in alvos:
+        indice_partidas.semelhantes(alvo, k=5)
+    por_consulta = (time.perf_counter() - inicio) * 1000 / args.consultas
+    print(f"semelhantes(k=5): {por_consulta:.3f} ms por consulta")
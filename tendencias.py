@@ -0,0 +1,119 @@
+"""
+Tendências do dashboard em tempo linear
+
+Aproveitamento acumulado, médias móveis e diferença de xG móvel, todos
+calculados com somas acumuladas: a soma de uma janela é acumulado[i] -
+acumulado[i - janela]. Funciona para qualquer tamanho de janela e, se
+pedido, reinicia a cada grupo (ex.: temporada).
+
+    python tendencias.py [--partidas 5000]   # benchmark
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import RESULTADO_VITORIA, RESULTADO_EMPATE, RESULTADO_DERROTA
+
+# Pontos por resultado (aproveitamento acumulado) e o valor usado na
+# média móvel de aproveitamento do dashboard
+PONTOS_RESULTADO = {RESULTADO_VITORIA: 3, RESULTADO_EMPATE: 1, RESULTADO_DERROTA: 0}
+APROV_RESULTADO = {RESULTADO_VITORIA: 100, RESULTADO_EMPATE: 33, RESULTADO_DERROTA: 0}
+
+
+# =======================
+# KERNELS
+# =======================
+def _acumular(serie, chaves):
+    if chaves is None:
+        return serie.cumsum()
+    return serie.groupby(chaves, observed=True, sort=False).cumsum()
+
+
+def _soma_janela(serie, janela, chaves=None):
+    """Soma das últimas `janela` linhas (menos no início), reiniciando a cada grupo."""
+    acumulado = _acumular(serie, chaves)
+    if chaves is None:
+        anterior = acumulado.shift(janela)
+    else:
+        anterior = acumulado.groupby(chaves, observed=True, sort=False).shift(janela)
+    return acumulado - anterior.fillna(0.0)
+
+
+def media_movel(serie, janela, chaves=None):
+    """
+    Média móvel com min_periods=1 (igual a rolling(janela, min_periods=1).mean()),
+    ignorando valores ausentes.
+    """
+    validos = serie.notna().astype(float)
+    valores = serie.astype(float).fillna(0.0)
+    contagem = _soma_janela(validos, janela, chaves)
+    return _soma_janela(valores, janela, chaves) / contagem.where(contagem > 0)
+
+
+def aproveitamento_acumulado(resultados, chaves=None):
+    """Aproveitamento (0-100) até cada partida, inclusive."""
+    pontos = resultados.astype(object).map(PONTOS_RESULTADO).astype(float).fillna(0.0)
+    jogos = pd.Series(1.0, index=resultados.index)
+    return _acumular(pontos, chaves) / (_acumular(jogos, chaves) * 3) * 100
+
+
+# =======================
+# TENDÊNCIAS DO DASHBOARD
+# =======================
+def calcular_tendencias(df, janela=5, por=None):
+    """
+    Séries de tendência de um DataFrame de partidas ordenado por data.
+
+    Args:
+        df:     Partidas (colunas data, resultado, gols_usuario, xg_usuario, xg_adv, posse_usuario)
+        janela: Tamanho da janela das médias móveis, em jogos
+        por:    Coluna para reiniciar os cálculos a cada grupo (ex.: "temporada")
+
+    Returns:
+        pd.DataFrame: data, gols_mm, xg_mm, posse_mm, aprov_mm, dif_xg_mm, aprov_acum
+                      (mais a coluna `por`, se informada), no mesmo índice de df
+    """
+    chaves = df[por].astype(object) if por else None
+
+    tendencias = pd.DataFrame({"data": df["data"]}, index=df.index)
+    if por:
+        tendencias[por] = df[por]
+
+    tendencias["gols_mm"] = media_movel(df["gols_usuario"], janela, chaves)
+    tendencias["xg_mm"] = media_movel(df["xg_usuario"], janela, chaves)
+    tendencias["posse_mm"] = media_movel(df["posse_usuario"], janela, chaves)
+    tendencias["aprov_mm"] = media_movel(
+        df["resultado"].astype(object).map(APROV_RESULTADO).astype(float), janela, chaves
+    )
+    tendencias["dif_xg_mm"] = media_movel(
+        df["xg_usuario"].astype(float) - df["xg_adv"].astype(float), janela, chaves
+    )
+    tendencias["aprov_acum"] = aproveitamento_acumulado(df["resultado"], chaves)
+    return tendencias
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark das tendências")
+    parser.add_argument("--partidas", type=int, default=5000)
+    parser.add_argument("--janela", type=int, default=5)
+    args = parser.parse_args()
+
+    rnd = np.random.default_rng(0)
+    n = args.partidas
+    df = pd.DataFrame({
+        "data": pd.date_range("2000-01-01", periods=n, freq="3D"),
+        "temporada": pd.Categorical(np.repeat(np.arange(n // 50 + 1), 50)[:n].astype(str)),
+        "resultado": pd.Categorical(rnd.choice(list(PONTOS_RESULTADO), n)),
+        "gols_usuario": rnd.poisson(1.5, n).astype(np.int16),
+        "xg_usuario": rnd.gamma(2.0, 0.7, n),
+        "xg_adv": rnd.gamma(2.0, 0.6, n),
+        "posse_usuario": rnd.integers(30, 70, n).astype(np.int16),
+    })
+
+    for por in (None, "temporada"):
+        inicio = time.perf_counter()
+        calcular_tendencias(df, args.janela, por)
+        print(f"{n} partidas, por={por}: {(time.perf_counter() - inicio) * 1000:.2f} ms")
@@ -1,3 +1,5 @@
+import unicodedata
+
 import pandas as pd
 
 # =======================
@@ -28,28 +30,6 @@ BENCHMARK = {
 # =======================
 # CÁLCULOS
 # =======================
-def calcular_aproveitamento(df):
-    """
-    Calcula o aproveitamento percentual de pontos.
-    
-    Args:
-        df: DataFrame com coluna 'resultado'
-    
-    Returns:
-        float: Percentual de aproveitamento (0-100)
-    """
-    if len(df) == 0:
-        return 0.0
-    
-    pontos = (
-        (df["resultado"] == RESULTADO_VITORIA).sum() * 3 +
-        (df["resultado"] == RESULTADO_EMPATE).sum() * 1
-    )
-    pontos_possiveis = len(df) * 3
-    
-    return (pontos / pontos_possiveis) * 100 if pontos_possiveis > 0 else 0.0
-
-
 def calcular_percentual_passes(passes_certos, passes_totais):
     """Calcula percentual de acerto de passes."""
     if passes_totais == 0:
@@ -117,43 +97,6 @@ def comparar_com_benchmark(meu_valor, benchmark_info, melhor="maior"):
 
 
 
-def calcular_score_benchmark(df, aproveitamento_geral):
-    """
-    Calcula score geral comparando com benchmark por intervalos.
-    
-    Returns:
-        int: Score de -7 a 7
-    """
-    metricas = {
-        "xg_usuario": df["xg_usuario"].mean(),
-        "gols_usuario": df["gols_usuario"].mean(),
-        "remates_usuario": df["remates_usuario"].mean(),
-        "remates_a_baliza_usuario": df["remates_a_baliza_usuario"].mean(),
-        "posse_usuario": df["posse_usuario"].mean(),
-        "passes_certos_usuario": df["passes_certos_usuario"].mean(),
-        "aproveitamento": aproveitamento_geral,
-    }
-
-    score = 0
-
-    for chave, meu_valor in metricas.items():
-        if pd.isna(meu_valor):
-            continue
-
-        benchmark = BENCHMARK[chave]
-        min_val = benchmark["min"]
-        max_val = benchmark["max"]
-
-        if meu_valor > max_val:
-            score += 1          # acima do padrão
-        elif meu_valor < min_val:
-            score -= 1          # abaixo do padrão
-        else:
-            score += 0          # dentro do padrão
-
-    return score
-
-
 def diagnostico_geral(score):
     """
     Retorna diagnóstico baseado no score.
@@ -290,13 +233,26 @@ def _parse_distancia(valor: str):
         return 0.0
 
 
+def normalizar_nome_jogador(nome) -> str:
+    """
+    Forma canônica do nome de um jogador: sem acentos, em minúsculas e com
+    espaços colapsados. 'José  Sá' e 'jose sa' resultam na mesma chave.
+    """
+    if not nome:
+        return ""
+    sem_acentos = "".join(
+        ch for ch in unicodedata.normalize("NFKD", str(nome)) if not unicodedata.combining(ch)
+    )
+    return " ".join(sem_acentos.casefold().split())
+
+
 def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
     """
     Faz o parse do HTML exportado pelo mod BepInEx do Football Manager.
     Lê as 6 tabelas (Estatísticas Principais, Passe, Ofensivo,
     Defensivo, Guarda-Redes, Bolas Paradas) e retorna uma lista
-    de dicts com todos os campos por jogador, com o nome como chave
-    de junção entre tabelas.
+    de dicts com todos os campos por jogador, com o nome normalizado
+    (normalizar_nome_jogador) como chave de junção entre tabelas.
 
     Args:
         conteudo_html: Bytes do arquivo HTML carregado via st.file_uploader
@@ -319,7 +275,7 @@ def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
         if tabela:
             secoes[h3.get_text(strip=True)] = tabela
 
-    # Chave de merge: nome do jogador (coluna 'Nome' presente em todas as tabelas)
+    # Chave de merge: nome normalizado do jogador (coluna 'Nome' presente em todas as tabelas)
     jogadores: dict[str, dict] = {}
 
     def _linhas(tabela):
@@ -340,7 +296,8 @@ def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
             if len(c) < 9:
                 continue
             nome = c[2].strip()
-            jogadores[nome] = {
+            chave = normalizar_nome_jogador(nome)
+            jogadores[chave] = {
                 "numero":               c[0] if c[0] != "-" else None,
                 "nome":                 nome,
                 "minutos_jogados":      _parse_minutos(c[1]),
@@ -364,16 +321,17 @@ def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
             if len(c) < 8:
                 continue
             nome = c[2].strip()
+            chave = normalizar_nome_jogador(nome)
             extra = {
                 "perc_cruzamentos":         _parse_percentual(c[4]),
                 "passes_progressivos":      _parse_percentual(c[5]),
                 "oportunidades_flagrantes": int(c[6]) if c[6].isdigit() else 0,
                 "passes_decisivos":         _parse_percentual(c[7]),  # vem como "X%" → unidade
             }
-            if nome in jogadores:
-                jogadores[nome].update(extra)
+            if chave in jogadores:
+                jogadores[chave].update(extra)
             else:
-                jogadores[nome] = {"nome": nome, **extra}
+                jogadores[chave] = {"nome": nome, **extra}
 
     # ------------------------------------------------------------------
     # 3. Ofensivo
@@ -387,16 +345,17 @@ def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
             if len(c) < 10:
                 continue
             nome = c[2].strip()
+            chave = normalizar_nome_jogador(nome)
             extra = {
                 "perc_remates":     _parse_percentual(c[3]),
                 "fintas":           int(c[5]) if c[5].isdigit() else 0,
                 "faltas_sofridas":  int(c[6]) if c[6].isdigit() else 0,
                 "remate_na_barra":  int(c[7]) if c[7].isdigit() else 0,
             }
-            if nome in jogadores:
-                jogadores[nome].update(extra)
+            if chave in jogadores:
+                jogadores[chave].update(extra)
             else:
-                jogadores[nome] = {"nome": nome, **extra}
+                jogadores[chave] = {"nome": nome, **extra}
 
     # ------------------------------------------------------------------
     # 4. Defensivo
@@ -410,6 +369,7 @@ def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
             if len(c) < 9:
                 continue
             nome = c[2].strip()
+            chave = normalizar_nome_jogador(nome)
             extra = {
                 "perc_desarmes":        _parse_percentual(c[3]),
                 "perc_cabeceamentos":   _parse_percentual(c[4]),
@@ -418,10 +378,10 @@ def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
                 "alivios":              int(c[7]) if c[7].isdigit() else 0,
                 "desarmes_decisivos":   _parse_percentual(c[8]),  # vem como "X%" → unidade
             }
-            if nome in jogadores:
-                jogadores[nome].update(extra)
+            if chave in jogadores:
+                jogadores[chave].update(extra)
             else:
-                jogadores[nome] = {"nome": nome, **extra}
+                jogadores[chave] = {"nome": nome, **extra}
 
     # ------------------------------------------------------------------
     # 5. Guarda-Redes
@@ -435,16 +395,17 @@ def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
             if len(c) < 7:
                 continue
             nome = c[2].strip()
+            chave = normalizar_nome_jogador(nome)
             extra = {
                 "defesas_seguras":      int(c[3]) if c[3].isdigit() else 0,
                 "defesas_ponta_dedos":  int(c[4]) if c[4].isdigit() else 0,
                 "defesas_desviadas":    int(c[5]) if c[5].isdigit() else 0,
                 "remates_sofridos":     int(c[6]) if c[6].isdigit() else 0,
             }
-            if nome in jogadores:
-                jogadores[nome].update(extra)
+            if chave in jogadores:
+                jogadores[chave].update(extra)
             else:
-                jogadores[nome] = {"nome": nome, **extra}
+                jogadores[chave] = {"nome": nome, **extra}
 
     # ------------------------------------------------------------------
     # 6. Bolas Paradas
@@ -458,17 +419,64 @@ def parsear_html_fm(conteudo_html: bytes) -> list[dict]:
             if len(c) < 7:
                 continue
             nome = c[2].strip()
+            chave = normalizar_nome_jogador(nome)
             extra = {
                 "lancamentos":        int(c[3]) if c[3].isdigit() else 0,
                 "cantos":             int(c[4]) if c[4].isdigit() else 0,
                 "livres_defensivos":  int(c[5]) if c[5].isdigit() else 0,
                 "livres_ofensivos":   int(c[6]) if c[6].isdigit() else 0,
             }
-            if nome in jogadores:
-                jogadores[nome].update(extra)
+            if chave in jogadores:
+                jogadores[chave].update(extra)
             else:
-                jogadores[nome] = {"nome": nome, **extra}
+                jogadores[chave] = {"nome": nome, **extra}
 
     # Filtra jogadores sem minutos jogados (convocados que não entraram)
     resultado = [j for j in jogadores.values() if j.get("minutos_jogados") is not None]
     return resultado
+
+
+def parsear_varios_html_fm(conteudos: list[bytes], max_workers=None, ao_concluir=None) -> list:
+    """
+    Faz o parse de vários HTMLs exportados (ex.: uma temporada inteira)
+    em paralelo, usando um pool de processos.
+
+    Args:
+        conteudos:   Lista com os bytes de cada arquivo HTML
+        max_workers: Número de processos (padrão: um por CPU, limitado ao nº de arquivos)
+        ao_concluir: Callback opcional chamado como ao_concluir(concluidos, total)
+                     a cada arquivo processado, para relatório de progresso
+
+    Returns:
+        list: Um item por arquivo, na mesma ordem de `conteudos` — a lista de
+              jogadores parseada ou a exceção levantada para aquele arquivo.
+    """
+    import multiprocessing
+    import os
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    total = len(conteudos)
+    resultados = [None] * total
+    if total == 0:
+        return resultados
+
+    if max_workers is None:
+        max_workers = min(total, os.cpu_count() or 1)
+
+    # "spawn": o app roda com threads (Streamlit, pool de conexões) e um fork
+    # copiaria locks presos e sockets do pool para os processos filhos
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto) as executor:
+        futuros = {executor.submit(parsear_html_fm, conteudo): i for i, conteudo in enumerate(conteudos)}
+
+        for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+            i = futuros[futuro]
+            try:
+                resultados[i] = futuro.result()
+            except Exception as e:
+                resultados[i] = e
+
+            if ao_concluir:
+                ao_concluir(concluidos, total)
+
+    return resultados